@@ -0,0 +1,4175 @@
+import os
+import io
+import requests
+from requests.adapters import HTTPAdapter
+import json
+import time
+import shutil
+import threading
+import queue
+import tempfile
+import zipfile
+import random
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, as_completed
+from email.utils import parsedate_to_datetime
+import glob
+import pathlib
+import sqlite3
+import hashlib
+import struct
+import logging
+import logging.handlers
+import re  # 파일명 정리를 위해 추가
+from datetime import datetime  # 날짜/시간 변환을 위해 추가
+import csv  # CSV 파일 생성을 위해 추가
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """ 요청마다 새 연결이 생성되었는지(또는 keep-alive 연결을 재사용했는지) 집계하는 어댑터 """
+
+    def __init__(self, stats_callback, *args, **kwargs):
+        self.stats_callback = stats_callback
+        super().__init__(*args, **kwargs)
+
+    def _connections_created(self):
+        pools = self.poolmanager.pools
+        return sum(pool.num_connections for pool in (pools.get(key) for key in pools.keys()) if pool)
+
+    def send(self, request, **kwargs):
+        # 세션(어댑터)은 스레드별로 하나씩이므로, 연결 생성 수 변화로 재사용 여부를 판단
+        before = self._connections_created()
+        response = super().send(request, **kwargs)
+        self.stats_callback(new_connection=self._connections_created() > before)
+        return response
+
+
+class AdaptiveRateController:
+    """ 서버 응답에 따라 동시 다운로드 수와 요청 속도를 조절하는 AIMD 제어기
+
+    - 목록/다운로드 요청이 모두 하나의 토큰 버킷을 공유합니다.
+    - 응답 지연이 낮고 오류가 없으면 동시 다운로드 수와 속도를 조금씩(가산) 올립니다.
+    - 429/5xx/연결 오류가 나면 절반으로(승산) 줄이고, Retry-After 동안 모든 요청을 멈춥니다.
+    - 그 밖의 4xx(401/403/404 등)는 서버 상태와 무관한 요청 자체의 문제이므로 올리지도 줄이지도 않습니다.
+    """
+
+    THROTTLE_STATUS = (429, 503)
+    MIN_RATE = 0.5 # 초당 요청 수 하한
+    MAX_RATE = 200.0 # 초당 요청 수 상한
+    INITIAL_RATE = 20.0
+    RATE_STEP = 2.0
+    SLOW_START_FACTOR = 1.5 # 처음 제한을 받기 전까지는 속도를 배수로 올림
+    DECREASE_COOLDOWN = 2.0 # 같은 원인의 연속 오류로 여러 번 줄이지 않도록 하는 간격(초)
+    DEFAULT_RETRY_AFTER = 5.0
+    SLOW_LATENCY_FACTOR = 3.0 # 평균 응답 지연이 최저 지연의 이 배수를 넘으면 증가를 멈춤
+
+    def __init__(self, initial_concurrency, max_concurrency, log=None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = max(1, min(initial_concurrency, self.max_concurrency))
+        self.rate = self.INITIAL_RATE
+        self.log = log or (lambda message: None)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._success_streak = 0
+        self._slow_start = True
+        self._latency_avg = None
+        self._latency_min = None
+
+    # --- 토큰 버킷 ---
+
+    def acquire_token(self):
+        """ 요청 하나를 보낼 수 있을 때까지 대기 (Retry-After 일시 정지 포함) """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    self._cond.wait(self._paused_until - now)
+                    continue
+                self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                self._cond.wait((1.0 - self._tokens) / self.rate)
+
+    # --- 동시 다운로드 수 ---
+
+    @contextmanager
+    def download_slot(self):
+        """ 현재 허용된 동시 다운로드 수 안에서만 다운로드를 진행 """
+        with self._cond:
+            while self._in_flight >= self.concurrency:
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    # --- 응답 반영 ---
+
+    def record_response(self, status_code, latency, retry_after=None):
+        if status_code in self.THROTTLE_STATUS:
+            self._decrease(f"HTTP {status_code}", self.parse_retry_after(retry_after))
+        elif status_code >= 500:
+            self._decrease(f"HTTP {status_code}")
+        elif status_code < 400:
+            self._increase(latency)
+
+    def record_error(self, error):
+        self._decrease(type(error).__name__)
+
+    def _increase(self, latency):
+        with self._cond:
+            if self._latency_avg is None:
+                self._latency_avg = latency
+            else:
+                self._latency_avg = self._latency_avg * 0.9 + latency * 0.1
+            self._latency_min = latency if self._latency_min is None else min(self._latency_min, latency)
+            if self._latency_avg > self._latency_min * self.SLOW_LATENCY_FACTOR:
+                self._success_streak = 0
+                return
+
+            # 현재 동시 다운로드 수만큼 연속 성공하면(한 '창') 한 단계씩 올림
+            self._success_streak += 1
+            if self._success_streak < self.concurrency:
+                return
+            self._success_streak = 0
+            if self._slow_start:
+                self.rate = min(self.MAX_RATE, self.rate * self.SLOW_START_FACTOR)
+            else:
+                self.rate = min(self.MAX_RATE, self.rate + self.RATE_STEP)
+            if self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                self._cond.notify_all()
+                self.log(f"응답 양호: 동시 다운로드 수 {self.concurrency}, 요청 속도 {self.rate:.1f}/s 로 증가")
+
+    def _decrease(self, reason, pause=None):
+        with self._cond:
+            now = time.monotonic()
+            self._success_streak = 0
+            if pause:
+                self._paused_until = max(self._paused_until, now + pause)
+            if now - self._last_decrease < self.DECREASE_COOLDOWN:
+                return
+            self._last_decrease = now
+            self._slow_start = False
+            self.concurrency = max(1, self.concurrency // 2)
+            self.rate = max(self.MIN_RATE, self.rate / 2)
+            self._tokens = min(self._tokens, 1.0)
+            message = f"서버 제한/오류({reason}): 동시 다운로드 수 {self.concurrency}, 요청 속도 {self.rate:.1f}/s 로 감소"
+            if pause:
+                message += f", {pause:.0f}초 대기"
+        self.log(message)
+
+    def parse_retry_after(self, value):
+        """ Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환 """
+        if not value:
+            return self.DEFAULT_RETRY_AFTER
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return self.DEFAULT_RETRY_AFTER
+
+    def status(self):
+        with self._cond:
+            return {"concurrency": self.concurrency, "in_flight": self._in_flight, "rate": self.rate}
+
+
+class SharedTransferScheduler:
+    """ 여러 계정의 백업이 한 프로세스에서 함께 쓰는 전역 한도: 전체 동시 다운로드 수와 전송 대역폭
+
+    - 계정마다의 속도 제어기(AdaptiveRateController)가 허용한 다운로드도 여기서 전체 자리를 한 번 더 받습니다.
+    - 빈자리는 기다리는 계정 중 지금 다운로드 중인 수가 가장 적은 계정에게 먼저 돌아가므로, 모든 계정이
+      바쁠 때는 한도를 고르게 나눠 쓰고, 받을 것이 없는 계정의 몫은 바쁜 계정이 가져다 씁니다.
+    - 대역폭은 모든 다운로드가 하나의 토큰 버킷(바이트)을 공유하며, 자리가 고르게 나뉘므로 계정별로도 고르게 나뉩니다.
+    """
+
+    BANDWIDTH_BURST_SECONDS = 1.0 # 쉬고 있던 동안 모아 둘 수 있는 토큰 (초 단위 전송량)
+
+    def __init__(self, max_concurrency, max_bytes_per_sec=None):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_bytes_per_sec = max_bytes_per_sec or None # None이면 대역폭 제한 없음
+        self._cond = threading.Condition()
+        self._in_flight = {} # 계정 -> 진행 중인 다운로드 수
+        self._waiting = {} # 계정 -> 자리를 기다리는 다운로드 수
+        self._total = 0
+        self._bandwidth_lock = threading.Lock()
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+
+    # --- 동시 다운로드 수 ---
+
+    def _can_start(self, account):
+        if self._total >= self.max_concurrency:
+            return False
+        mine = self._in_flight.get(account, 0)
+        return all(mine <= self._in_flight.get(other, 0) for other in self._waiting)
+
+    @contextmanager
+    def download_slot(self, account):
+        """ 전체 한도 안에서 account(계정마다 하나의 키)의 다운로드 하나를 진행 """
+        with self._cond:
+            self._waiting[account] = self._waiting.get(account, 0) + 1
+            try:
+                while not self._can_start(account):
+                    self._cond.wait()
+            finally:
+                self._waiting[account] -= 1
+                if not self._waiting[account]:
+                    del self._waiting[account]
+            self._in_flight[account] = self._in_flight.get(account, 0) + 1
+            self._total += 1
+            self._cond.notify_all() # 기다리는 계정 구성이 바뀌었으므로 다른 계정이 다시 확인
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight[account] -= 1
+                if not self._in_flight[account]:
+                    del self._in_flight[account]
+                self._total -= 1
+                self._cond.notify_all()
+
+    # --- 대역폭 ---
+
+    def consume(self, size):
+        """ 받은 size 바이트만큼 토큰을 씀. 한도를 넘었으면 부족한 만큼 쉬었다가 돌아옴 """
+        if not self.max_bytes_per_sec:
+            return
+        with self._bandwidth_lock:
+            now = time.monotonic()
+            burst = self.max_bytes_per_sec * self.BANDWIDTH_BURST_SECONDS
+            self._tokens = min(burst, self._tokens + (now - self._last_refill) * self.max_bytes_per_sec)
+            self._last_refill = now
+            # 먼저 빌려 쓰고 빚만큼 기다리게 하므로, 뒤에 온 다운로드일수록 오래 기다려 전체 속도가 한도를 넘지 않음
+            self._tokens -= size
+            deficit = -self._tokens
+        if deficit > 0:
+            time.sleep(deficit / self.max_bytes_per_sec)
+
+
+class HttpSessionPool:
+    """ 작업자 스레드마다 keep-alive requests.Session을 하나씩 보관하는 스레드 안전 연결 풀 """
+
+    API_HOST = "https://drawer-api.kakao.com"
+    # 호스트별로 유지할 연결 풀 개수 / 풀당 최대 연결 수 (세션 하나는 한 번에 요청 하나만 수행)
+    POOL_CONNECTIONS = 8
+    POOL_MAXSIZE = 2
+
+    def __init__(self, cookies, headers, controller, api_host=API_HOST):
+        self.api_host = api_host
+        self.cookies = dict(cookies)
+        self.headers = dict(headers)
+        self.controller = controller
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions = []
+        self.request_count = 0
+        self.new_connection_count = 0
+        self.reused_connection_count = 0
+
+    def _record(self, new_connection):
+        with self._lock:
+            self.request_count += 1
+            if new_connection:
+                self.new_connection_count += 1
+            else:
+                self.reused_connection_count += 1
+
+    def _create_session(self):
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.cookies.update(self.cookies) # 쿠키는 세션 생성 시 한 번만 설정
+        for prefix in (self.api_host, "https://", "http://"):
+            # drawer-api 전용 풀과 다운로드(CDN) 호스트용 풀을 각각 마운트
+            session.mount(prefix, CountingHTTPAdapter(
+                self._record,
+                pool_connections=self.POOL_CONNECTIONS,
+                pool_maxsize=self.POOL_MAXSIZE
+            ))
+        with self._lock:
+            self._sessions.append(session)
+        return session
+
+    @property
+    def session(self):
+        """ 현재 스레드 전용 세션 (없으면 생성) """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._create_session()
+            self._local.session = session
+        return session
+
+    def get(self, url, **kwargs):
+        """ 공유 토큰 버킷을 거쳐 GET 요청을 보내고, 응답 결과를 속도 제어기에 반영 """
+        self.controller.acquire_token()
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.RequestException as e:
+            self.controller.record_error(e)
+            raise
+        self.controller.record_response(
+            response.status_code,
+            response.elapsed.total_seconds(),
+            response.headers.get('Retry-After')
+        )
+        return response
+
+    def stats(self):
+        """ 연결 재사용 통계 """
+        with self._lock:
+            total = self.request_count
+            reuse_rate = (self.reused_connection_count / total) if total else 0.0
+            return {
+                "sessions": len(self._sessions),
+                "requests": total,
+                "new_connections": self.new_connection_count,
+                "reused_connections": self.reused_connection_count,
+                "reuse_rate": reuse_rate
+            }
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+
+class CompressionPolicy:
+    """ 아카이브 멤버별 압축 방식 (확장자 기준)
+
+    사진/동영상/압축 파일처럼 이미 압축된 형식은 다시 압축해도 크기가 거의 줄지 않으므로
+    그대로 저장(STORED)하고, 문서(HWP, DOCX, PPTX 등)는 지정한 방식으로 압축합니다.
+    - auto: 이미 압축된 형식은 저장, 나머지는 deflate (기본값)
+    - deflate / store: 모든 멤버를 deflate / 압축 없이
+    - lzma: auto와 같되 문서를 LZMA로 (압축률 우선, 일부 압축 프로그램은 미지원)
+    - zstd: auto와 같되 문서를 Zstandard로 (Python 3.14 이상의 zipfile에서만, 아니면 deflate)
+    """
+
+    MODES = ("auto", "deflate", "store", "lzma", "zstd")
+    COMPRESSED_EXTENSIONS = frozenset((
+        ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic", ".heif",
+        ".mp4", ".mov", ".m4v", ".avi", ".mkv", ".webm", ".3gp",
+        ".mp3", ".m4a", ".aac", ".ogg", ".opus",
+        ".zip", ".7z", ".rar", ".gz", ".bz2", ".xz", ".zst", ".apk",
+    ))
+
+    def __init__(self, mode="auto", log=None):
+        if mode not in self.MODES:
+            raise ValueError(f"알 수 없는 압축 방식: {mode}")
+        self.mode = mode
+        self.document_method = zipfile.ZIP_DEFLATED
+        if mode == "lzma":
+            self.document_method = zipfile.ZIP_LZMA
+        elif mode == "zstd":
+            zstd_method = getattr(zipfile, "ZIP_ZSTANDARD", None)
+            if zstd_method is not None:
+                self.document_method = zstd_method
+            elif log:
+                log("경고: 이 Python의 zipfile은 zstd를 지원하지 않아 deflate로 압축합니다.")
+
+    def method_for(self, member_name):
+        """ 멤버 이름에 맞는 zipfile 압축 방식 """
+        if self.mode == "store":
+            return zipfile.ZIP_STORED
+        if self.mode == "deflate":
+            return zipfile.ZIP_DEFLATED
+        if os.path.splitext(member_name)[1].lower() in self.COMPRESSED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return self.document_method
+
+
+class LocalArchiveFile:
+    """ 로컬 아카이브 기록 대상: '.part' 파일에 쓰고 확정 시 fsync 후 최종 이름으로 변경 """
+
+    def __init__(self, zip_path):
+        self.location = zip_path
+        self.temp_path = f'{zip_path}.part'
+        self.file = open(self.temp_path, 'wb')
+
+    def commit(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.temp_path, self.location)
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class LocalStorage:
+    """ 기본 저장소: 유형별 백업 폴더에 파일로 그대로 기록
+
+    목록 로그, 링크 CSV, 이어받기 지점(색인)은 이미 백업 폴더에 있으므로 따로 올릴 곳이 없습니다.
+    S3Storage와 같은 메서드를 제공하며, 이름(name)은 모두 유형별 백업 폴더(backup_path) 기준입니다.
+    """
+
+    remote = False
+    settings = None # 색인에 기록할 저장소 설정 (로컬은 없음)
+
+    def describe(self, backup_path, name):
+        return os.path.join(backup_path, name)
+
+    def open_archive(self, backup_path, name):
+        """ 새 아카이브를 기록할 대상 (file 속성에 쓰고 commit() 또는 abort()) """
+        return LocalArchiveFile(os.path.join(backup_path, name))
+
+    def open_reader(self, backup_path, name):
+        """ 확정된 아카이브를 읽을 파일 객체 (없으면 OSError) """
+        return open(os.path.join(backup_path, name), 'rb')
+
+    def publish_file(self, backup_path, name):
+        pass
+
+    def remove_file(self, backup_path, name):
+        pass
+
+    def save_resume_marker(self, backup_path, marker):
+        pass
+
+    def load_resume_marker(self, backup_path):
+        return None
+
+    def discard_incomplete_uploads(self, backup_path):
+        return 0
+
+
+class S3MultipartUpload:
+    """ 쓰는 대로 PART_SIZE마다 파트를 올리는 멀티파트 업로드
+
+    zipfile에는 되감을 수 없는(seek 불가) 스트림으로 보이므로 멤버마다 데이터 디스크립터를 붙여 기록하고,
+    로컬에는 파트 하나 크기의 버퍼만 둡니다. 객체는 commit()으로 업로드를 완료할 때 한 번에 나타납니다.
+    """
+
+    def __init__(self, storage, backup_path, name):
+        self.client = storage.client
+        self.bucket = storage.bucket
+        self.part_size = storage.PART_SIZE
+        self.key = storage.key(backup_path, name)
+        self.location = storage.describe(backup_path, name)
+        self.temp_path = self.location # 중단 시 로그에 표시할 위치 (업로드를 취소하면 남지 않음)
+        self.file = self
+        self._upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key)["UploadId"]
+        self._buffer = bytearray()
+        self._parts = []
+        self._position = 0
+
+    # --- zipfile이 쓰는 파일 객체 메서드 ---
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=0):
+        raise io.UnsupportedOperation("S3 업로드 스트림은 되감을 수 없습니다.")
+
+    def flush(self):
+        pass
+
+    def _upload_part(self, data):
+        part_number = len(self._parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id, PartNumber=part_number, Body=data
+        )
+        self._parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+    def commit(self):
+        """ 남은 버퍼를 마지막 파트로 올리고 업로드를 완료 """
+        if self._buffer or not self._parts:
+            self._upload_part(bytes(self._buffer))
+            self._buffer = bytearray()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id, MultipartUpload={"Parts": self._parts}
+        )
+
+    def abort(self):
+        self._buffer = bytearray()
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+
+class S3ObjectReader(io.RawIOBase):
+    """ 범위(Range) 요청으로 필요한 부분만 읽는 객체. zipfile은 목차와 필요한 멤버만 읽음 """
+
+    def __init__(self, storage, key):
+        super().__init__()
+        self.client = storage.client
+        self.bucket = storage.bucket
+        self.key = key
+        self.ClientError = storage.ClientError
+        try:
+            self.size = self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except storage.ClientError as e:
+            raise FileNotFoundError(f"s3://{self.bucket}/{key}: {e}") from e
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def readinto(self, buffer):
+        if self._position >= self.size or not len(buffer):
+            return 0
+        end = min(self._position + len(buffer), self.size) - 1
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={self._position}-{end}")
+            data = response["Body"].read()
+        except self.ClientError as e:
+            raise OSError(f"s3://{self.bucket}/{self.key}: {e}") from e
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class S3Storage:
+    """ S3 호환 객체 저장소(AWS S3, MinIO 등)에 백업. boto3가 필요합니다.
+
+    아카이브는 다운로드하는 동안 멀티파트 업로드로 바로 올리므로 로컬 디스크에 아카이브를 두지 않습니다.
+    색인, 목록 로그, 구간 다운로드 중간 파일은 작업 상태로 유형별 백업 폴더에 그대로 두고,
+    목록 로그와 링크 CSV는 같은 위치('{prefix}/{유형 폴더 이름}/{파일 이름}')에도 올립니다.
+    페이지를 확정할 때마다 이어받기 지점을 '_resume.json' 객체에 기록하므로, 로컬 색인이 없어도
+    키 목록을 조회하지 않고 객체 하나만 읽어 이어받습니다.
+    인증 정보는 boto3의 기본 방식(환경 변수 AWS_ACCESS_KEY_ID 등, ~/.aws)으로 찾습니다.
+    """
+
+    remote = True
+    PART_SIZE = 8 * 1024 * 1024 # 멀티파트 업로드 파트 크기 (S3 최소 5MB, 열린 아카이브마다 이만큼 버퍼)
+    READ_BUFFER_SIZE = 1024 * 1024 # 복원/확인 시 Range 요청 하나로 미리 읽을 크기
+    RESUME_MARKER_NAME = "_resume.json"
+    MAX_POOL_CONNECTIONS = 32
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, region=None):
+        try:
+            import boto3
+            from botocore.config import Config
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise ImportError("S3 저장소를 사용하려면 boto3가 필요합니다. (pip install boto3)") from e
+        if not bucket:
+            raise ValueError("S3 버킷 이름이 필요합니다.")
+        self.bucket = bucket
+        self.prefix = (prefix or "").strip('/')
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.ClientError = ClientError
+        config = Config(
+            max_pool_connections=self.MAX_POOL_CONNECTIONS,
+            retries={"mode": "standard", "max_attempts": 5},
+            # 직접 지정한 서버(MinIO 등)는 경로 방식 주소를 사용하고, 일부 호환 서버가 지원하지 않는 기본 체크섬은 끔
+            s3={"addressing_style": "path"} if endpoint_url else None,
+            request_checksum_calculation="when_required",
+            response_checksum_validation="when_required",
+        )
+        # boto3 클라이언트는 스레드 간 공유가 가능하므로 작업자들이 하나를 함께 사용
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region, config=config)
+
+    @property
+    def settings(self):
+        return {"type": "s3", "bucket": self.bucket, "prefix": self.prefix, "endpoint_url": self.endpoint_url, "region": self.region}
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings["bucket"], settings.get("prefix"), settings.get("endpoint_url"), settings.get("region"))
+
+    def key(self, backup_path, name):
+        folder_name = os.path.basename(os.path.normpath(backup_path))
+        return "/".join(part for part in (self.prefix, folder_name, name) if part)
+
+    def describe(self, backup_path, name):
+        return f"s3://{self.bucket}/{self.key(backup_path, name)}"
+
+    def open_archive(self, backup_path, name):
+        return S3MultipartUpload(self, backup_path, name)
+
+    def open_reader(self, backup_path, name):
+        return io.BufferedReader(S3ObjectReader(self, self.key(backup_path, name)), self.READ_BUFFER_SIZE)
+
+    def publish_file(self, backup_path, name):
+        """ 백업 폴더의 파일(목록 로그, 링크 CSV)을 같은 이름의 객체로 올림 """
+        self.client.upload_file(os.path.join(backup_path, name), self.bucket, self.key(backup_path, name))
+
+    def remove_file(self, backup_path, name):
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(backup_path, name))
+
+    def save_resume_marker(self, backup_path, marker):
+        body = json.dumps(marker, ensure_ascii=False).encode('utf-8')
+        self.client.put_object(Bucket=self.bucket, Key=self.key(backup_path, self.RESUME_MARKER_NAME), Body=body)
+
+    def load_resume_marker(self, backup_path):
+        """ 이어받기 지점 객체 하나만 읽음 (없으면 None) """
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.key(backup_path, self.RESUME_MARKER_NAME))
+        except self.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json.loads(response["Body"].read())
+
+    def discard_incomplete_uploads(self, backup_path):
+        """ 이전 실행이 강제 종료되어 완료되지 않은 멀티파트 업로드를 취소 (남겨 두면 저장 공간 요금이 청구됨) """
+        prefix = self.key(backup_path, "") + "/"
+        count = 0
+        paginator = self.client.get_paginator("list_multipart_uploads")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for upload in page.get("Uploads", []):
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=upload["Key"], UploadId=upload["UploadId"])
+                count += 1
+        return count
+
+
+class ArchiveWriteGate:
+    """ 아카이브 하나에 멤버를 기록할 차례를 관리 (zipfile은 한 번에 멤버 하나만 기록할 수 있음)
+
+    - stream(): 다운로드하며 바로 기록하는 멤버 하나가 차례를 차지합니다. 이미 열려 있으면 False
+    - write(): 스트림이 열려 있으면 기다리지 않고 대기열에 넣고, 스트림이 닫힐 때 이어서 기록합니다.
+      그래서 네트워크 전송 중에도 다른 작업자는 막히지 않고, 기다리는 것은 짧은 로컬 복사뿐입니다.
+    - exclusive(): 확정/닫기처럼 대기열까지 모두 기록된 뒤에 해야 하는 작업
+    대기열의 멤버는 기록한 뒤(실패해도) release()로 원본을 정리하며, 기록 오류는 키(페이지)별로 모아 두었다가
+    pop_error()로 확정할 때 알립니다.
+    """
+
+    PENDING_MAX_BYTES = 64 * 1024 * 1024 # 대기열의 멤버가 이보다 많으면 이후 메모리 임시 파일은 디스크로 넘김
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._busy = False # 누군가 zip에 기록 중
+        self._streaming = False # stream()으로 열린 멤버가 있음
+        self._pending = [] # (write, source, release, key, size)
+        self._pending_bytes = 0
+        self._errors = {}
+
+    def _release_turn(self):
+        with self._cond:
+            self._busy = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._cond:
+            while self._busy:
+                self._cond.wait()
+            self._busy = True
+        try:
+            yield
+        finally:
+            self._release_turn()
+
+    def write(self, write, source, release, key=None):
+        """ write(source)로 멤버를 기록하고 release()로 원본을 정리. 대기열에 넣었으면 False """
+        with self._cond:
+            while self._busy and not self._streaming:
+                self._cond.wait()
+            if self._streaming:
+                size = source.seek(0, os.SEEK_END)
+                source.seek(0)
+                self._pending_bytes += size
+                if self._pending_bytes > self.PENDING_MAX_BYTES and hasattr(source, "rollover"):
+                    source.rollover()
+                self._pending.append((write, source, release, key, size))
+                return False
+            self._busy = True
+        try:
+            write(source)
+        finally:
+            try:
+                release()
+            finally:
+                self._release_turn()
+        return True
+
+    @contextmanager
+    def stream(self):
+        with self._cond:
+            while self._busy and not self._streaming:
+                self._cond.wait()
+            available = not self._streaming
+            if available:
+                self._busy = self._streaming = True
+        if not available:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            with self._cond:
+                self._streaming = False
+            try:
+                self._flush()
+            finally:
+                self._release_turn()
+
+    def _flush(self):
+        """ 스트림이 열려 있는 동안 쌓인 멤버를 기록 (차례를 가진 채 호출) """
+        while True:
+            with self._cond:
+                if not self._pending:
+                    return
+                write, source, release, key, size = self._pending.pop(0)
+                self._pending_bytes -= size
+            try:
+                write(source)
+            except Exception as e:
+                with self._cond:
+                    self._errors.setdefault(key, e)
+            finally:
+                release()
+
+    def pop_error(self, key=None):
+        with self._cond:
+            return self._errors.pop(key, None)
+
+
+class PageArchiveWriter:
+    """ 다운로드한 파일을 임시 폴더 없이 {timestamp}_photo.zip 으로 바로 기록하는 아카이브 작성기
+
+    여러 작업자가 동시에 add_file()을 호출해도 멤버 기록은 ArchiveWriteGate로 하나씩 직렬화됩니다.
+    큰 파일은 open_member()로 다운로드하며 바로 멤버에 기록할 수 있으며(한 번에 하나), 그동안 추가되는
+    파일은 기다리지 않고 대기열에 넣었다가 스트림이 닫힐 때 기록합니다. 멤버 이름 예약은 별도 잠금이라
+    기록 중에도 막히지 않습니다.
+    작성 중에는 '.part' 파일에 기록하고, commit() 시에만 최종 이름으로 바꾸므로
+    중간에 중단된 아카이브는 이어받기 기준(_photo.zip)으로 인식되지 않습니다.
+    원격 저장소(storage)를 쓰면 '.part' 파일 대신 멀티파트 업로드로 바로 올리고 commit() 시 완료합니다.
+    """
+
+    COPY_CHUNK_SIZE = 1024 * 1024
+    MANIFEST_NAME = "_manifest.json" # 중복 참조 목록 (참조가 있을 때만 기록)
+
+    def __init__(self, zip_path, policy=None, storage=None):
+        self.policy = policy or CompressionPolicy()
+        self.name = os.path.basename(zip_path)
+        self._lock = threading.Lock() # 멤버 이름과 참조 목록 (I/O 중에는 잡지 않음)
+        self._gate = ArchiveWriteGate()
+        self._names = {self.MANIFEST_NAME}
+        self.references = []
+        self._target = (storage or LocalStorage()).open_archive(os.path.dirname(zip_path), self.name)
+        self.zip_path = self._target.location
+        self.temp_path = self._target.temp_path
+        self._zip = zipfile.ZipFile(self._target.file, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+
+    def reserve(self, filename, item=None):
+        """ 항목을 기록할 (아카이브 이름, 중복되지 않는 멤버 이름)을 예약. 페이지 아카이브는 항상 이 파일 """
+        with self._lock:
+            return self.name, self.unique_name(self._names, filename)
+
+    def add_file(self, archive_name, member_name, source, release):
+        """ 파일 객체(source)의 내용을 아카이브 멤버로 추가 (archive_name은 reserve()가 돌려준 값)
+
+        source는 넘겨받아 기록한 뒤 release()로 정리합니다. 스트림 기록 중이면 대기열에 넣고 False를 반환하며,
+        그 기록 오류는 commit()에서 알립니다.
+        """
+        return self._gate.write(
+            lambda source: self.write_member(self._zip, self.policy, member_name, source), source, release
+        )
+
+    @contextmanager
+    def open_member(self, archive_name, member_name):
+        """ 다운로드하며 멤버를 바로 기록할 스트림. 다른 항목이 이미 기록 중이면 None (호출한 쪽은 임시 파일을 사용) """
+        with self._gate.stream() as available:
+            if not available:
+                yield None
+                return
+            with self.stream_member(self._zip, self.policy, member_name) as dest:
+                yield dest
+
+    def add_reference(self, archive_name, member_name, reference):
+        """ 바이트 대신 이미 저장된 원본을 가리키는 참조를 매니페스트에 추가 """
+        with self._lock:
+            self.references.append(dict(reference, member=member_name))
+
+    def commit(self):
+        """ 아카이브를 닫고 디스크에 반영한 뒤 최종 이름으로 변경 (원격 저장소는 업로드 완료) """
+        with self._gate.exclusive():
+            error = self._gate.pop_error()
+            if error is not None:
+                raise error
+            with self._lock:
+                references = list(self.references)
+            if references:
+                manifest = json.dumps({"references": references}, ensure_ascii=False, indent=1)
+                self._zip.writestr(self.MANIFEST_NAME, manifest.encode('utf-8'), compress_type=zipfile.ZIP_DEFLATED)
+            self._zip.close()
+            self._target.commit()
+
+    @staticmethod
+    def unique_name(names, filename):
+        """ names에 없는 멤버 이름을 골라 names에 추가 (중복 시 _1, _2 ... 접미사) """
+        name = filename
+        base, ext = os.path.splitext(filename)
+        counter = 1
+        while name in names:
+            name = f"{base}_{counter}{ext}"
+            counter += 1
+        names.add(name)
+        return name
+
+    @staticmethod
+    @contextmanager
+    def stream_member(zf, policy, member_name):
+        """ 압축 방식(policy)에 맞춰 zf의 멤버를 기록할 스트림
+
+        기록 중 오류가 나면 멤버를 목차에서 빼므로 같은 이름으로 다시 기록할 수 있습니다.
+        (이미 쓴 바이트는 빈 공간으로 남지만 중앙 디렉터리에 없으므로 읽을 때 보이지 않음)
+        """
+        zip_info = zipfile.ZipInfo(member_name, date_time=time.localtime()[:6])
+        zip_info.compress_type = policy.method_for(member_name)
+        dest = zf.open(zip_info, 'w', force_zip64=True)
+        try:
+            yield dest
+        except BaseException:
+            try:
+                dest.close()
+            finally:
+                if zip_info in zf.filelist:
+                    zf.filelist.remove(zip_info)
+                zf.NameToInfo.pop(member_name, None)
+            raise
+        dest.close()
+
+    @classmethod
+    def write_member(cls, zf, policy, member_name, source):
+        """ 파일 객체(source)의 내용을 압축 방식(policy)에 맞춰 zf의 멤버로 기록 """
+        with cls.stream_member(zf, policy, member_name) as dest:
+            shutil.copyfileobj(source, dest, cls.COPY_CHUNK_SIZE)
+
+    def abort(self):
+        """ 작성 중인 아카이브를 버림 """
+        with self._gate.exclusive():
+            try:
+                self._zip.close()
+            finally:
+                self._target.abort()
+
+
+class ArchiveVolume:
+    """ 여러 페이지가 이어서 기록하는 볼륨 아카이브 하나 (ArchiveLayout의 size/chat/month 구성)
+
+    페이지가 확정될 때마다 닫아(중앙 디렉터리 기록 + fsync) 확정된 멤버는 항상 읽을 수 있게 두고,
+    다음 멤버를 추가할 때 추가('a') 모드로 다시 엽니다. 다시 열 때는 덮어쓰게 될 중앙 디렉터리를
+    '.journal' 파일에 먼저 보관하므로, 추가 도중 중단되어도 repair()로 마지막으로 닫은 상태로 되돌립니다.
+    """
+
+    JOURNAL_SUFFIX = ".journal"
+
+    def __init__(self, zip_path, name, number, policy):
+        self.zip_path = zip_path
+        self.name = name # 색인에 기록하는 이름 (유형 폴더 기준 상대 경로)
+        self.number = number
+        self.policy = policy
+        self.journal_path = f"{zip_path}{self.JOURNAL_SUFFIX}"
+        self.size = os.path.getsize(zip_path) if os.path.exists(zip_path) else 0
+        self._lock = threading.Lock() # 멤버 이름과 참조 목록 (I/O 중에는 잡지 않음)
+        self._gate = ArchiveWriteGate() # zip 기록과 열기/닫기
+        self._file = None
+        self._zip = None
+        self._names = None
+        self._references = {} # page_timestamp -> 아직 기록하지 않은 참조 목록
+
+    def _load_names(self):
+        if self._names is None:
+            if self.size:
+                with zipfile.ZipFile(self.zip_path) as zf:
+                    self._names = set(zf.namelist())
+            else:
+                self._names = set()
+
+    def _open(self):
+        """ 기록할 수 있도록 열기 (이미 열려 있으면 그대로) """
+        if self._zip is not None:
+            return
+        exists = os.path.exists(self.zip_path) and os.path.getsize(self.zip_path) > 0
+        self._file = open(self.zip_path, 'r+b' if exists else 'w+b')
+        try:
+            if exists:
+                self._zip = zipfile.ZipFile(self._file, 'a', compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+                # start_dir: 기존 중앙 디렉터리 위치 (다음 멤버가 이 자리부터 덮어씀)
+                tail_offset = self._zip.start_dir
+                self._file.seek(tail_offset)
+                tail = self._file.read()
+            else:
+                self._zip = zipfile.ZipFile(self._file, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+                tail_offset, tail = 0, b''
+            self._write_journal(tail_offset, tail)
+        except Exception:
+            self._zip = None
+            self._file.close()
+            raise
+        with self._lock:
+            if self._names is None:
+                self._names = set(self._zip.namelist())
+
+    def _write_journal(self, offset, tail):
+        temp_path = f"{self.journal_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(struct.pack('<Q', offset))
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+
+    def _close(self):
+        """ 중앙 디렉터리를 기록하고 디스크에 반영한 뒤 저널 삭제 """
+        if self._zip is None:
+            return
+        try:
+            self._zip.close()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.size = self._file.tell()
+        finally:
+            # 실패하면 저널을 남겨 두어 다음 실행 시작 시 repair()로 되돌림
+            self._file.close()
+            self._zip = None
+        os.remove(self.journal_path)
+
+    def reserve_name(self, filename):
+        with self._lock:
+            self._load_names()
+            return PageArchiveWriter.unique_name(self._names, filename)
+
+    def add_file(self, page_timestamp, member_name, source, release):
+        """ PageArchiveWriter.add_file()과 같음. 대기열에서 난 기록 오류는 그 페이지의 commit_page()에서 알림 """
+        def write(source):
+            self._open()
+            try:
+                PageArchiveWriter.write_member(self._zip, self.policy, member_name, source)
+            finally:
+                self.size = self._file.tell()
+        return self._gate.write(write, source, release, key=page_timestamp)
+
+    @contextmanager
+    def open_member(self, member_name):
+        """ PageArchiveWriter.open_member()와 같음 (다른 항목이 기록 중이면 None) """
+        with self._gate.stream() as available:
+            if not available:
+                yield None
+                return
+            self._open()
+            try:
+                with PageArchiveWriter.stream_member(self._zip, self.policy, member_name) as dest:
+                    yield dest
+            finally:
+                self.size = self._file.tell()
+
+    def add_reference(self, page_timestamp, member_name, reference):
+        with self._lock:
+            self._references.setdefault(page_timestamp, []).append(dict(reference, member=member_name))
+
+    def commit_page(self, page_timestamp):
+        """ 페이지의 참조를 매니페스트(_manifest_{timestamp}.json)로 기록하고 볼륨을 닫아 디스크에 반영 """
+        with self._gate.exclusive():
+            with self._lock:
+                references = self._references.pop(page_timestamp, None)
+            error = self._gate.pop_error(page_timestamp)
+            if error is not None:
+                self._close()
+                raise error
+            if references:
+                self._open()
+                manifest = json.dumps({"references": references}, ensure_ascii=False, indent=1)
+                with self._lock:
+                    manifest_name = PageArchiveWriter.unique_name(self._names, f"_manifest_{page_timestamp}.json")
+                self._zip.writestr(manifest_name, manifest.encode('utf-8'), compress_type=zipfile.ZIP_DEFLATED)
+            self._close()
+
+    def drop_page(self, page_timestamp):
+        """ 버려진 페이지의 참조를 버리고 볼륨을 닫음 (이미 기록된 멤버는 색인에 없으므로 무시됨) """
+        with self._gate.exclusive():
+            with self._lock:
+                self._references.pop(page_timestamp, None)
+            self._gate.pop_error(page_timestamp)
+            self._close()
+
+    def close(self):
+        with self._gate.exclusive():
+            self._close()
+
+    @classmethod
+    def repair(cls, journal_path):
+        """ 추가 도중 중단된 볼륨을 저널에 보관한 마지막으로 닫은 상태로 되돌림 """
+        zip_path = journal_path[:-len(cls.JOURNAL_SUFFIX)]
+        with open(journal_path, 'rb') as f:
+            offset = struct.unpack('<Q', f.read(8))[0]
+            tail = f.read()
+        if os.path.exists(zip_path):
+            if offset == 0 and not tail:
+                os.remove(zip_path) # 새로 만들던 볼륨
+            else:
+                with open(zip_path, 'r+b') as f:
+                    f.truncate(offset)
+                    f.seek(offset)
+                    f.write(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+        os.remove(journal_path)
+
+
+class VolumePageArchive:
+    """ 한 페이지의 항목을 구성 방식(ArchiveLayout)에 따라 여러 볼륨에 나눠 기록하는 페이지 단위 아카이브
+
+    PageArchiveWriter와 같은 방식으로 사용하며, commit()은 이 페이지가 기록한 볼륨을 모두 닫아 디스크에 반영합니다.
+    abort()는 볼륨 파일을 지우지 않으며, 이미 기록된 멤버는 색인에 없으므로 조회/복원 시 무시됩니다.
+    """
+
+    temp_path = None # 버릴 때 지우는 임시 파일이 없음
+
+    def __init__(self, layout, timestamp):
+        self.layout = layout
+        self.timestamp = timestamp
+        self._volumes = {} # 이 페이지가 기록한 볼륨 (이름 -> ArchiveVolume)
+        self._lock = threading.Lock()
+
+    @property
+    def zip_path(self):
+        """ 로그용: 이 페이지가 기록한 볼륨 경로 """
+        paths = sorted(volume.zip_path for volume in self._volumes.values())
+        if not paths:
+            return self.layout.folder
+        if len(paths) == 1:
+            return paths[0]
+        return f"{paths[0]} 외 {len(paths) - 1}개"
+
+    def reserve(self, filename, item=None):
+        volume = self.layout.volume_for(item or {})
+        with self._lock:
+            self._volumes[volume.name] = volume
+        return volume.name, volume.reserve_name(filename)
+
+    def add_file(self, archive_name, member_name, source, release):
+        return self._volumes[archive_name].add_file(self.timestamp, member_name, source, release)
+
+    def open_member(self, archive_name, member_name):
+        return self._volumes[archive_name].open_member(member_name)
+
+    def add_reference(self, archive_name, member_name, reference):
+        self._volumes[archive_name].add_reference(self.timestamp, member_name, reference)
+
+    def commit(self):
+        for volume in list(self._volumes.values()):
+            volume.commit_page(self.timestamp)
+
+    def abort(self):
+        for volume in list(self._volumes.values()):
+            volume.drop_page(self.timestamp)
+
+
+class ArchiveLayout:
+    """ 아카이브 구성 방식
+
+    - page: 목록 페이지(100개)마다 {timestamp}_photo.zip 하나 (기본값, 이전 버전과 같음)
+    - size: 크기 기준으로 이어 쓰는 볼륨 (Volumes/volume_0001.zip, ...)
+    - chat: 채팅방별 볼륨 (Chats/{채팅방}_0001.zip, ...)
+    - month: createdAt 기준 월별 볼륨 (Months/2023-11_0001.zip, ...)
+    볼륨은 volume_size를 넘으면 다음 번호로 넘어갑니다. 항목이 어느 볼륨의 어떤 멤버인지는
+    백업 색인(카탈로그)에 기록되므로, 찾기/복원 시 필요한 볼륨만 엽니다.
+    볼륨은 기존 파일 끝에 이어 쓰므로 원격 저장소(S3Storage)에는 page 구성만 사용할 수 있습니다.
+    """
+
+    MODES = ("page", "size", "chat", "month")
+    FOLDERS = {"size": "Volumes", "chat": "Chats", "month": "Months"}
+    DEFAULT_VOLUME_SIZE = 2 * 1024 * 1024 * 1024
+
+    def __init__(self, mode, backup_path, policy, volume_size=DEFAULT_VOLUME_SIZE, shard_key=None, storage=None):
+        if mode not in self.MODES:
+            raise ValueError(f"알 수 없는 아카이브 구성: {mode}")
+        self.storage = storage or LocalStorage()
+        if self.storage.remote and mode != "page":
+            raise ValueError(f"원격 저장소에는 page 구성만 사용할 수 있습니다: {mode}")
+        self.mode = mode
+        self.backup_path = backup_path
+        self.policy = policy
+        self.volume_size = max(1, int(volume_size))
+        self.shard_key = shard_key or (lambda mode, item: "volume") # shard_key(mode, item) -> 볼륨 이름 앞부분
+        self.folder = os.path.join(backup_path, self.FOLDERS[mode]) if mode != "page" else backup_path
+        self._lock = threading.Lock()
+        self._current = {} # 볼륨 이름 앞부분(대소문자 무시) -> 지금 이어 쓰는 볼륨
+        self._volumes = [] # 이번 실행에서 연 모든 볼륨
+
+    def open_page(self, timestamp, suffix="_photo.zip"):
+        """ 페이지 하나의 항목을 받을 아카이브 """
+        if self.mode == "page":
+            return PageArchiveWriter(os.path.join(self.backup_path, f"{timestamp}{suffix}"), self.policy, self.storage)
+        return VolumePageArchive(self, timestamp)
+
+    def volume_for(self, item):
+        """ 항목을 기록할 볼륨. 지금 볼륨이 volume_size를 넘었으면 다음 번호의 볼륨 """
+        key = self.shard_key(self.mode, item)
+        with self._lock:
+            volume = self._current.get(key.casefold())
+            if volume is None or volume.size >= self.volume_size:
+                volume = self._next_volume(key, volume.number + 1 if volume else 1)
+                self._current[key.casefold()] = volume
+                self._volumes.append(volume)
+            return volume
+
+    def _next_volume(self, key, number):
+        # 이전 실행에서 가득 찬 볼륨은 건너뛰고, 덜 찬 볼륨은 이어서 씀
+        os.makedirs(self.folder, exist_ok=True)
+        while True:
+            file_name = f"{key}_{number:04d}.zip"
+            zip_path = os.path.join(self.folder, file_name)
+            if not os.path.exists(zip_path) or os.path.getsize(zip_path) < self.volume_size:
+                return ArchiveVolume(zip_path, f"{self.FOLDERS[self.mode]}/{file_name}", number, self.policy)
+            number += 1
+
+    def close(self):
+        """ 열려 있는 볼륨을 모두 닫음 (실행 종료 시) """
+        with self._lock:
+            volumes = list(self._volumes)
+        for volume in volumes:
+            volume.close()
+
+    @classmethod
+    def repair_volumes(cls, backup_path, log):
+        """ 이전 실행이 추가 도중 중단된 볼륨을 마지막으로 닫은 상태로 복구 (구성 방식과 무관하게 모든 볼륨 폴더) """
+        for folder_name in cls.FOLDERS.values():
+            folder = os.path.join(glob.escape(backup_path), folder_name)
+            for temp_path in glob.glob(os.path.join(folder, f"*{ArchiveVolume.JOURNAL_SUFFIX}.tmp")):
+                os.remove(temp_path)
+            for journal_path in glob.glob(os.path.join(folder, f"*{ArchiveVolume.JOURNAL_SUFFIX}")):
+                ArchiveVolume.repair(journal_path)
+                log(f"중단된 볼륨을 마지막으로 확정된 상태로 되돌렸습니다: {journal_path[:-len(ArchiveVolume.JOURNAL_SUFFIX)]}")
+
+
+
+class LinkCsvWriter:
+    """ 링크 CSV(talkcloud_links_backup.csv)에 행을 페이지 단위로 덧붙이는 작성기
+
+    기존 파일은 다시 쓰지 않고 끝에 이어 쓰며, 페이지마다 디스크에 반영(fsync)하므로
+    중간에 중단되어도 그때까지 기록한 행은 남습니다.
+    """
+
+    HEADER = ["Date", "Title", "URL"]
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not is_new:
+            # 사용자가 편집해 마지막 줄바꿈이 없으면 새 행이 이전 행에 붙지 않도록 줄을 바꿈
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) not in (b'\n', b'\r')
+        # BOM은 새 파일의 맨 앞에만 씀 (엑셀에서 한글이 깨지지 않도록)
+        self._file = open(self.path, 'a', encoding='utf-8-sig' if is_new else 'utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        if is_new:
+            self._writer.writerow(self.HEADER)
+        elif needs_newline:
+            self._file.write('\r\n')
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        if self._file is None:
+            self._open()
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def iter_rows(path):
+        """ 기존 CSV의 데이터 행을 하나씩 (헤더 제외) """
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if row:
+                    yield row
+
+
+class PageJob:
+    """ 페이지 하나의 다운로드 진행 상황 (남은 항목 수, 성공 여부, 완료 이벤트) """
+
+    def __init__(self, timestamp, items, archive, index, resume_id=None, dedup_stats=None, log_suffix=None,
+                 incremental_resume_id=None):
+        self.timestamp = timestamp
+        self.items = items
+        self.archive = archive
+        self.index = index
+        self.log_suffix = log_suffix # 이 페이지의 목록 로그 접미사 (버릴 때 로그도 삭제, 없으면 로그 없음)
+        self.dedup_stats = dedup_stats or DedupStats()
+        self.resume_id = resume_id # 확정 시 색인에 기록할 이어받기 지점 (없으면 기록하지 않음)
+        self.incremental_resume_id = incremental_resume_id # 증분 실행의 이어받기 지점
+        self.success = True
+        self.failed_items = [] # 재시도 후에도 실패해 격리 목록으로 보낼 항목
+        self._remaining = len(items)
+        self._lock = threading.Lock()
+        self.done = threading.Event()
+        self.created_at = time.monotonic()
+        self.finished_at = self.created_at # 마지막 항목이 끝난 시각 (페이지 다운로드 시간 계산용)
+        if not items:
+            self.done.set()
+
+    def quarantine_item(self, item, error):
+        """ 재시도를 모두 실패한 항목을 기록 (페이지 자체는 계속 진행) """
+        with self._lock:
+            self.failed_items.append((item, str(error)))
+
+    def item_finished(self, success):
+        with self._lock:
+            if not success:
+                self.success = False
+            self._remaining -= 1
+            if self._remaining <= 0:
+                self.finished_at = time.monotonic()
+                self.done.set()
+
+    def cancel(self):
+        """ 아직 처리되지 않은 항목을 건너뛰도록 실패로 표시 """
+        with self._lock:
+            self.success = False
+
+
+class HashingWriter:
+    """ 기록하는 내용의 SHA-256과 크기를 함께 계산하는 파일 객체 래퍼 """
+
+    def __init__(self, dest):
+        self.dest = dest
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.dest.write(data)
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+class DownloadCheckpoint:
+    """ 구간(Range) 다운로드의 중간 파일과 진행 상황
+
+    받은 바이트는 {partial_dir}/{key}.part 의 제자리에 기록하고, 구간별 진행 바이트 수는
+    {key}.json 에 주기적으로 저장합니다. 중단되었다가 다시 받을 때 파일 크기와 서버의
+    ETag/Last-Modified가 같으면 각 구간을 멈춘 지점부터 이어서 받습니다.
+    """
+
+    def __init__(self, partial_dir, key):
+        self.data_path = os.path.join(partial_dir, f"{key}.part")
+        self.state_path = os.path.join(partial_dir, f"{key}.json")
+        self._lock = threading.Lock()
+        self.total = None
+        self.validator = None
+        self.segments = [] # [시작, 끝(포함), 받은 바이트 수]
+
+    def load(self, total, validator):
+        """ 저장된 진행 상황이 같은 파일의 것이면 불러오고 True """
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state["total"] != total or state["validator"] != validator:
+                return False
+            if os.path.getsize(self.data_path) != total:
+                return False
+        except (OSError, ValueError, KeyError):
+            return False
+        self.total = total
+        self.validator = validator
+        self.segments = [list(segment) for segment in state["segments"]]
+        return True
+
+    def reset(self, total, validator, segment_count):
+        """ 처음부터 받도록 total 크기의 빈 파일을 만들고 segment_count개 구간으로 나눔 """
+        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        with open(self.data_path, 'wb') as f:
+            f.truncate(total)
+        self.total = total
+        self.validator = validator
+        segment_size = -(-total // segment_count)
+        self.segments = [
+            [start, min(start + segment_size, total) - 1, 0]
+            for start in range(0, total, segment_size)
+        ]
+        self.save()
+
+    def pending_segments(self):
+        """ 아직 덜 받은 구간의 (번호, 이어받을 위치, 끝) """
+        with self._lock:
+            return [
+                (i, start + done, end)
+                for i, (start, end, done) in enumerate(self.segments)
+                if start + done <= end
+            ]
+
+    def done_bytes(self):
+        with self._lock:
+            return sum(segment[2] for segment in self.segments)
+
+    def advance(self, segment_index, size):
+        with self._lock:
+            self.segments[segment_index][2] += size
+
+    def save(self):
+        with self._lock:
+            state = {"total": self.total, "validator": self.validator, "segments": self.segments}
+            with open(f"{self.state_path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(f"{self.state_path}.tmp", self.state_path)
+
+    def remove(self):
+        for path in (self.data_path, self.state_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class BackupIndex:
+    """ drawerId별 백업 상태를 기록하는 로컬 색인 (백업 폴더의 backup_index.sqlite3)
+
+    상태(status)
+    - stored: 작성 중인 아카이브(.part)에 들어감. 아카이브가 확정되면 done 으로 바뀜
+    - done: 확정된 아카이브(또는 링크 로그)에 백업 완료
+    - failed: 재시도 후에도 실패하여 격리됨 (item_json으로 목록 재요청 없이 다시 시도)
+
+    내용(SHA-256)이 이미 백업된 파일과 같은 항목은 바이트를 다시 저장하지 않고,
+    dedup_of 열에 원본 drawerId를 기록해 참조로만 남깁니다. 원본은 peers로 받은 다른 유형 폴더
+    (사진 <-> 파일)의 색인에서도 찾으며, 그 경우 원본이 있는 폴더 이름을 dedup_folder 열에 함께 기록합니다.
+    다른 폴더의 색인은 읽기 전용으로만 열고, 확정(done)된 원본만 참조합니다.
+
+    이어받기 지점(resume_id)은 meta 테이블에 페이지 확정과 같은 트랜잭션으로 기록하므로,
+    시작할 때 로그 파일을 모두 훑지 않고 바로 찾을 수 있습니다. 증분 실행은 별도의 지점
+    (incremental_resume_id)과 시작 시점의 경계(incremental_boundary)를 기록하고, 끝까지 마치면 지웁니다.
+
+    link_keys 테이블은 링크 CSV에 이미 기록한 링크의 키(링크 id, 또는 이전 버전 CSV 행의 해시)로,
+    CSV를 다시 읽지 않고 중복 행을 걸러내는 데 사용합니다.
+
+    verified_files 테이블은 무결성 검사를 통과한 아카이브/목록 로그의 (mtime, 크기)로,
+    파일이 바뀌지 않았으면 다음 검사에서 건너뛰는 데 사용합니다.
+
+    items 테이블은 항목 -> (아카이브, 멤버) 카탈로그를 겸하며, 채팅방 이름과 생성 시각(chat_name, created_at)을
+    함께 기록해 찾기/복원 시 필요한 아카이브만 열 수 있게 합니다. (find_items)
+    """
+
+    QUERY_BATCH_SIZE = 500 # IN (...) 조회 한 번에 넣을 키 수 (SQLite 변수 개수 제한 이내)
+
+    FILE_NAME = "backup_index.sqlite3"
+    LEGACY_QUARANTINE_FILE = "failed_items.json"
+
+    def __init__(self, backup_path, storage=None, peers=None):
+        self.backup_path = backup_path
+        self.storage = storage or LocalStorage() # 아카이브가 있는 저장소 (recover()에서 확정 여부 확인용)
+        self.path = os.path.join(backup_path, self.FILE_NAME)
+        self.peers = dict(peers or {}) # 중복 원본을 함께 찾을 다른 유형 폴더 {폴더 이름: 경로}
+        self._peer_conns = {} # 폴더 이름 -> 읽기 전용 연결 (처음 필요할 때 엶)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS items (
+                    drawer_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    archive TEXT,
+                    member TEXT,
+                    size INTEGER,
+                    sha256 TEXT,
+                    page_timestamp INTEGER,
+                    item_json TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS link_keys (key TEXT PRIMARY KEY) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS verified_files (
+                    name TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    verified_at INTEGER
+                ) WITHOUT ROWID;
+            """)
+            # 이후 버전에서 추가된 열 (기존 색인 파일도 그대로 사용)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(items)")}
+            new_columns = {
+                "remote_hash": "TEXT", "dedup_of": "TEXT", "dedup_folder": "TEXT", "chat_name": "TEXT", "created_at": "INTEGER"
+            }
+            for column, column_type in new_columns.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE items ADD COLUMN {column} {column_type}")
+            self._conn.executescript("""
+                CREATE INDEX IF NOT EXISTS items_status ON items (status);
+                CREATE INDEX IF NOT EXISTS items_archive ON items (archive);
+                CREATE INDEX IF NOT EXISTS items_sha256 ON items (sha256);
+                CREATE INDEX IF NOT EXISTS items_remote_hash ON items (remote_hash);
+                CREATE INDEX IF NOT EXISTS items_page ON items (page_timestamp);
+                CREATE INDEX IF NOT EXISTS items_chat_name ON items (chat_name);
+                CREATE INDEX IF NOT EXISTS items_size ON items (size);
+            """)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            with self._conn:
+                yield self._conn
+
+    def close(self):
+        with self._lock:
+            for conn in self._peer_conns.values():
+                conn.close()
+            self._peer_conns.clear()
+            self._conn.close()
+
+    def _peer_connection(self, folder):
+        """ 다른 유형 폴더 색인의 읽기 전용 연결. 아직 색인이 없으면 None (다음에 다시 시도) """
+        conn = self._peer_conns.get(folder)
+        if conn is None:
+            path = os.path.join(self.peers[folder], self.FILE_NAME)
+            if not os.path.exists(path):
+                return None
+            try:
+                conn = sqlite3.connect(f"{pathlib.Path(path).as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            except sqlite3.Error:
+                return None
+            self._peer_conns[folder] = conn
+        return conn
+
+    def _query_peer(self, folder, sql, params):
+        """ 다른 유형 폴더 색인 조회 (self._lock 안에서 호출). 열 수 없거나 이전 버전 색인이면 빈 목록 """
+        conn = self._peer_connection(folder)
+        if conn is None:
+            return []
+        try:
+            return conn.execute(sql, params).fetchall()
+        except sqlite3.Error:
+            return []
+
+    # --- meta ---
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def set_meta(self, key, value):
+        with self._transaction() as conn:
+            self._set_meta(conn, key, value)
+
+    def clear_meta(self, *keys):
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM meta WHERE key = ?", [(key,) for key in keys])
+
+    def get_resume_id(self):
+        return self.get_meta("resume_id")
+
+    def get_newest_done_id(self):
+        """ 백업 완료된 항목 중 가장 큰(최신) drawerId. 없으면 None """
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(CAST(drawer_id AS INTEGER)) FROM items WHERE status = 'done'").fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def catalog_fields(item):
+        """ 목록 항목에서 카탈로그에 함께 기록할 (채팅방 이름, 생성 시각 ms) """
+        try:
+            created_at = int(item.get('createdAt')) if item.get('createdAt') else None
+        except (TypeError, ValueError):
+            created_at = None
+        return item.get('chatName'), created_at
+
+    # --- 항목 상태 ---
+
+    def is_done(self, drawer_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM items WHERE drawer_id = ? AND status = 'done'", (str(drawer_id),)
+            ).fetchone()
+        return row is not None
+
+    def mark_stored(self, drawer_id, archive, member, size, sha256, page_timestamp, remote_hash=None, dedup_of=None,
+                    dedup_folder=None, chat_name=None, created_at=None):
+        """ 작성 중인 아카이브에 항목 하나가 들어갔음(또는 중복 참조로 기록됨)을 기록 """
+        with self._transaction() as conn:
+            conn.execute(
+                """INSERT INTO items (drawer_id, status, archive, member, size, sha256, page_timestamp,
+                                      remote_hash, dedup_of, dedup_folder, chat_name, created_at, updated_at)
+                   VALUES (?, 'stored', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(drawer_id) DO UPDATE SET
+                       status = 'stored', archive = excluded.archive, member = excluded.member,
+                       size = excluded.size, sha256 = excluded.sha256,
+                       page_timestamp = excluded.page_timestamp, remote_hash = excluded.remote_hash,
+                       dedup_of = excluded.dedup_of, dedup_folder = excluded.dedup_folder,
+                       chat_name = excluded.chat_name, created_at = excluded.created_at, updated_at = excluded.updated_at
+                   WHERE items.status != 'done'""",
+                (str(drawer_id), archive, member, size, sha256, page_timestamp,
+                 remote_hash, dedup_of, dedup_folder, chat_name, created_at, int(time.time()))
+            )
+
+    def _find_original(self, column, value, page_timestamp):
+        # 확정된 아카이브에 있거나, 지금 작성 중인 같은 페이지에 있는 원본만 참조 대상으로 삼음
+        # 이 폴더에 없으면 다른 유형 폴더에서 확정된 원본을 찾음
+        with self._lock:
+            row = self._conn.execute(
+                f"""SELECT drawer_id, archive, member, size FROM items
+                    WHERE {column} = ? AND dedup_of IS NULL AND member IS NOT NULL
+                      AND (status = 'done' OR (status = 'stored' AND page_timestamp = ?))
+                    LIMIT 1""",
+                (value, page_timestamp)
+            ).fetchone()
+            if row:
+                return (*row, None)
+            for folder in self.peers:
+                rows = self._query_peer(
+                    folder,
+                    f"""SELECT drawer_id, archive, member, size FROM items
+                        WHERE {column} = ? AND dedup_of IS NULL AND member IS NOT NULL AND status = 'done'
+                        LIMIT 1""",
+                    (value,)
+                )
+                if rows:
+                    return (*rows[0], folder)
+        return None
+
+    def find_by_sha256(self, sha256, page_timestamp):
+        """ 같은 내용이 이미 저장된 원본 (drawer_id, archive, member, size, 폴더). 폴더는 다른 유형 폴더일 때만 """
+        return self._find_original("sha256", sha256, page_timestamp)
+
+    def find_by_remote_hash(self, remote_hash, page_timestamp):
+        """ 목록 API가 알려 준 크기/해시가 같은 원본 (drawer_id, archive, member, size, 폴더) """
+        return self._find_original("remote_hash", remote_hash, page_timestamp)
+
+    def find_by_size(self, size, page_timestamp):
+        """ 크기가 같은 원본. 없으면 이 크기의 파일은 내용을 받아 보지 않아도 중복이 아님 """
+        return self._find_original("size", size, page_timestamp)
+
+    def commit_page(self, page_timestamp, resume_id=None, failed_items=(), incremental_resume_id=None):
+        """ 페이지 확정: 그 페이지의 stored 항목을 done 으로 바꾸고, 실패 항목 격리와 이어받기 지점 기록을 한 번에 처리 """
+        now = int(time.time())
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE items SET status = 'done', updated_at = ? WHERE page_timestamp = ? AND status = 'stored'",
+                (now, page_timestamp)
+            )
+            self._quarantine(conn, failed_items, None, now)
+            if resume_id is not None:
+                self._set_meta(conn, "resume_id", resume_id)
+            if incremental_resume_id is not None:
+                self._set_meta(conn, "incremental_resume_id", incremental_resume_id)
+
+    def discard_page(self, page_timestamp):
+        """ 버려진 페이지의 stored 항목 기록 삭제 """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM items WHERE page_timestamp = ? AND status = 'stored'", (page_timestamp,))
+
+    def record_done(self, items, archive, page_timestamp, resume_id=None, link_keys=(), incremental_resume_id=None):
+        """ 아카이브 없이 바로 완료되는 항목(링크 등)을 done 으로 기록. link_keys는 CSV에 기록한 링크 키 """
+        now = int(time.time())
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO link_keys (key) VALUES (?)", [(key,) for key in link_keys])
+            conn.executemany(
+                """INSERT INTO items (drawer_id, status, archive, page_timestamp, updated_at)
+                   VALUES (?, 'done', ?, ?, ?)
+                   ON CONFLICT(drawer_id) DO UPDATE SET status = 'done', updated_at = excluded.updated_at""",
+                [(str(item['drawerId']), archive, page_timestamp, now) for item in items if 'drawerId' in item]
+            )
+            if resume_id is not None:
+                self._set_meta(conn, "resume_id", resume_id)
+            if incremental_resume_id is not None:
+                self._set_meta(conn, "incremental_resume_id", incremental_resume_id)
+
+    # --- 링크 CSV 중복 확인 ---
+
+    def find_link_keys(self, keys):
+        """ keys 중 이미 CSV에 기록된 키의 집합 """
+        keys = list(keys)
+        found = set()
+        with self._lock:
+            for start in range(0, len(keys), self.QUERY_BATCH_SIZE):
+                batch = keys[start:start + self.QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                found.update(
+                    row[0] for row in self._conn.execute(f"SELECT key FROM link_keys WHERE key IN ({placeholders})", batch)
+                )
+        return found
+
+    def add_link_keys(self, keys):
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO link_keys (key) VALUES (?)", [(key,) for key in keys])
+
+    def mark_link_csv_imported(self):
+        with self._transaction() as conn:
+            self._set_meta(conn, "link_csv_imported", 1)
+
+    def _quarantine(self, conn, failed_items, archive, now):
+        for item, error in failed_items:
+            conn.execute(
+                """INSERT INTO items (drawer_id, status, archive, item_json, error, attempts, updated_at)
+                   VALUES (?, 'failed', ?, ?, ?, 1, ?)
+                   ON CONFLICT(drawer_id) DO UPDATE SET
+                       status = 'failed', item_json = excluded.item_json, error = excluded.error,
+                       attempts = items.attempts + 1, updated_at = excluded.updated_at
+                   WHERE items.status != 'done'""",
+                (str(item.get('drawerId', item.get('id'))), archive,
+                 json.dumps(item, ensure_ascii=False), error, now)
+            )
+
+    def failed_items(self):
+        """ 격리된 항목의 원본 목록 데이터 """
+        with self._lock:
+            rows = self._conn.execute("SELECT item_json FROM items WHERE status = 'failed'").fetchall()
+        return [json.loads(row[0]) for row in rows if row[0]]
+
+    # --- 무결성 검사 ---
+
+    def archive_members(self):
+        """ 바이트가 저장된 완료 항목을 아카이브별로: {archive: [(drawer_id, member, size, page_timestamp)]} """
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT archive, drawer_id, member, size, page_timestamp FROM items
+                   WHERE status = 'done' AND dedup_of IS NULL AND member IS NOT NULL"""
+            ).fetchall()
+        archives = {}
+        for archive, *entry in rows:
+            archives.setdefault(archive, []).append(tuple(entry))
+        return archives
+
+    def unarchived_items(self):
+        """ 완료로 기록되었지만 아카이브에서 멤버를 찾지 못한 항목 (기존 로그로 색인을 만들 때 zip에 없던 항목): [(drawer_id, page_timestamp)] """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT drawer_id, page_timestamp FROM items WHERE status = 'done' AND dedup_of IS NULL AND member IS NULL"
+            ).fetchall()
+
+    def item_statuses(self, drawer_ids):
+        """ drawer_ids 중 색인에 있는 항목의 {drawer_id: status} """
+        drawer_ids = [str(drawer_id) for drawer_id in drawer_ids]
+        statuses = {}
+        with self._lock:
+            for start in range(0, len(drawer_ids), self.QUERY_BATCH_SIZE):
+                batch = drawer_ids[start:start + self.QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                statuses.update(self._conn.execute(
+                    f"SELECT drawer_id, status FROM items WHERE drawer_id IN ({placeholders})", batch
+                ).fetchall())
+        return statuses
+
+    def find_dependents(self, drawer_ids, folder=None):
+        """ drawer_ids를 원본으로 참조하는 완료 항목: [(drawer_id, page_timestamp)]
+
+        folder가 있으면 그 (다른 유형) 폴더에 있는 원본을 참조하는 항목을 찾습니다.
+        """
+        drawer_ids = [str(drawer_id) for drawer_id in drawer_ids]
+        rows = []
+        with self._lock:
+            for start in range(0, len(drawer_ids), self.QUERY_BATCH_SIZE):
+                batch = drawer_ids[start:start + self.QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows += self._conn.execute(
+                    f"""SELECT drawer_id, page_timestamp FROM items
+                        WHERE status = 'done' AND dedup_folder IS ? AND dedup_of IN ({placeholders})""",
+                    [folder] + batch
+                ).fetchall()
+        return rows
+
+    def stored_item_json(self, drawer_id):
+        """ 격리되었던 적이 있어 색인에 남아 있는 원본 목록 데이터 (없으면 None) """
+        with self._lock:
+            row = self._conn.execute("SELECT item_json FROM items WHERE drawer_id = ?", (str(drawer_id),)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def mark_for_redownload(self, failed_items):
+        """ 검사에서 문제가 발견된 항목을 상태와 무관하게 failed 로 바꿔 다음 백업 때 다시 받게 함. failed_items: [(item, error)] """
+        now = int(time.time())
+        with self._transaction() as conn:
+            conn.executemany(
+                """INSERT INTO items (drawer_id, status, item_json, error, updated_at)
+                   VALUES (?, 'failed', ?, ?, ?)
+                   ON CONFLICT(drawer_id) DO UPDATE SET
+                       status = 'failed', item_json = excluded.item_json, error = excluded.error,
+                       attempts = 0, updated_at = excluded.updated_at""",
+                [(str(item['drawerId']), json.dumps(item, ensure_ascii=False), error, now) for item, error in failed_items]
+            )
+
+    def verified_files(self):
+        """ 검사를 통과한 파일의 {이름: (mtime_ns, 크기)} """
+        with self._lock:
+            return {name: (mtime_ns, size) for name, mtime_ns, size in self._conn.execute(
+                "SELECT name, mtime_ns, size FROM verified_files"
+            )}
+
+    def mark_verified(self, name, mtime_ns, size):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO verified_files (name, mtime_ns, size, verified_at) VALUES (?, ?, ?, ?)",
+                (name, mtime_ns, size, int(time.time()))
+            )
+
+    def forget_verified(self, name):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM verified_files WHERE name = ?", (name,))
+
+    # --- 카탈로그 조회 ---
+
+    def find_items(self, chat=None, month=None, name=None):
+        """ 조건에 맞는 백업 완료 항목을 아카이브 순서로 반환
+
+        chat은 채팅방 이름, month는 'YYYY-MM'(생성 시각 기준), name은 멤버 이름에 포함된 문자열입니다.
+        중복 참조 항목은 바이트가 있는 원본의 아카이브/멤버(archive, source_member)를 돌려주고,
+        원본이 다른 유형 폴더에 있으면 그 폴더 이름(source_folder)을 함께 돌려줍니다. (같은 폴더면 None)
+        """
+        conditions = ["i.status = 'done'", "i.member IS NOT NULL"]
+        params = []
+        if chat:
+            conditions.append("i.chat_name = ?")
+            params.append(chat)
+        if month:
+            start = datetime.strptime(month, "%Y-%m")
+            end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+            conditions.append("i.created_at >= ? AND i.created_at < ?")
+            params += [int(start.timestamp() * 1000), int(end.timestamp() * 1000)]
+        if name:
+            conditions.append("i.member LIKE ? ESCAPE '\\'")
+            params.append("%" + re.sub(r'([%_\\])', r'\\\1', name) + "%")
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT i.drawer_id, COALESCE(o.archive, i.archive), i.member, COALESCE(o.member, i.member),
+                           i.size, i.chat_name, i.created_at, i.dedup_folder, i.dedup_of
+                    FROM items i LEFT JOIN items o ON o.drawer_id = i.dedup_of AND i.dedup_folder IS NULL
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY 2, 4""",
+                params
+            ).fetchall()
+            keys = ("drawer_id", "archive", "member", "source_member", "size", "chat_name", "created_at", "source_folder")
+            entries = [dict(zip(keys, row)) for row in rows]
+            # 다른 유형 폴더에 있는 원본의 아카이브/멤버
+            peer_refs = {}
+            for entry, row in zip(entries, rows):
+                if entry["source_folder"]:
+                    peer_refs.setdefault(entry["source_folder"], {}).setdefault(row[-1], []).append(entry)
+            for folder, refs in peer_refs.items():
+                if folder not in self.peers:
+                    continue
+                original_ids = list(refs)
+                for start in range(0, len(original_ids), self.QUERY_BATCH_SIZE):
+                    batch = original_ids[start:start + self.QUERY_BATCH_SIZE]
+                    placeholders = ",".join("?" * len(batch))
+                    for drawer_id, archive, member in self._query_peer(
+                        folder, f"SELECT drawer_id, archive, member FROM items WHERE drawer_id IN ({placeholders})", batch
+                    ):
+                        for entry in refs[drawer_id]:
+                            entry.update(archive=archive, source_member=member)
+        entries.sort(key=lambda entry: (entry["source_folder"] or "", entry["archive"] or "", entry["source_member"] or ""))
+        return entries
+
+    # --- 시작 시 정리 / 기존 백업 가져오기 ---
+
+    def recover(self):
+        """ 이전 실행이 비정상 종료되어 남은 stored 항목 정리
+
+        확정된 아카이브에 멤버(중복 참조는 매니페스트의 참조)가 실제로 있으면 done 으로, 아니면 기록을 지웁니다.
+        중복 참조 항목은 원본(다른 유형 폴더의 원본이면 그 폴더의 색인에서)도 done 일 때만 남깁니다.
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT drawer_id, archive, member, dedup_of, dedup_folder FROM items WHERE status = 'stored'"
+            ).fetchall()
+            contents = {archive: self._read_archive_contents(archive) for archive in {row[1] for row in rows}}
+            references = []
+            for drawer_id, archive, member, dedup_of, dedup_folder in rows:
+                names, referenced = contents[archive]
+                if dedup_of is None and member in names:
+                    conn.execute("UPDATE items SET status = 'done' WHERE drawer_id = ?", (drawer_id,))
+                elif dedup_of is not None and member in referenced:
+                    if dedup_folder is None:
+                        references.append((drawer_id,))
+                    elif dedup_folder in self.peers and self._query_peer(
+                        dedup_folder, "SELECT 1 FROM items WHERE drawer_id = ? AND status = 'done'", (dedup_of,)
+                    ):
+                        conn.execute("UPDATE items SET status = 'done' WHERE drawer_id = ?", (drawer_id,))
+            conn.executemany(
+                """UPDATE items SET status = 'done' WHERE drawer_id = ?
+                   AND EXISTS (SELECT 1 FROM items o WHERE o.drawer_id = items.dedup_of AND o.status = 'done')""",
+                references
+            )
+            conn.execute("DELETE FROM items WHERE status = 'stored'")
+
+    def _read_archive_contents(self, archive):
+        """ 확정된 아카이브의 (멤버 이름 집합, 매니페스트에 참조로 기록된 멤버 이름 집합). 없거나 읽을 수 없으면 빈 집합 """
+        try:
+            with self.storage.open_reader(self.backup_path, archive or "") as f, zipfile.ZipFile(f) as zf:
+                names = set(zf.namelist())
+                referenced = set()
+                for name in names:
+                    if name.startswith("_manifest") and name.endswith(".json"):
+                        referenced.update(ref["member"] for ref in json.loads(zf.read(name)).get("references", []))
+                return names, referenced
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return set(), set()
+
+    def import_page_logs(self, log_suffix, check_zip, build_member_name, log):
+        """ (최초 1회) 기존 {timestamp}_list.json / _photo.zip 쌍으로부터 색인을 만듦 """
+        if self.get_meta("imported"):
+            return
+
+        json_files = glob.glob(os.path.join(glob.escape(self.backup_path), f"*{log_suffix}"))
+        if json_files:
+            log(f"기존 백업 기록 {len(json_files)}개로 색인을 만듭니다. (최초 1회)")
+
+        latest_timestamp = 0
+        latest_id_str = None
+        now = int(time.time())
+        with self._transaction() as conn:
+            for json_file_path in json_files:
+                try:
+                    base_path, _ = json_file_path.rsplit(log_suffix, 1)
+                    timestamp = int(os.path.basename(base_path))
+                    archive_name = os.path.basename(json_file_path)
+                    members = {}
+
+                    # 사진/파일 백업의 경우, .zip 파일이 있어야 '성공'으로 간주
+                    if check_zip:
+                        zip_file_path = f'{base_path}_photo.zip'
+                        if not os.path.exists(zip_file_path):
+                            log(f"경고: {json_file_path} 파일은 있으나, 짝이 되는 .zip 파일이 없어 건너뜁니다.")
+                            continue
+                        archive_name = os.path.basename(zip_file_path)
+                        with zipfile.ZipFile(zip_file_path) as zf:
+                            members = {info.filename: info.file_size for info in zf.infolist()}
+
+                    with open(json_file_path, 'r', encoding='utf-8') as f:
+                        items = json.load(f).get('items') or []
+
+                    rows = []
+                    for item in items:
+                        member = build_member_name(item) if check_zip else None
+                        if member not in members:
+                            member = None
+                        chat_name, created_at = self.catalog_fields(item)
+                        rows.append((str(item['drawerId']), archive_name, member, members.get(member), timestamp,
+                                     chat_name, created_at, now))
+                    conn.executemany(
+                        """INSERT OR REPLACE INTO items (drawer_id, status, archive, member, size, page_timestamp,
+                                                         chat_name, created_at, updated_at)
+                           VALUES (?, 'done', ?, ?, ?, ?, ?, ?, ?)""",
+                        rows
+                    )
+
+                    if items and timestamp > latest_timestamp:
+                        latest_timestamp = timestamp
+                        latest_id_str = items[-1]['drawerId'] # 공통: drawerId
+                except Exception as e:
+                    log(f"경고: {json_file_path} 파일 처리 중 오류 발생: {e}")
+
+            # 이전 버전에서 쓰던 격리 목록 파일도 함께 가져옴
+            legacy_path = os.path.join(self.backup_path, self.LEGACY_QUARANTINE_FILE)
+            if os.path.exists(legacy_path):
+                try:
+                    with open(legacy_path, 'r', encoding='utf-8') as f:
+                        entries = json.load(f)
+                    self._quarantine(conn, [(entry["item"], entry.get("error")) for entry in entries.values()], None, now)
+                except Exception as e:
+                    log(f"경고: {legacy_path} 파일 처리 중 오류 발생: {e}")
+
+            if latest_id_str is not None:
+                self._set_meta(conn, "resume_id", latest_id_str)
+            self._set_meta(conn, "imported", 1)
+            self._set_meta(conn, "catalog_filled", 1)
+
+        if os.path.exists(legacy_path):
+            os.replace(legacy_path, f"{legacy_path}.imported")
+
+    def fill_catalog(self, log_suffix, log):
+        """ (최초 1회) 카탈로그 열이 생기기 전에 백업된 항목의 채팅방 이름/생성 시각을 목록 로그로 채움 """
+        if self.get_meta("catalog_filled"):
+            return
+        json_files = glob.glob(os.path.join(glob.escape(self.backup_path), f"*{log_suffix}"))
+        if json_files:
+            log(f"목록 로그 {len(json_files)}개로 카탈로그(채팅방/날짜)를 채웁니다. (최초 1회)")
+        with self._transaction() as conn:
+            for json_file_path in json_files:
+                try:
+                    with open(json_file_path, 'r', encoding='utf-8') as f:
+                        items = json.load(f).get('items') or []
+                except Exception as e:
+                    log(f"경고: {json_file_path} 파일 처리 중 오류 발생: {e}")
+                    continue
+                conn.executemany(
+                    "UPDATE items SET chat_name = ?, created_at = ? WHERE drawer_id = ? AND chat_name IS NULL",
+                    [(*self.catalog_fields(item), str(item['drawerId'])) for item in items if 'drawerId' in item]
+                )
+            self._set_meta(conn, "catalog_filled", 1)
+
+
+class ArchiveVerifier:
+    """ 아카이브 하나의 무결성 검사 (ProcessPoolExecutor에서 실행되는 부분)
+
+    기대하는 멤버를 끝까지 읽어 CRC를 확인하고, 크기를 색인/목록 로그의 값과 비교합니다.
+    """
+
+    READ_CHUNK_SIZE = 1024 * 1024
+
+    @classmethod
+    def check_archive(cls, zip_path, expected):
+        """ expected: [(drawer_id, member, 기대 크기들)]
+
+        반환: (문제 목록 [(drawer_id, 사유)], 색인에 없는 멤버 수)
+        """
+        problems = []
+        try:
+            with zipfile.ZipFile(zip_path) as zf:
+                infos = {info.filename: info for info in zf.infolist()}
+                for drawer_id, member, sizes in expected:
+                    info = infos.pop(member, None)
+                    if info is None:
+                        problems.append((drawer_id, "아카이브에 멤버가 없음"))
+                        continue
+                    wrong_size = next((size for size in sizes if size is not None and size != info.file_size), None)
+                    if wrong_size is not None:
+                        problems.append((drawer_id, f"크기 불일치 (아카이브 {info.file_size}, 기대 {wrong_size})"))
+                        continue
+                    try:
+                        with zf.open(info) as f:
+                            while f.read(cls.READ_CHUNK_SIZE):
+                                pass
+                    except Exception as e:
+                        problems.append((drawer_id, f"손상 ({e})"))
+        except (OSError, zipfile.BadZipFile) as e:
+            return [(drawer_id, f"아카이브를 열 수 없음 ({e})") for drawer_id, _, _ in expected], 0
+        unknown_count = sum(1 for name in infos if not name.startswith("_manifest"))
+        return problems, unknown_count
+
+
+class DedupStats:
+    """ 한 번의 백업 실행에서 중복 제거로 아낀 항목 수와 바이트 수 """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items = 0
+        self.bytes_saved = 0
+        self.transfers_skipped = 0
+
+    def add(self, size, transfer_skipped):
+        with self._lock:
+            self.items += 1
+            self.bytes_saved += size or 0
+            if transfer_skipped:
+                self.transfers_skipped += 1
+
+
+class BackupMetrics:
+    """ 백업 진행 상황 계측: 카운터, 지연 시간 히스토그램, 진행률/ETA
+
+    여러 스레드에서 동시에 기록하므로 모든 값은 하나의 잠금으로 보호합니다.
+    snapshot()은 JSON으로, prometheus_text()는 Prometheus textfile 형식으로 내보냅니다.
+    """
+
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120) # 초 단위 (Prometheus 누적 버킷)
+    METRIC_PREFIX = "talkcloud_backup"
+    DONE_COUNTERS = ("items_downloaded", "items_deduplicated", "items_skipped", "items_quarantined", "links_recorded")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {} # 이름 -> [버킷별 개수..., +Inf 개수, 합계]
+        self._transfer_started = None # 2단계 수집: 목록 수집이 끝나고 다운로드를 시작한 시각 (ETA 계산 기준)
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_gauge(self, name, delta):
+        with self._lock:
+            self.gauges[name] = self.gauges.get(name, 0) + delta
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = [0] * (len(self.LATENCY_BUCKETS) + 2)
+            for i, bound in enumerate(self.LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+                    break
+            else:
+                histogram[len(self.LATENCY_BUCKETS)] += 1
+            histogram[-1] += seconds
+
+    def start_transfer_clock(self):
+        """ 목록을 모두 받은 뒤 다운로드를 시작할 때 호출. 이후 속도/ETA는 이 시각부터 계산 (처음 한 번만 기록) """
+        with self._lock:
+            if self._transfer_started is None:
+                self._transfer_started = time.monotonic()
+
+    @contextmanager
+    def timer(self, name):
+        """ with 블록의 소요 시간을 히스토그램 name에 기록 """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start)
+
+    def progress(self):
+        """ 진행률: 목록에서 찾은 항목 수 대비 처리한 항목 수, 평균 속도, 남은 시간 추정
+
+        목록에 크기가 있는 항목은 바이트 기준(bytes_discovered 대비 bytes_processed)으로 남은 시간을 계산해,
+        큰 파일과 작은 파일이 섞여 있어도 항목 수 기준보다 정확합니다.
+        """
+        with self._lock:
+            discovered = self.counters.get("items_discovered", 0)
+            done = sum(self.counters.get(name, 0) for name in self.DONE_COUNTERS)
+            downloaded_bytes = self.counters.get("bytes_downloaded", 0)
+            discovered_bytes = self.counters.get("bytes_discovered", 0)
+            processed_bytes = self.counters.get("bytes_processed", 0)
+            listing = self.gauges.get("listings_active", 0) > 0
+            transfer_started = self._transfer_started
+        now = time.monotonic()
+        elapsed = max(now - self._started, 1e-6)
+        transfer_elapsed = max(now - transfer_started, 1e-6) if transfer_started is not None else elapsed
+        items_per_sec = done / elapsed
+        # 목록 수집이 끝나지 않았다면 지금까지 찾은 항목 기준의 추정치
+        if discovered_bytes and processed_bytes:
+            eta = max(discovered_bytes - processed_bytes, 0) / (processed_bytes / transfer_elapsed)
+        elif done:
+            eta = max(discovered - done, 0) / (done / transfer_elapsed)
+        else:
+            eta = None
+        return {
+            "items_discovered": discovered,
+            "items_done": done,
+            "bytes_discovered": discovered_bytes,
+            "bytes_processed": processed_bytes,
+            "bytes_downloaded": downloaded_bytes,
+            "elapsed_seconds": elapsed,
+            "items_per_sec": items_per_sec,
+            "bytes_per_sec": downloaded_bytes / elapsed,
+            "eta_seconds": eta,
+            "listing": listing,
+        }
+
+    def snapshot(self):
+        """ JSON으로 저장할 현재 상태 """
+        with self._lock:
+            histograms = {}
+            for name, histogram in self.histograms.items():
+                count = sum(histogram[:-1])
+                histograms[name] = {
+                    "buckets": dict(zip([str(b) for b in self.LATENCY_BUCKETS] + ["+Inf"], histogram[:-1])),
+                    "count": count,
+                    "sum": histogram[-1],
+                    "avg": histogram[-1] / count if count else 0,
+                }
+            snapshot = {
+                "started_at": self.started_at,
+                "updated_at": time.time(),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": histograms,
+            }
+        snapshot["progress"] = self.progress()
+        return snapshot
+
+    def prometheus_text(self):
+        """ node_exporter textfile collector 형식 """
+        snapshot = self.snapshot()
+        prefix = self.METRIC_PREFIX
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        gauges = dict(snapshot["gauges"])
+        progress = snapshot["progress"]
+        for name in ("items_per_sec", "bytes_per_sec", "elapsed_seconds", "eta_seconds"):
+            if progress[name] is not None:
+                gauges[name] = progress[name]
+        for name, value in sorted(gauges.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        for name, histogram in sorted(snapshot["histograms"].items()):
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum {histogram['sum']}")
+            lines.append(f"{metric}_count {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, folder, json_name, prom_name):
+        """ JSON/Prometheus 스냅샷을 임시 파일에 쓴 뒤 교체 (수집기가 반쯤 쓴 파일을 읽지 않도록) """
+        for file_name, content in (
+            (json_name, json.dumps(self.snapshot(), ensure_ascii=False, indent=2)),
+            (prom_name, self.prometheus_text()),
+        ):
+            path = os.path.join(folder, file_name)
+            with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(f"{path}.tmp", path)
+
+
+class DownloadWorkerPool:
+    """ 페이지 경계를 넘어 계속 동작하는 다운로드 작업자 풀
+
+    작업자는 하나의 공유(크기 제한) 대기열에서 항목을 하나씩 가져가므로, 큰 파일을 받는
+    작업자가 있어도 나머지 작업자는 다음 항목을 계속 처리합니다.
+    largest_first이면 대기열에 들어와 있는 항목 중 목록상 크기가 가장 큰 것부터 꺼내 가므로,
+    큰 파일이 마지막에 혼자 남아 페이지 완료를 늦추는 일이 줄어듭니다.
+    """
+
+    def __init__(self, worker_count, handler, queue_size=None, metrics=None, largest_first=False):
+        self.handler = handler
+        self.metrics = metrics # 있으면 처리한 항목의 목록상 크기를 bytes_processed로 기록 (ETA 계산용)
+        self.largest_first = largest_first
+        maxsize = queue_size or worker_count * 4
+        # 우선순위 대기열은 (-크기, 넣은 순서, 작업) 순으로 정렬 (크기가 같으면 목록 순서)
+        self.queue = queue.PriorityQueue(maxsize=maxsize) if largest_first else queue.Queue(maxsize=maxsize)
+        self._sequence = 0
+        self._sequence_lock = threading.Lock()
+        self.threads = [
+            threading.Thread(target=self._run, name=f"download-worker-{i + 1}", daemon=True)
+            for i in range(worker_count)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _put(self, task, priority=0):
+        if not self.largest_first:
+            self.queue.put(task)
+            return
+        with self._sequence_lock:
+            self._sequence += 1
+            sequence = self._sequence
+        self.queue.put((priority, sequence, task))
+
+    def submit(self, page_job, item):
+        """ 항목을 대기열에 추가 (대기열이 가득 차면 빈자리가 생길 때까지 대기) """
+        self._put((page_job, item), -(ListManifest.item_size(item) or 0))
+
+    def _run(self):
+        while True:
+            task = self.queue.get()
+            try:
+                if self.largest_first:
+                    task = task[2]
+                if task is None:
+                    return
+                page_job, item = task
+                try:
+                    success = self.handler(page_job, item)
+                except Exception:
+                    success = False
+                if success and self.metrics is not None:
+                    self.metrics.inc("bytes_processed", ListManifest.item_size(item) or 0)
+                page_job.item_finished(success)
+            finally:
+                self.queue.task_done()
+
+    def shutdown(self):
+        """ 대기열에 남은 작업을 모두 처리한 뒤 작업자를 종료 """
+        for _ in self.threads:
+            self._put(None, float("inf")) # 종료 신호는 남은 작업보다 뒤에
+        for thread in self.threads:
+            thread.join()
+
+
+class ArchiveCommitter:
+    """ 다운로드가 끝난 페이지 아카이브의 확정(닫기, fsync, 이름 변경, 색인 기록)을 백그라운드에서 처리
+
+    스레드 하나가 넣은 순서(목록 순서)대로 처리하므로, 페이지 N을 확정하는 동안 다음 페이지의
+    다운로드가 계속 진행되면서도 이어받기 지점은 앞 페이지가 확정된 뒤에만 기록됩니다.
+    확정에 한 번 실패하면 뒤에 들어온 페이지는 확정하지 않고 버립니다.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler # handler(page_job, discard) -> 확정 성공 여부
+        self.failed = threading.Event()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="archive-committer", daemon=True)
+        self.thread.start()
+
+    def submit(self, page_job):
+        self.queue.put(page_job)
+
+    def _run(self):
+        while True:
+            page_job = self.queue.get()
+            if page_job is None:
+                return
+            try:
+                success = self.handler(page_job, discard=self.failed.is_set())
+            except Exception:
+                success = False
+            if not success:
+                self.failed.set()
+
+    def close(self):
+        """ 대기 중인 확정을 모두 처리할 때까지 기다림. 모두 성공했으면 True """
+        self.queue.put(None)
+        self.thread.join()
+        return not self.failed.is_set()
+
+
+class ListPagePrefetcher:
+    """ 다운로드와 동시에 다음 목록 페이지를 미리 받아 저장해 두는 백그라운드 수집기
+
+    (timestamp, 목록 JSON) 쌍을 크기가 depth로 제한된 대기열에 넣어 두며,
+    목록이 끝나거나 오류가 나면 None을 넣어 끝을 알립니다.
+    is_known이 주어지면(증분 모드) 이미 백업된 항목을 만나는 페이지에서 그 앞까지만 넘기고 멈춥니다.
+    """
+
+    def __init__(self, engine, base_url, start_url, backup_path, log_suffix, depth, is_known=None):
+        self.engine = engine
+        self.is_known = is_known
+        self.base_url = base_url
+        self.next_url = start_url
+        self.backup_path = backup_path
+        self.log_suffix = log_suffix
+        self.pages = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._unqueued_pages = []
+        self.failed = False # 목록 요청 오류로 끝났는지 여부
+        self.thread = threading.Thread(target=self._run, name="list-prefetcher", daemon=True)
+        self.thread.start()
+
+    def _put(self, page):
+        """ 대기열에 빈자리가 생길 때까지 기다렸다가 추가 (중지되면 False) """
+        while not self._stop.is_set():
+            try:
+                self.pages.put(page, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        engine = self.engine
+        metrics = engine.metrics
+        metrics.add_gauge("listings_active", 1)
+        try:
+            while self.next_url and not self._stop.is_set():
+                file_list_json = engine.request_list(self.next_url)
+
+                if file_list_json is None:
+                    engine.log("API 요청 중 오류가 발생하여 중단합니다.")
+                    self.failed = True
+                    break
+
+                items = file_list_json.get('items')
+                if not items:
+                    engine.log('더 이상 백업할 항목이 없습니다.')
+                    break
+
+                # 증분 모드: 최신순(DESC)이므로 이미 백업된 항목 뒤로는 모두 백업된 항목
+                reached_known = False
+                if self.is_known:
+                    known_at = next((i for i, item in enumerate(items) if self.is_known(item)), None)
+                    if known_at is not None:
+                        reached_known = True
+                        items = items[:known_at]
+                        file_list_json = dict(file_list_json, items=items)
+                        if not items:
+                            engine.log('이미 백업된 항목에 도달했습니다. 새 항목 수집을 마칩니다.')
+                            break
+
+                metrics.inc("pages_listed")
+                metrics.inc("items_discovered", len(items))
+                metrics.inc("bytes_discovered", sum(ListManifest.item_size(item) or 0 for item in items))
+
+                # 이어받기를 위해 목록 json 로그 저장
+                timestamp = engine.next_page_timestamp(self.backup_path)
+                try:
+                    log_path = os.path.join(self.backup_path, f"{timestamp}{self.log_suffix}")
+                    with open(log_path, 'w', encoding='utf-8') as f:
+                        json.dump(file_list_json, f)
+                    engine.storage.publish_file(self.backup_path, f"{timestamp}{self.log_suffix}")
+                except Exception as e:
+                    engine.log(f"경고: 목록 로그 파일 저장 실패: {e}")
+
+                if not self._put((timestamp, file_list_json)):
+                    self._unqueued_pages.append((timestamp, file_list_json))
+                    break
+
+                if reached_known:
+                    engine.log('이미 백업된 항목에 도달했습니다. 새 항목 수집을 마칩니다.')
+                    break
+
+                try:
+                    last_id = items[-1]['drawerId']
+                    self.next_url = f'{self.base_url}&offset={last_id}'
+                except KeyError:
+                    engine.log("오류: 'drawerId'를 찾을 수 없어 페이징이 불가능합니다.")
+                    self.failed = True
+                    break
+        except Exception as e:
+            engine.log(f"목록 수집 중 알 수 없는 오류: {e}")
+            self.failed = True
+        finally:
+            metrics.add_gauge("listings_active", -1)
+            self._put(None)
+
+    def next_page(self):
+        """ 다음 (timestamp, 목록 JSON)을 반환. 더 이상 없으면 None """
+        return self.pages.get()
+
+    def close(self):
+        """ 수집을 멈추고, 저장은 했지만 아직 꺼내 가지 않은 페이지 목록을 반환 """
+        self._stop.set()
+        self.thread.join()
+        remaining_pages = []
+        while True:
+            try:
+                page = self.pages.get_nowait()
+            except queue.Empty:
+                break
+            if page is not None:
+                remaining_pages.append(page)
+        return remaining_pages + self._unqueued_pages
+
+
+class ListManifest:
+    """ 2단계 수집(목록 먼저)의 목록: 모든 목록 페이지를 받은 뒤에 다운로드를 시작
+
+    ListPagePrefetcher가 받은 페이지를 끝까지 모두 꺼내(collect) 전체 항목 수와 크기를 먼저 계산합니다.
+    목록 JSON은 이미 페이지 로그로 저장되어 있으므로 페이지마다 항목 수와 크기만 기억하고,
+    다운로드 단계에서는 next_page()가 로그를 다시 읽어 ListPagePrefetcher와 같은 방식으로 넘겨줍니다.
+    """
+
+    def __init__(self, prefetcher, backup_path, log_suffix):
+        self.prefetcher = prefetcher
+        self.backup_path = backup_path
+        self.log_suffix = log_suffix
+        self.pages = [] # (timestamp, 로그를 저장하지 못했을 때만 목록 JSON)
+        self.item_count = 0
+        self.known_bytes = 0 # 목록에 크기가 있는 항목의 크기 합
+        self.unknown_size_count = 0 # 목록에 크기가 없는 항목 수
+        self.largest_size = 0
+        self._next = 0
+        self._read_failed = False
+
+    @staticmethod
+    def item_size(item):
+        """ 목록 항목의 크기(바이트). 목록에 없으면 None """
+        try:
+            return int(item.get('size') or item.get('fileSize')) or None
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def failed(self):
+        return self.prefetcher.failed or self._read_failed
+
+    @property
+    def estimated_bytes(self):
+        """ 크기를 모르는 항목은 크기를 아는 항목의 평균으로 어림한 전체 크기 """
+        known_count = self.item_count - self.unknown_size_count
+        if not known_count:
+            return self.known_bytes
+        return self.known_bytes + self.unknown_size_count * self.known_bytes // known_count
+
+    def collect(self, stop_requested):
+        """ 목록이 끝날 때까지 페이지를 모두 받음. 중지 요청으로 멈췄으면 False """
+        while not stop_requested.is_set():
+            page = self.prefetcher.next_page()
+            if page is None:
+                return True
+            timestamp, file_list_json = page
+            log_path = os.path.join(self.backup_path, f"{timestamp}{self.log_suffix}")
+            self.pages.append((timestamp, None if os.path.exists(log_path) else file_list_json))
+            for item in file_list_json['items']:
+                size = self.item_size(item)
+                self.item_count += 1
+                if size is None:
+                    self.unknown_size_count += 1
+                else:
+                    self.known_bytes += size
+                    self.largest_size = max(self.largest_size, size)
+        return False
+
+    def next_page(self):
+        """ 다음 (timestamp, 목록 JSON)을 페이지 로그에서 읽어 반환. 더 이상 없거나 읽지 못하면 None """
+        if self._next >= len(self.pages):
+            return None
+        timestamp, file_list_json = self.pages[self._next]
+        if file_list_json is None:
+            try:
+                with open(os.path.join(self.backup_path, f"{timestamp}{self.log_suffix}"), 'r', encoding='utf-8') as f:
+                    file_list_json = json.load(f)
+            except (OSError, ValueError) as e:
+                self.prefetcher.engine.log(f"오류: 목록 로그를 다시 읽지 못했습니다 ({timestamp}{self.log_suffix}): {e}")
+                self._read_failed = True
+                return None
+        self._next += 1
+        return timestamp, file_list_json
+
+    def close(self):
+        """ 수집을 멈추고, 목록에는 있지만 다운로드하지 않은 페이지 목록을 반환 """
+        remaining_pages = self.pages[self._next:]
+        self._next = len(self.pages)
+        return remaining_pages + self.prefetcher.close()
+
+
+class TalkCloudBackupEngine:
+    """ GUI와 무관하게 톡클라우드 백업을 수행하는 엔진 (GUI/CLI 공용)
+
+    MEDIA / FILE / LINK 백업을 한 프로세스에서 동시에 실행할 수 있으며,
+    동시에 실행되는 백업은 연결 풀과 속도 제어기를 함께 사용합니다.
+    """
+    
+    # --- API 설정 ---
+    # 각 백업 유형에 맞는 API 주소와 페이징 방식을 정의
+    API_CONFIG = {
+        "MEDIA": {
+            "base_url": "https://drawer-api.kakao.com/mediaFile/list?verticalType=MEDIA&fetchCount=100&joined=true&direction=DESC",
+            "log_suffix": "_list.json",
+            "folder_name": "Photo_Backup"
+        },
+        "FILE": {
+            "base_url": "https://drawer-api.kakao.com/mediaFile/list?verticalType=FILE&fetchCount=100&joined=true&direction=DESC",
+            "log_suffix": "_list.json",
+            "folder_name": "File_Backup"
+        },
+        "LINK": {
+            "base_url": "https://drawer-api.kakao.com/link/list?verticalType=LINK&fetchCount=100&joined=true&direction=DESC",
+            "log_suffix": "_link_list.json",
+            "folder_name": "Link_Backup"
+        }
+    }
+    
+    REQ_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/5.36',
+        'Accept': 'application/json+javascript'
+    }
+    DEFAULT_WORKER_COUNT = 5
+    MAX_PENDING_PAGES = 2 # 다운로드가 진행 중일 때 미리 대기열에 넣어 둘 수 있는 페이지 수
+    LIST_PREFETCH_DEPTH = 3 # 미리 받아 둘 목록 페이지 수
+    MAX_WORKER_COUNT = 16 # 응답이 양호할 때 동시 다운로드 수를 늘릴 수 있는 상한
+    LIST_MAX_RETRIES = 5 # 목록 요청이 제한(429/503)될 때 재시도 횟수
+    # 페이지 타임스탬프로 시작하는 파일 이름의 접미사 (타임스탬프 중복 확인용)
+    PAGE_FILE_SUFFIXES = ("_list.json", "_link_list.json", "_photo.zip", "_photo.zip.part", "_retry_photo.zip")
+    _timestamp_lock = threading.Lock()
+    REMOTE_HASH_KEYS = ("sha256", "sha1", "md5", "hash", "checksum") # 목록 항목에서 찾아볼 해시 필드
+    DEDUP_TYPES = ("MEDIA", "FILE") # 같은 내용의 파일을 폴더를 넘어 서로 참조하는 백업 유형
+    ITEM_MAX_ATTEMPTS = 4 # 항목 하나의 다운로드 시도 횟수 (넘으면 격리 목록으로)
+    RETRY_BASE_DELAY = 1.0 # 재시도 대기 시간의 기준(초). 시도마다 두 배 + 무작위 지터
+    RETRY_MAX_DELAY = 30.0
+    LINK_CSV_NAME = "talkcloud_links_backup.csv"
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024 # 스트리밍 다운로드 시 한 번에 읽을 크기
+    SEGMENT_THRESHOLD = 64 * 1024 * 1024 # 이보다 큰 파일은 서버가 Range를 지원하면 구간으로 나눠 동시에 받음
+    SEGMENT_MIN_SIZE = 16 * 1024 * 1024 # 구간 하나의 최소 크기
+    MAX_SEGMENTS = 4 # 파일 하나를 나눌 최대 구간 수
+    SEGMENT_WORKER_COUNT = 8 # 모든 큰 파일이 함께 쓰는 구간 다운로드 스레드 수
+    CHECKPOINT_INTERVAL = 8 * 1024 * 1024 # 구간마다 이만큼 받을 때마다 디스크에 반영하고 진행 상황 저장
+    PARTIAL_DIR_NAME = ".partial" # 구간 다운로드 중간 파일 폴더 (백업 유형 폴더 아래)
+    VERIFY_HASH_KEYS = ("sha256", "sha1", "md5") # 목록에 있으면 다시 합친 파일을 검증할 해시
+    SPOOL_MAX_MEMORY = 8 * 1024 * 1024 # 이보다 큰 파일은 아카이브에 바로 기록 (중복일 수 있거나 크기를 모르면 임시 파일로 넘김)
+
+    BACKUP_TYPES = ("MEDIA", "FILE", "LINK")
+    LOG_FILE_NAME = "talkcloud_backup.log" # 메인 백업 경로에 남기는 전체 로그
+    LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+    LOG_FILE_BACKUP_COUNT = 5
+    METRICS_JSON_NAME = "backup_metrics.json" # 메인 백업 경로에 주기적으로 남기는 계측 스냅샷
+    METRICS_PROM_NAME = "backup_metrics.prom" # node_exporter textfile collector용
+    METRICS_INTERVAL = 10 # 스냅샷 저장 및 진행률 로그 주기(초)
+    VERIFY_LOG_INTERVAL = 100 # 무결성 검사 중 이만큼의 아카이브마다 진행 상황 로그
+    DISK_FREE_RESERVE = 512 * 1024 * 1024 # 2단계 수집: 받을 크기 외에 남겨 둘 여유 공간 (색인, 로그, 임시 파일)
+    INCREMENTAL_META_KEYS = ("incremental_resume_id", "incremental_boundary") # 중단된 증분 실행을 이어받기 위한 색인 meta
+
+    def __init__(self, cookie_folder, worker_count=DEFAULT_WORKER_COUNT, incremental=False, log=None, api_base=None,
+                 compression="auto", archive_layout="page", volume_size=ArchiveLayout.DEFAULT_VOLUME_SIZE,
+                 two_phase=False, scheduler=None, storage=None):
+        self.cookie_folder = cookie_folder
+        self.worker_count = worker_count
+        self.incremental = incremental
+        self.compression = compression # CompressionPolicy.MODES 중 하나
+        self.archive_layout = archive_layout # ArchiveLayout.MODES 중 하나
+        self.volume_size = volume_size # 볼륨 하나의 최대 크기(바이트, page 구성에서는 사용하지 않음)
+        self.two_phase = two_phase # 목록을 모두 받은 뒤 페이지마다 큰 파일부터 다운로드 (전체 크기/남은 공간 확인)
+        self.scheduler = scheduler # 여러 계정이 함께 쓰는 전역 한도 (SharedTransferScheduler, 없으면 계정 단위 제어만)
+        self.storage = storage or LocalStorage() # 아카이브/목록 로그/링크 CSV를 둘 저장소 (S3Storage 등)
+        self._log = log or print
+        # 벤치마크/테스트용 대체 API 서버 주소 (없으면 실제 drawer-api)
+        self.api_base = (api_base or HttpSessionPool.API_HOST).rstrip('/')
+
+        self.cookies = {}
+        self.http = None # load_cookies()에서 생성되는 공유 연결 풀
+
+        # 중지 플래그 (threading.Event는 스레드 간 안전하게 신호를 공유)
+        self.stop_requested = threading.Event()
+        self._runs_lock = threading.Lock()
+        self._active_runs = 0
+        self.metrics = BackupMetrics() # 실행 중인 백업 전체의 계측 (새 실행을 시작할 때 초기화)
+        self._metrics_reporter = None
+        self.segment_pool = None # 구간 다운로드 스레드 (동시에 실행되는 백업이 함께 사용)
+
+        # 파일 로그: 작업자는 큐에 넣기만 하고, 실제 파일 쓰기와 회전은 별도 스레드가 담당
+        self._file_logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._file_logger.setLevel(logging.INFO)
+        self._file_logger.propagate = False
+        self._log_handler = None
+        self._log_listener = None
+        self.log_file_path = None
+
+    def log(self, message):
+        self._log(message)
+        self._file_logger.info(message)
+
+    def open_log_file(self, folder):
+        """ 전체 로그를 folder의 회전 로그 파일에 기록 (이미 같은 파일이면 그대로 사용) """
+        log_file_path = os.path.join(folder, self.LOG_FILE_NAME)
+        with self._runs_lock:
+            if self.log_file_path == log_file_path:
+                return
+            self._stop_log_listener()
+            try:
+                os.makedirs(folder, exist_ok=True)
+                file_handler = logging.handlers.RotatingFileHandler(
+                    log_file_path, maxBytes=self.LOG_FILE_MAX_BYTES,
+                    backupCount=self.LOG_FILE_BACKUP_COUNT, encoding='utf-8'
+                )
+            except OSError as e:
+                self._log(f"로그 파일을 열 수 없습니다: {e}")
+                return
+            file_handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+            log_queue = queue.SimpleQueue()
+            self._log_handler = logging.handlers.QueueHandler(log_queue)
+            self._log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+            self._log_listener.start()
+            self._file_logger.addHandler(self._log_handler)
+            self.log_file_path = log_file_path
+
+    def _stop_log_listener(self):
+        if self._log_listener:
+            self._file_logger.removeHandler(self._log_handler)
+            self._log_listener.stop() # 큐에 남은 기록을 모두 쓴 뒤 종료
+            for handler in self._log_listener.handlers:
+                handler.close()
+            self._log_handler = None
+            self._log_listener = None
+            self.log_file_path = None
+
+    def close(self):
+        """ 연결 풀과 로그 파일을 정리 (프로그램 종료 시) """
+        with self._runs_lock:
+            if self.http:
+                self.http.close()
+                self.http = None
+            self._stop_log_listener()
+
+    def request_stop(self):
+        """ 진행 중인 모든 백업에 중지를 요청 """
+        self.stop_requested.set()
+
+    # --- 백업 공통 헬퍼 ---
+
+    def sanitize_filename(self, filename):
+        """ 파일명으로 사용할 수 없는 특수문자를 제거합니다. """
+        if not filename:
+            return ""
+        return re.sub(r'[\\/*?:"<>|]', '_', filename).strip()
+    
+    def format_timestamp_file(self, ts_millis):
+        """ 파일명용 날짜 형식: 'YYYY-MM-DD_HH-MM-SS' """
+        if not ts_millis or ts_millis == 0:
+            return "UnknownDate"
+        try:
+            dt_object = datetime.fromtimestamp(int(ts_millis) / 1000)
+            return dt_object.strftime("%Y-%m-%d_%H-%M-%S")
+        except Exception:
+            return "InvalidDate"
+
+    def archive_shard_key(self, mode, photo_item):
+        """ 볼륨 파일 이름의 앞부분: chat은 채팅방 이름, month는 'YYYY-MM', size는 'volume' """
+        if mode == "chat":
+            return self.sanitize_filename(photo_item.get('chatName'))[:100] or 'NoChatroom'
+        if mode == "month":
+            return self.format_timestamp_file(photo_item.get('createdAt'))[:7]
+        return "volume"
+
+    def format_timestamp_csv(self, ts_millis):
+        """ CSV 내용용 날짜 형식: 'YYYY-MM-DD HH:MM:SS' """
+        if not ts_millis or ts_millis == 0:
+            return "UnknownDate"
+        try:
+            dt_object = datetime.fromtimestamp(int(ts_millis) / 1000)
+            return dt_object.strftime("%Y-%m-%d %H:%M:%S")
+        except Exception:
+            return "InvalidDate"
+
+    def is_kakao_cookie(self, line):
+        """ 쿠키 파일에서 유효한 카카오 도메인인지 확인 """
+        return line.startswith('talkcloud.kakao.com') or line.startswith('.kakao.com') or line.startswith('drawer-api.kakao.com')
+
+    def request_list(self, url):
+        """ API에 목록을 요청 (공통). 서버가 제한하면 Retry-After 만큼 쉬었다가 재시도 """
+        self.metrics.inc("list_requests")
+        try:
+            with self.metrics.timer("list_request"):
+                response = self.http.get(url)
+                for _ in range(self.LIST_MAX_RETRIES):
+                    if response.status_code not in AdaptiveRateController.THROTTLE_STATUS:
+                        break
+                    response.close()
+                    response = self.http.get(url) # 토큰 버킷이 Retry-After 동안 대기시킴
+                response_content = response.content.decode('utf-8')
+            return json.loads(response_content)
+        except Exception as e:
+            self.metrics.inc("list_errors")
+            self.log(f'error on request get list {url}\n{e}')
+            return None
+
+    def request_download(self, url, dest):
+        """ API에 파일/사진 다운로드를 요청하여 파일 객체(dest)에 청크 단위로 기록 (공통). 기록한 바이트 수를 반환 """
+        with self.metrics.timer("download_request"), self.http.get(f'{url}?attach', stream=True) as response:
+            response.raise_for_status()
+            expected_size = response.headers.get('Content-Length')
+            written = 0
+            # 고정 크기 청크로 바로 기록하므로 파일 크기와 무관하게 메모리 사용량이 일정
+            for chunk in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                dest.write(chunk)
+                written += len(chunk)
+                self.consume_bandwidth(len(chunk))
+            self.metrics.inc("bytes_downloaded", written)
+            # 압축 전송(Content-Encoding)일 수 있으므로 실제로 수신한 원본 바이트 수로 비교
+            received = response.raw.tell()
+            if expected_size is not None and received != int(expected_size):
+                raise IOError(f"전송이 중간에 끊겼습니다 ({received}/{expected_size} bytes)")
+            return written
+
+    def request_download_ranged(self, url, partial_dir, key):
+        """ Range 요청으로 큰 파일을 구간별로 동시에 받아 중간 파일에 기록하고 DownloadCheckpoint를 반환
+
+        서버가 Range를 지원하지 않으면(206 대신 200 응답) None을 반환합니다.
+        중단되면 그때까지 받은 구간은 남겨 두므로, 다음 시도(또는 다음 실행)에서 이어받습니다.
+        확인 요청과 구간마다 다운로드 자리(download_slot)를 따로 받으므로, 호출하는 쪽은 자리를 잡지 않고 부릅니다.
+        """
+        with self.download_slot(), self.http.get(f'{url}?attach', stream=True, headers={'Range': 'bytes=0-0'}) as probe:
+            probe.raise_for_status()
+            content_range = probe.headers.get('Content-Range', '')
+            if probe.status_code != 206 or '/' not in content_range:
+                return None
+            probe.content # 연결을 재사용할 수 있도록 1바이트 본문을 읽어 둠
+            try:
+                total = int(content_range.rsplit('/', 1)[1])
+            except ValueError:
+                return None # 전체 크기를 알려주지 않으면(bytes 0-0/*) 나눠 받을 수 없음
+            validator = probe.headers.get('ETag') or probe.headers.get('Last-Modified')
+
+        checkpoint = DownloadCheckpoint(partial_dir, key)
+        if checkpoint.load(total, validator):
+            self.log(f"이어받기: {key} ({checkpoint.done_bytes() / (1024 * 1024):.1f}/{total / (1024 * 1024):.1f}MB)")
+        else:
+            segment_count = max(1, min(self.MAX_SEGMENTS, total // self.SEGMENT_MIN_SIZE))
+            checkpoint.reset(total, validator, segment_count)
+
+        futures = [
+            self.segment_pool.submit(self._download_segment, url, checkpoint, segment_index, start, end)
+            for segment_index, start, end in checkpoint.pending_segments()
+        ]
+        wait(futures)
+        for future in futures:
+            future.result() # 실패한 구간이 있으면 예외를 그대로 전달 (받은 부분은 이미 저장됨)
+        if checkpoint.done_bytes() != total:
+            raise IOError(f"구간 다운로드가 끝나지 않았습니다 ({checkpoint.done_bytes()}/{total} bytes)")
+        self.metrics.inc("segmented_downloads")
+        return checkpoint
+
+    @contextmanager
+    def download_slot(self):
+        """ 계정의 동시 다운로드 한도(속도 제어기)와, 있으면 여러 계정의 전역 한도(scheduler) 안에서 다운로드 진행 """
+        with self.http.controller.download_slot():
+            if self.scheduler is None:
+                yield
+                return
+            with self.scheduler.download_slot(self):
+                yield
+
+    def consume_bandwidth(self, size):
+        """ 전역 대역폭 한도가 있으면 받은 만큼 차감 (한도를 넘으면 잠시 대기) """
+        if self.scheduler is not None:
+            self.scheduler.consume(size)
+
+    def _download_segment(self, url, checkpoint, segment_index, start, end):
+        """ (구간 스레드) start~end 바이트를 받아 중간 파일의 같은 위치에 기록
+
+        구간 하나가 연결 하나이므로, 계정의 동시 다운로드 한도와 전역 한도(scheduler)의 자리를 구간마다 받습니다.
+        """
+        headers = {'Range': f'bytes={start}-{end}'}
+        with self.download_slot(), self.http.get(f'{url}?attach', stream=True, headers=headers) as response:
+            response.raise_for_status()
+            if response.status_code != 206 or not response.headers.get('Content-Range', '').startswith(f'bytes {start}-'):
+                raise IOError(f"서버가 요청한 구간을 보내지 않았습니다 (bytes {start}-{end})")
+            with open(checkpoint.data_path, 'r+b') as f:
+                f.seek(start)
+                position = start
+                unsaved = 0
+                try:
+                    for chunk in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                        if self.stop_requested.is_set():
+                            raise IOError("중지 요청으로 구간 다운로드를 멈춥니다.")
+                        chunk = chunk[:end - position + 1]
+                        f.write(chunk)
+                        position += len(chunk)
+                        unsaved += len(chunk)
+                        self.metrics.inc("bytes_downloaded", len(chunk))
+                        self.consume_bandwidth(len(chunk))
+                        if unsaved >= self.CHECKPOINT_INTERVAL:
+                            self._save_segment(f, checkpoint, segment_index, unsaved)
+                            unsaved = 0
+                        if position > end:
+                            break
+                finally:
+                    # 디스크에 반영한 뒤에만 진행 상황에 더하므로, 강제 종료돼도 받지 않은 부분을 받은 것으로 기록하지 않음
+                    self._save_segment(f, checkpoint, segment_index, unsaved)
+            if position <= end:
+                raise IOError(f"구간 전송이 중간에 끊겼습니다 ({position - start}/{end - start + 1} bytes)")
+
+    def _save_segment(self, f, checkpoint, segment_index, size):
+        f.flush()
+        os.fsync(f.fileno())
+        if size:
+            checkpoint.advance(segment_index, size)
+        checkpoint.save()
+
+    def hash_downloaded_file(self, source, photo_item):
+        """ 다시 합친 파일의 (SHA-256, 크기)를 계산. 목록에 해시(sha256/sha1/md5)가 있으면 함께 검증 """
+        expected = next(((key, photo_item[key]) for key in self.VERIFY_HASH_KEYS if photo_item.get(key)), None)
+        sha256 = hashlib.sha256()
+        listed = hashlib.new(expected[0]) if expected else None
+        size = 0
+        for chunk in iter(lambda: source.read(self.DOWNLOAD_CHUNK_SIZE * 16), b''):
+            sha256.update(chunk)
+            if listed:
+                listed.update(chunk)
+            size += len(chunk)
+        if listed and listed.hexdigest().lower() != str(expected[1]).lower():
+            raise IOError(f"다시 합친 파일의 {expected[0]} 해시가 목록과 다릅니다.")
+        return sha256.hexdigest(), size
+
+    def load_cookies(self):
+        """ 쿠키 파일을 로드 (공통) """
+        cookie_folder_path = self.cookie_folder
+        cookie_file_path = os.path.join(cookie_folder_path, 'talkcloud.kakao.com_cookies.txt')
+        
+        if not os.path.exists(cookie_file_path):
+            self.log(f"오류: '{cookie_file_path}' 파일을 찾을 수 없습니다.")
+            cookie_file_path_old = os.path.join(cookie_folder_path, 'drive.kakao.com_cookies.txt')
+            if os.path.exists(cookie_file_path_old):
+                self.log(f"경고: talkcloud...txt를 찾지 못해 '{cookie_file_path_old}'를 대신 사용합니다.")
+                cookie_file_path = cookie_file_path_old
+            else:
+                self.log(f"'{cookie_file_path}' 또는 '{cookie_file_path_old}' 파일을 찾을 수 없습니다.")
+                return False
+        
+        self.cookies = {}
+        with open(cookie_file_path, 'r', encoding='utf-8') as file:
+            lines = file.readlines()
+            cookie_lines = [line for line in lines if self.is_kakao_cookie(line)]
+            for cookie_line in cookie_lines:
+                try:
+                    parts = cookie_line.strip().split('\t')
+                    if len(parts) >= 7:
+                        self.cookies[parts[5].replace(' ', '')] = parts[6].replace('\n', '')
+                except Exception as e:
+                    self.log(f"쿠키 라인 처리 중 오류: {e}")
+
+        if not self.cookies:
+            self.log("오류: 쿠키 파일에서 유효한 카카오 쿠키를 찾지 못했습니다.")
+            return False
+            
+        if self.http:
+            self.http.close()
+        worker_count = self.get_worker_count()
+        controller = AdaptiveRateController(worker_count, max(worker_count, self.MAX_WORKER_COUNT), log=self.log)
+        self.http = HttpSessionPool(self.cookies, self.REQ_HEADERS, controller, api_host=self.api_base)
+        self.log("쿠키 로드 성공.")
+        return True
+
+    def get_last_downloaded_id(self, index, log_suffix, check_zip):
+        """ 이어받기를 위해 마지막 ID를 찾는 공통 함수 (백업 색인 조회) """
+        self.log(f"백업 색인({index.path})에서 이전 백업 기록을 확인합니다...")
+        if self.storage.remote:
+            self.prepare_remote_storage(index, check_zip)
+        if check_zip:
+            ArchiveLayout.repair_volumes(index.backup_path, self.log)
+        index.recover()
+        # 색인이 없던 폴더라면 기존 '{log_suffix}' 로그로 한 번만 색인을 만듦
+        index.import_page_logs(log_suffix, check_zip, self.build_item_filename, self.log)
+        if check_zip:
+            index.fill_catalog(log_suffix, self.log)
+
+        latest_id_str = index.get_resume_id()
+        if latest_id_str is None:
+            latest_id_str = self.load_resume_marker(index)
+        if latest_id_str is None:
+            self.log("이전 백업 기록이 없습니다.")
+            return None
+        
+        self.log(f"가장 최근에 완료된 백업의 마지막 ID: {latest_id_str}")
+        return latest_id_str
+
+    def prepare_remote_storage(self, index, check_zip):
+        """ 원격 저장소 사용 시: 색인에 저장소를 기록하고, 강제 종료로 남은 미완료 업로드를 취소 """
+        backup_path = index.backup_path
+        settings = json.dumps(self.storage.settings, sort_keys=True)
+        if index.get_meta("storage") != settings:
+            index.set_meta("storage", settings)
+        self.log(f"저장소: {self.storage.describe(backup_path, '')}")
+        if check_zip:
+            discarded = self.storage.discard_incomplete_uploads(backup_path)
+            if discarded:
+                self.log(f"완료되지 않은 업로드 {discarded}개를 취소했습니다.")
+
+    def load_resume_marker(self, index):
+        """ 로컬 색인에 이어받기 지점이 없으면 저장소의 이어받기 지점 객체 하나만 읽어 색인에 복사 """
+        try:
+            marker = self.storage.load_resume_marker(index.backup_path)
+        except Exception as e:
+            self.log(f"경고: 저장소의 이어받기 지점을 읽지 못했습니다: {e}")
+            return None
+        if not marker or not marker.get("resume_id"):
+            return None
+        resume_id = str(marker["resume_id"])
+        index.set_meta("resume_id", resume_id)
+        if marker.get("newest_id"):
+            # 색인의 항목 기록은 없으므로, 증분 모드에서는 이 ID 이하를 이미 백업된 항목으로 봄
+            index.set_meta("remote_newest_id", marker["newest_id"])
+        self.log(f"저장소에 기록된 이어받기 지점을 사용합니다. (페이지 {marker.get('page')})")
+        return resume_id
+
+    def save_resume_marker(self, index, resume_id, timestamp):
+        """ 확정한 이어받기 지점과 가장 최신 백업 항목을 저장소에도 기록 (원격 저장소만, 실패해도 백업은 계속) """
+        if not self.storage.remote:
+            return
+        resume_id = resume_id or index.get_resume_id() # 증분 모드에서는 기존 이어받기 지점을 유지
+        marker = {
+            "resume_id": resume_id, "newest_id": self.newest_backed_up_id(index),
+            "page": timestamp, "updated_at": int(time.time())
+        }
+        try:
+            self.storage.save_resume_marker(index.backup_path, marker)
+        except Exception as e:
+            self.log(f"경고: 저장소에 이어받기 지점을 기록하지 못했습니다: {e}")
+
+    # --- 백업 실행 ---
+
+    def prepare_run(self, main_backup_path):
+        """ 백업 하나를 시작할 준비. 진행 중인 다른 백업이 없을 때만 쿠키, 연결 풀, 계측을 새로 만듦 """
+        with self._runs_lock:
+            if self._active_runs == 0:
+                self.stop_requested.clear() # 중지 플래그 초기화
+                if not self.load_cookies():
+                    return False
+                self.metrics = BackupMetrics()
+                self.segment_pool = ThreadPoolExecutor(self.SEGMENT_WORKER_COUNT, thread_name_prefix="segment")
+                self._metrics_reporter = threading.Event()
+                threading.Thread(
+                    target=self.report_metrics, args=(main_backup_path, self.metrics, self._metrics_reporter),
+                    name="metrics-reporter", daemon=True
+                ).start()
+            self._active_runs += 1
+            return True
+
+    def get_api_config(self, backup_type):
+        """ 백업 유형의 API 설정 (api_base가 지정되었으면 그 서버 주소로 바꾼 사본) """
+        config = self.API_CONFIG.get(backup_type)
+        if config is None:
+            return None
+        return dict(config, base_url=config["base_url"].replace(HttpSessionPool.API_HOST, self.api_base, 1))
+
+    def report_metrics(self, folder, metrics, finished):
+        """ METRICS_INTERVAL마다 진행률을 로그로 남기고 계측 스냅샷을 folder에 저장. 종료 시 마지막으로 한 번 더 저장 """
+        while True:
+            done = finished.wait(self.METRICS_INTERVAL)
+            try:
+                metrics.write_snapshot(folder, self.METRICS_JSON_NAME, self.METRICS_PROM_NAME)
+            except OSError as e:
+                self.log(f"경고: 계측 스냅샷 저장 실패: {e}")
+            if done:
+                self.log(f"최종 {self.format_progress(metrics.progress())}")
+                return
+            self.log(self.format_progress(metrics.progress()))
+
+    def format_progress(self, progress):
+        """ 진행률 요약 한 줄: 처리/발견 항목 수, 평균 속도, 남은 시간 """
+        discovered = progress["items_discovered"]
+        done = progress["items_done"]
+        percent = f" ({done / discovered:.0%})" if discovered else ""
+        if progress["bytes_discovered"]:
+            # 목록에 크기가 있으면 크기 기준 진행률도 함께 (큰 파일이 섞여 있을 때 더 정확)
+            percent += f", 크기 기준 {min(progress['bytes_processed'] / progress['bytes_discovered'], 1):.0%}"
+        text = (
+            f"진행: {done}/{discovered}개{percent}, "
+            f"{progress['bytes_downloaded'] / (1024 * 1024):.1f}MB, "
+            f"{progress['bytes_per_sec'] / (1024 * 1024):.2f}MB/s, {progress['items_per_sec']:.1f}개/s"
+        )
+        if progress["eta_seconds"] is not None and done < discovered:
+            text += f", 남은 시간 약 {self.format_duration(progress['eta_seconds'])}"
+        if progress["listing"]:
+            text += " (목록 수집 중)"
+        return text
+
+    def format_duration(self, seconds):
+        """ 초를 '1시간 2분 3초' 형식으로 """
+        seconds = int(seconds)
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        if hours:
+            return f"{hours}시간 {minutes}분"
+        if minutes:
+            return f"{minutes}분 {seconds}초"
+        return f"{seconds}초"
+
+    def run_backup(self, backup_type, main_backup_path):
+        """ 백업 유형 하나를 현재 스레드에서 끝까지 실행. 오류 없이 끝나면 True """
+        config = self.get_api_config(backup_type)
+        if config is None:
+            self.log("오류: 알 수 없는 백업 유형입니다.")
+            return False
+
+        self.open_log_file(main_backup_path)
+        if not self.prepare_run(main_backup_path): # 쿠키 로드 먼저 시도
+            return False
+
+        try:
+            # 하위 폴더 경로 생성
+            sub_folder_path = os.path.join(main_backup_path, config["folder_name"])
+            try:
+                os.makedirs(sub_folder_path, exist_ok=True) # 폴더가 없으면 생성
+            except Exception as e:
+                self.log(f"백업 폴더 생성 실패: {e}")
+                return False
+
+            if backup_type == "MEDIA" or backup_type == "FILE":
+                return self.run_media_file_backup(config, sub_folder_path)
+            return self.run_link_backup(config, sub_folder_path)
+        except Exception as e:
+            self.log(f"치명적인 오류 발생: {e}")
+            return False
+        finally:
+            with self._runs_lock:
+                self._active_runs -= 1
+                last_run = self._active_runs == 0
+            if last_run:
+                self.segment_pool.shutdown(wait=False)
+                self._metrics_reporter.set() # 마지막 스냅샷 저장 후 종료
+                self.log_connection_stats()
+            self.log(f"{config['folder_name']} 작업이 종료되었습니다.")
+
+    def run_backups(self, backup_types, main_backup_path):
+        """ 여러 백업 유형을 각각의 스레드에서 동시에 실행하고 모두 끝날 때까지 기다림. 모두 성공하면 True """
+        results = {}
+
+        def run(backup_type):
+            results[backup_type] = self.run_backup(backup_type, main_backup_path)
+
+        threads = [
+            threading.Thread(target=run, args=(backup_type,), name=f"backup-{backup_type}", daemon=True)
+            for backup_type in backup_types
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return all(results.get(backup_type) for backup_type in backup_types)
+
+    def log_connection_stats(self):
+        """ 연결 풀의 keep-alive 재사용률을 로그로 출력 """
+        if not self.http:
+            return
+        stats = self.http.stats()
+        self.log(
+            f"연결 통계: 요청 {stats['requests']}회, 새 연결 {stats['new_connections']}개, "
+            f"재사용 {stats['reused_connections']}회 (재사용률 {stats['reuse_rate']:.1%}, 세션 {stats['sessions']}개)"
+        )
+
+    # --- 1. 사진 / 파일 백업 로직 ---
+            
+    def run_media_file_backup(self, api_config, backup_path):
+        """ 사진(MEDIA)과 파일(FILE) 백업을 처리하는 메인 루프 """
+        
+        base_url = api_config["base_url"]
+        log_suffix = api_config["log_suffix"]
+        
+        index = BackupIndex(backup_path, self.storage, peers=self.content_peers(backup_path))
+        try:
+            return self._run_media_file_pages(base_url, log_suffix, backup_path, index)
+        finally:
+            index.close()
+
+    def _run_media_file_pages(self, base_url, log_suffix, backup_path, index):
+        resume_id = self.get_last_downloaded_id(index, log_suffix, check_zip=True)
+        incremental = self.use_incremental_mode(resume_id)
+        
+        is_known = None
+        if incremental:
+            # 최신 항목부터 이미 백업된 항목을 만날 때까지만 받음 (전체 백업의 이어받기 지점은 그대로 둠)
+            next_url, is_known = self.plan_incremental_listing(index, base_url)
+        elif resume_id:
+            next_url = f'{base_url}&offset={resume_id}'
+        else:
+            self.log("새로운 백업을 시작합니다.")
+            next_url = base_url
+            
+        page_count = 1
+        completed = True # 중단이나 오류 없이 끝까지 진행했는지 여부
+        pending_jobs = [] # 다운로드 중인 페이지 (목록 순서대로 완료 처리)
+        dedup_stats = DedupStats()
+        controller = self.http.controller
+        # 작업자는 상한만큼 만들어 두고, 실제 동시 다운로드 수는 속도 제어기가 조절
+        policy = CompressionPolicy(self.compression, log=self.log)
+        layout = ArchiveLayout(
+            self.archive_layout, backup_path, policy, self.volume_size, shard_key=self.archive_shard_key,
+            storage=self.storage
+        )
+        two_phase = bool(self.two_phase)
+        pool = DownloadWorkerPool(
+            controller.max_concurrency, self._worker_download, metrics=self.metrics, largest_first=two_phase
+        )
+        self.log(f"동시 다운로드 {controller.concurrency}개로 시작합니다. (최대 {controller.max_concurrency}개까지 자동 조절)")
+        if layout.mode != "page":
+            self.log(f"아카이브 구성: {layout.mode} (볼륨당 최대 {layout.volume_size / (1024 * 1024 * 1024):g}GB, {layout.folder})")
+
+        # 이전 실행에서 격리된 항목을 먼저 따로 재시도
+        try:
+            self.retry_quarantined_items(pool, index, layout, dedup_stats)
+        except Exception:
+            pool.shutdown()
+            layout.close()
+            raise
+        committer = ArchiveCommitter(self.commit_page_job)
+
+        prefetcher = ListPagePrefetcher(
+            self, base_url, next_url, backup_path, log_suffix, self.LIST_PREFETCH_DEPTH, is_known=is_known
+        )
+        page_source = prefetcher # 다운로드할 페이지를 꺼내 올 곳 (2단계 수집이면 먼저 모두 받은 목록)
+
+        try:
+            if two_phase:
+                page_source = ListManifest(prefetcher, backup_path, log_suffix)
+                completed = self.prepare_list_manifest(page_source, backup_path)
+
+            while completed:
+                if self.stop_requested.is_set():
+                    self.log("작업 중단됨.")
+                    completed = False
+                    break
+
+                # 이전 페이지가 실패했다면 더 이상 새 페이지를 받지 않음
+                if not self.finalize_page_jobs(pending_jobs, len(pending_jobs) - self.MAX_PENDING_PAGES + 1, committer):
+                    completed = False
+                    break
+
+                # 다운로드가 목록 수집을 기다린 시간 (목록이 병목인지 확인용)
+                with self.metrics.timer("page_list_wait"):
+                    page = page_source.next_page()
+                if page is None:
+                    break
+                timestamp, file_list_json = page
+                items = file_list_json['items']
+
+                rate_status = controller.status()
+                self.log(
+                    f"--- 페이지 {page_count} 백업 시작 "
+                    f"(동시 다운로드 {rate_status['concurrency']}개, 요청 속도 {rate_status['rate']:.1f}/s) ---"
+                )
+
+                page_job = PageJob(
+                    timestamp, items, layout.open_page(timestamp), index,
+                    resume_id=None if incremental else items[-1]['drawerId'],
+                    incremental_resume_id=items[-1]['drawerId'] if incremental else None,
+                    dedup_stats=dedup_stats, log_suffix=log_suffix
+                )
+                pending_jobs.append(page_job)
+                if two_phase:
+                    # 페이지 안에서만 큰 파일부터 (페이지는 순서대로 완료/이어받기되므로 목록 전체로 정렬하지 않음): 페이지 완료가 마지막에 시작한 큰 파일 하나를 기다리는 일을 줄임
+                    items = sorted(items, key=lambda item: ListManifest.item_size(item) or 0, reverse=True)
+                for photo_item in items:
+                    pool.submit(page_job, photo_item)
+
+                page_count += 1
+        finally:
+            # 미리 받아 두었지만 다운로드하지 않은 페이지의 로그는 삭제 (이어받기 시 경고 방지)
+            for timestamp, _ in page_source.close():
+                self.remove_page_log(backup_path, timestamp, log_suffix)
+            # 중단/오류 시에도 이미 대기열에 넣은 페이지는 끝까지 정리
+            if not self.finalize_page_jobs(pending_jobs, len(pending_jobs), committer):
+                completed = False
+            pool.shutdown()
+            # 이어받기 지점은 확정 스레드가 기록하므로 모든 확정이 끝날 때까지 기다림
+            if not committer.close():
+                completed = False
+            layout.close()
+            if dedup_stats.items:
+                self.log(
+                    f"중복 제거: {dedup_stats.items}개 항목을 참조로 기록, "
+                    f"{dedup_stats.bytes_saved / (1024 * 1024):.1f}MB 절약 "
+                    f"(전송 생략 {dedup_stats.transfers_skipped}개)"
+                )
+        completed = completed and not page_source.failed
+        if incremental and completed:
+            index.clear_meta(*self.INCREMENTAL_META_KEYS)
+        return completed
+
+    def prepare_list_manifest(self, manifest, backup_path):
+        """ 2단계 수집의 1단계: 목록을 모두 받아 전체 항목 수/크기를 알리고, 받을 공간이 남아 있는지 확인
+
+        목록상 크기만으로도 남은 공간을 넘으면 아무것도 받지 않고 False를 반환합니다.
+        크기를 모르는 항목까지 어림한 크기만 넘으면 경고만 남기고 진행합니다.
+        원격 저장소로 백업하면 아카이브는 로컬에 남지 않으므로, 동시에 받는 파일의 임시 파일만큼만 확인합니다.
+        """
+        self.log("목록을 먼저 모두 받습니다. (2단계 수집)")
+        if not manifest.collect(self.stop_requested):
+            self.log("작업 중단됨.")
+            return False
+
+        mb = 1024 * 1024
+        size_text = f"{manifest.known_bytes / mb:.1f}MB"
+        if manifest.unknown_size_count:
+            size_text += f" (크기 미상 {manifest.unknown_size_count}개 포함 약 {manifest.estimated_bytes / mb:.1f}MB)"
+        self.log(
+            f"목록 수집 완료: {len(manifest.pages)}페이지, {manifest.item_count}개, {size_text}, "
+            f"가장 큰 파일 {manifest.largest_size / mb:.1f}MB"
+        )
+        if manifest.failed:
+            self.log("경고: 목록 수집이 오류로 끝나 지금까지 받은 목록만 다운로드합니다.")
+
+        try:
+            free_bytes = shutil.disk_usage(backup_path).free
+        except OSError as e:
+            self.log(f"경고: 남은 디스크 공간을 확인하지 못했습니다: {e}")
+            free_bytes = None
+        if free_bytes is not None:
+            needed_bytes, estimated_bytes = manifest.known_bytes, manifest.estimated_bytes
+            if self.storage.remote:
+                # 로컬에는 동시에 받는 파일마다 임시 파일(또는 구간 다운로드의 중간 파일) 하나씩만 남음
+                scratch_bytes = manifest.largest_size * self.http.controller.max_concurrency
+                needed_bytes, estimated_bytes = min(needed_bytes, scratch_bytes), min(estimated_bytes, scratch_bytes)
+                self.log(f"아카이브는 {self.storage.describe(backup_path, '')}에 올리므로 로컬에는 임시 파일 공간만 확인합니다.")
+            usable_bytes = free_bytes - self.DISK_FREE_RESERVE
+            reserve_text = f"여유 공간 {self.DISK_FREE_RESERVE / mb:.0f}MB 별도"
+            if needed_bytes > usable_bytes:
+                self.log(
+                    f"오류: 디스크 공간이 부족합니다. (필요 {needed_bytes / mb:.1f}MB 이상 + {reserve_text}, "
+                    f"남은 공간 {free_bytes / mb:.1f}MB) 다운로드를 시작하지 않습니다."
+                )
+                return False
+            if estimated_bytes > usable_bytes:
+                self.log(
+                    f"경고: 크기를 모르는 항목까지 포함하면 디스크 공간이 부족할 수 있습니다. "
+                    f"(약 {estimated_bytes / mb:.1f}MB + {reserve_text}, 남은 공간 {free_bytes / mb:.1f}MB)"
+                )
+            else:
+                self.log(f"남은 디스크 공간 {free_bytes / mb:.1f}MB: 충분합니다. ({reserve_text})")
+
+        self.metrics.start_transfer_clock()
+        return True
+
+    def use_incremental_mode(self, resume_id):
+        """ 증분 모드 사용 여부. 이전 백업이 없으면 전체 백업으로 진행 """
+        try:
+            incremental = bool(self.incremental)
+        except Exception:
+            incremental = False
+        if incremental and resume_id is None:
+            self.log("이전 백업 기록이 없어 전체 백업으로 진행합니다.")
+            return False
+        if incremental:
+            self.log("증분 모드: 최신 항목부터 이미 백업된 항목을 만날 때까지 새 항목만 백업합니다.")
+        return incremental
+
+    def plan_incremental_listing(self, index, base_url):
+        """ 증분 모드의 (목록 시작 주소, 이미 백업된 항목 판별 함수)
+
+        이전 증분 실행이 중간에 멈췄다면 그 실행이 마지막으로 확정한 항목 다음부터 이어서 받고,
+        그 실행이 시작할 때의 경계(그때 이미 백업되어 있던 가장 최신 항목) 이하에 도달해야 멈춥니다.
+        멈춘 실행이 확정한 최신 페이지의 항목에서 멈추면 그 아래의 새 항목을 영영 받지 못하기 때문입니다.
+        """
+        pending_id = index.get_meta("incremental_resume_id")
+        boundary = self.drawer_id_number(index.get_meta("incremental_boundary"))
+        if pending_id is not None and boundary is not None:
+            self.log(f"중단된 증분 백업을 이어서 진행합니다. (ID {pending_id} 다음부터 ID {boundary}까지)")
+
+            def is_known(item):
+                drawer_id = self.drawer_id_number(item.get('drawerId'))
+                return drawer_id is not None and drawer_id <= boundary
+            return f'{base_url}&offset={pending_id}', is_known
+
+        index.clear_meta(*self.INCREMENTAL_META_KEYS)
+        boundary = self.newest_backed_up_id(index)
+        if boundary is not None:
+            index.set_meta("incremental_boundary", boundary)
+        return base_url, self.make_known_item_check(index)
+
+    def newest_backed_up_id(self, index):
+        """ 백업된 가장 최신 drawerId (원격 저장소의 이어받기 지점으로 색인을 새로 만든 경우 그 지점의 값 포함) """
+        newest_ids = [self.drawer_id_number(value) for value in (index.get_newest_done_id(), index.get_meta("remote_newest_id"))]
+        newest_ids = [value for value in newest_ids if value is not None]
+        return max(newest_ids) if newest_ids else None
+
+    def make_known_item_check(self, index):
+        """ 색인에 이미 백업 완료로 기록된 항목인지 확인하는 함수
+
+        원격 저장소의 이어받기 지점으로 색인을 새로 만든 경우에는 그 지점의 가장 최신 ID 이하도 백업된 항목으로 봅니다.
+        """
+        newest_id = self.drawer_id_number(index.get_meta("remote_newest_id"))
+        if newest_id is None:
+            return lambda item: 'drawerId' in item and index.is_done(item['drawerId'])
+
+        def is_known(item):
+            if 'drawerId' not in item:
+                return False
+            drawer_id = self.drawer_id_number(item['drawerId'])
+            return (drawer_id is not None and drawer_id <= newest_id) or index.is_done(item['drawerId'])
+        return is_known
+
+    @staticmethod
+    def drawer_id_number(value):
+        """ 크기 비교용 drawerId 정수 (숫자가 아니면 None) """
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def get_worker_count(self):
+        """ 실행 시점에 설정된 동시 다운로드 수 """
+        try:
+            return max(1, int(self.worker_count))
+        except Exception:
+            return self.DEFAULT_WORKER_COUNT
+
+    def next_page_timestamp(self, backup_path):
+        """ 페이지 로그/압축 파일명에 쓸 타임스탬프
+
+        여러 페이지가 같은 초에 시작되어도 증가하도록 보장하고, 이전 실행이 이미 쓴
+        타임스탬프(시계보다 앞서 나갔을 수 있음)는 건너뛰어 기존 파일을 덮어쓰지 않습니다.
+        """
+        with self._timestamp_lock:
+            timestamp = max(int(time.time()), getattr(self, '_last_page_timestamp', 0) + 1)
+            while any(os.path.exists(os.path.join(backup_path, f"{timestamp}{suffix}")) for suffix in self.PAGE_FILE_SUFFIXES):
+                timestamp += 1
+            self._last_page_timestamp = timestamp
+            return timestamp
+
+    def remove_page_log(self, backup_path, timestamp, log_suffix):
+        """ 처리하지 않은 페이지의 목록 로그 삭제 """
+        log_path = os.path.join(backup_path, f"{timestamp}{log_suffix}")
+        try:
+            if os.path.exists(log_path):
+                os.remove(log_path)
+            self.storage.remove_file(backup_path, f"{timestamp}{log_suffix}")
+        except Exception as e:
+            self.log(f"경고: {log_path} 삭제 실패: {e}")
+
+    def retry_quarantined_items(self, pool, index, layout, dedup_stats):
+        """ 색인에 격리(failed)된 항목만 모아 다시 받아봄 (page 구성이면 {timestamp}_retry_photo.zip 으로) """
+        items = index.failed_items()
+        if not items or self.stop_requested.is_set():
+            return
+
+        self.log(f"--- 이전에 실패한 항목 {len(items)}개 재시도 ---")
+        timestamp = self.next_page_timestamp(layout.backup_path)
+        archive = layout.open_page(timestamp, "_retry_photo.zip")
+        page_job = PageJob(timestamp, items, archive, index, dedup_stats=dedup_stats)
+        self.metrics.inc("items_discovered", len(items))
+        self.metrics.inc("bytes_discovered", sum(ListManifest.item_size(item) or 0 for item in items))
+        for item in items:
+            pool.submit(page_job, item)
+        page_job.done.wait()
+
+        recovered_count = len(items) - len(page_job.failed_items)
+        if page_job.success and recovered_count:
+            archive.commit()
+            self.log(f"{archive.zip_path} 파일로 {recovered_count}개 복구 완료")
+        else:
+            archive.abort()
+            index.discard_page(timestamp)
+        index.commit_page(timestamp, failed_items=page_job.failed_items)
+        if page_job.failed_items:
+            self.log(f"{len(page_job.failed_items)}개 항목은 여전히 실패하여 격리 상태로 남겨둡니다.")
+
+    def finalize_page_jobs(self, pending_jobs, wait_count, committer):
+        """ 다운로드가 끝난 페이지를 목록 순서대로 확정 대기열(committer)로 넘김. 앞쪽 wait_count개 페이지는 완료될 때까지 기다림
+
+        확정(아카이브 닫기와 색인 기록)은 committer 스레드에서 진행되므로 다음 페이지 다운로드를 막지 않습니다.
+        앞 페이지가 중단/실패하면 이어받기 지점이 건너뛰지 않도록 뒤 페이지도 확정하지 않고 버립니다.
+        실패가 있었다면 False를 반환합니다.
+        """
+        while pending_jobs:
+            page_job = pending_jobs[0]
+            if wait_count > 0:
+                page_job.done.wait()
+                wait_count -= 1
+            elif not page_job.done.is_set():
+                break
+            pending_jobs.pop(0)
+
+            self.metrics.observe("page_download", page_job.finished_at - page_job.created_at)
+            if page_job.success and not committer.failed.is_set():
+                committer.submit(page_job)
+                continue
+
+            if not page_job.success:
+                self.log("다운로드 중 오류가 발생했습니다. 프로그램을 중단합니다.")
+            self.discard_page_job(page_job)
+            # 뒤에 대기 중이던 페이지는 남은 항목을 건너뛰게 한 뒤 모두 삭제
+            for later_job in pending_jobs:
+                later_job.cancel()
+            while pending_jobs:
+                later_job = pending_jobs.pop(0)
+                later_job.done.wait()
+                self.discard_page_job(later_job, quiet=True)
+            return False
+        return not committer.failed.is_set()
+
+    def commit_page_job(self, page_job, discard=False):
+        """ (확정 스레드) 아카이브를 확정한 뒤 색인에 항목 완료, 실패 항목 격리, 이어받기 지점을 한 트랜잭션으로 기록 """
+        if discard:
+            # 앞 페이지 확정이 실패했으므로 이어받기 지점이 건너뛰지 않도록 버림
+            self.discard_page_job(page_job, quiet=True)
+            return False
+        archive = page_job.archive
+        try:
+            with self.metrics.timer("archive_commit"):
+                archive.commit()
+            page_job.index.commit_page(
+                page_job.timestamp,
+                resume_id=page_job.resume_id,
+                failed_items=page_job.failed_items,
+                incremental_resume_id=page_job.incremental_resume_id
+            )
+        except Exception as e:
+            self.log(f"압축 파일 저장 중 오류 발생: {e}")
+            self.discard_page_job(page_job)
+            return False
+        self.save_resume_marker(page_job.index, page_job.resume_id, page_job.timestamp)
+        self.metrics.inc("pages_committed")
+        self.log(f'{archive.zip_path} 파일로 압축 완료')
+        if page_job.failed_items:
+            self.log(f"실패한 {len(page_job.failed_items)}개 항목은 색인에 격리해 두었습니다. 다음 실행 시 다시 시도합니다.")
+        return True
+
+    def discard_page_job(self, page_job, quiet=False):
+        """ 미완성 아카이브를 삭제하고 색인에서 해당 아카이브에 넣은 항목을 되돌림
+
+        확정하지 않은 페이지의 목록 로그도 지우므로, 무결성 검사가 받지 않은 항목을 누락으로 보고하지 않습니다.
+        """
+        page_job.archive.abort()
+        page_job.index.discard_page(page_job.timestamp)
+        if page_job.log_suffix:
+            self.remove_page_log(page_job.index.backup_path, page_job.timestamp, page_job.log_suffix)
+        self.metrics.inc("pages_failed")
+        if quiet:
+            return
+        if page_job.archive.temp_path:
+            self.log(f"미완성 압축 파일을 삭제했습니다: {page_job.archive.temp_path}")
+        else:
+            self.log("미완성 페이지의 항목을 색인에서 되돌렸습니다. (볼륨에 이미 기록된 내용은 찾기/복원 시 무시됩니다)")
+
+    def build_item_filename(self, photo_item):
+        """ '[날짜]_[채팅방이름]_[원본파일이름].확장자' 형식의 저장 파일명 생성 """
+        date_str = self.format_timestamp_file(photo_item.get('createdAt'))
+        chat_name = self.sanitize_filename(photo_item.get('chatName') or 'NoChatroom')
+        
+        default_name = f"file_{photo_item.get('drawerId', photo_item['id'])}"
+        original_name_raw = photo_item.get('name') or default_name
+        
+        original_name_base, original_ext = os.path.splitext(original_name_raw)
+        original_name_sanitized = self.sanitize_filename(original_name_base)
+        
+        url_filename = photo_item['url'].split('/')[-1]
+        _, url_ext = os.path.splitext(url_filename)
+        
+        final_extension = url_ext if url_ext else (original_ext if original_ext else '.jpg')
+        
+        return f"{date_str}_{chat_name}_{original_name_sanitized}{final_extension}"
+
+    def _worker_download(self, page_job, photo_item):
+        """ (사진/파일 공통) 작업자 풀에서 항목 하나를 내려받아 페이지 아카이브에 추가
+
+        다운로드 실패는 지수 백오프로 재시도하고, 끝내 실패하면 격리 목록으로 보낸 뒤 True를 반환합니다.
+        중지 요청이나 아카이브 기록 오류처럼 페이지를 확정할 수 없을 때만 False를 반환합니다.
+        """
+        if not page_job.success or self.stop_requested.is_set():
+            return False
+
+        # 이미 다른 아카이브에 백업된 항목은 건너뜀
+        drawer_id = photo_item.get('drawerId', photo_item.get('id'))
+        if page_job.index.is_done(drawer_id):
+            self.metrics.inc("items_skipped")
+            return True
+
+        try:
+            with self.metrics.timer("archive_reserve"):
+                archive_name, final_filename = page_job.archive.reserve(self.build_item_filename(photo_item), photo_item)
+        except Exception as e:
+            self.log(f"파일명 생성 오류 ({photo_item.get('id', 'UnknownID')}): {e}")
+            return False
+
+        # 목록 데이터에 크기/해시가 있고 같은 파일이 이미 백업되어 있으면 전송 자체를 생략
+        remote_hash = self.get_remote_hash(photo_item)
+        if remote_hash:
+            original = page_job.index.find_by_remote_hash(remote_hash, page_job.timestamp)
+            if original:
+                self.store_duplicate(
+                    page_job, photo_item, archive_name, final_filename, original, None, remote_hash, transfer_skipped=True
+                )
+                return True
+
+        # 큰 파일은 Range 구간 다운로드 (서버가 지원하지 않으면 한 번에 받는 방식으로 전환)
+        # 목록의 크기가 숫자가 아니면 크기를 모르는 것으로 보고 한 번에 받음
+        listed_size = ListManifest.item_size(photo_item)
+        use_ranges = bool(listed_size) and listed_size >= self.SEGMENT_THRESHOLD
+        partial_dir = os.path.join(page_job.index.backup_path, self.PARTIAL_DIR_NAME)
+
+        last_error = None
+        for attempt in range(self.ITEM_MAX_ATTEMPTS):
+            if attempt:
+                # 지터를 준 지수 백오프 (중지 요청 시 즉시 깨어남)
+                delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * (2 ** (attempt - 1)))
+                if self.stop_requested.wait(delay * random.uniform(0.5, 1.5)):
+                    return False
+                self.log(f"재시도 {attempt}/{self.ITEM_MAX_ATTEMPTS - 1}: {final_filename}")
+
+            if use_ranges:
+                try:
+                    # 구간마다 다운로드 자리를 받으므로 여기서는 자리를 잡지 않음 (잡은 채 기다리면 한도가 작을 때 교착)
+                    checkpoint = self.request_download_ranged(photo_item['url'], partial_dir, drawer_id)
+                    if checkpoint is not None:
+                        source = open(checkpoint.data_path, 'rb')
+                        try:
+                            sha256, size = self.hash_downloaded_file(source, photo_item)
+                        except IOError:
+                            source.close()
+                            checkpoint.remove() # 검증 실패: 다음 시도는 처음부터
+                            raise
+                except (requests.RequestException, IOError) as e:
+                    last_error = e
+                    self.metrics.inc("download_errors")
+                    self.log(f'error on request get photo {photo_item["url"]}\n{e}')
+                    continue
+                if checkpoint is not None:
+                    def release_checkpoint(source=source, checkpoint=checkpoint):
+                        source.close()
+                        checkpoint.remove()
+                    self.store_downloaded_item(
+                        page_job, photo_item, archive_name, final_filename, source, sha256, size, remote_hash,
+                        release_checkpoint
+                    )
+                    return True
+                use_ranges = False
+                self.log(f"서버가 구간(Range) 요청을 지원하지 않아 한 번에 받습니다: {final_filename}")
+
+            # 큰 파일은 같은 크기의 원본이 없으면(중복일 수 없으면) 임시 파일 없이 아카이브에 바로 기록
+            if listed_size and listed_size > self.SPOOL_MAX_MEMORY and not page_job.index.find_by_size(listed_size, page_job.timestamp):
+                try:
+                    if self.download_into_archive(page_job, photo_item, archive_name, final_filename, remote_hash):
+                        return True
+                except (requests.RequestException, IOError) as e:
+                    last_error = e
+                    self.metrics.inc("download_errors")
+                    self.log(f'error on request get photo {photo_item["url"]}\n{e}')
+                    continue
+
+            # 작은 파일은 메모리에서, 크기를 모르거나 중복일 수 있는 큰 파일은 임시 파일에서 아카이브로 옮김
+            # (임시 파일은 아카이브가 넘겨받아 기록한 뒤 닫음)
+            spool = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_MEMORY)
+            hashing_spool = HashingWriter(spool)
+            try:
+                with self.download_slot():
+                    self.request_download(photo_item['url'], hashing_spool)
+            except (requests.RequestException, IOError) as e:
+                spool.close()
+                last_error = e
+                self.metrics.inc("download_errors")
+                self.log(f'error on request get photo {photo_item["url"]}\n{e}')
+                continue
+            self.store_downloaded_item(
+                page_job, photo_item, archive_name, final_filename, spool,
+                hashing_spool.hexdigest(), hashing_spool.size, remote_hash, spool.close
+            )
+            return True
+
+        self.log(f"사진/파일 다운로드 실패 (격리): {str(photo_item.get('id', 'UnknownID'))}")
+        page_job.quarantine_item(photo_item, last_error)
+        self.metrics.inc("items_quarantined")
+        return True
+
+    def store_downloaded_item(self, page_job, photo_item, archive_name, member_name, source, sha256, size, remote_hash,
+                              release):
+        """ 받은 파일(source)을 아카이브에 추가하고 색인에 stored 로 기록. 같은 내용이 이미 있으면 참조로만 기록
+
+        source는 넘겨받으며, 아카이브에 기록한 뒤(다른 항목이 스트림으로 기록 중이면 그 뒤에) release()로 정리됩니다.
+        """
+        # 내려받으며 계산한 해시로 이미 저장된 같은 내용이 있는지 확인
+        original = page_job.index.find_by_sha256(sha256, page_job.timestamp)
+        if original:
+            release()
+            self.store_duplicate(
+                page_job, photo_item, archive_name, member_name, original, sha256, remote_hash, transfer_skipped=False
+            )
+            return
+        # 아카이브 기록 오류(디스크 부족 등)는 재시도하지 않고 페이지 실패로 처리
+        source.seek(0)
+        with self.metrics.timer("archive_add"):
+            written = page_job.archive.add_file(archive_name, member_name, source, release)
+        if not written:
+            self.metrics.inc("items_queued_behind_stream")
+        self.record_stored_item(page_job, photo_item, archive_name, member_name, sha256, size, remote_hash)
+
+    def download_into_archive(self, page_job, photo_item, archive_name, member_name, remote_hash):
+        """ 임시 파일 없이 다운로드하며 아카이브 멤버로 바로 기록. 아카이브에 이미 기록 중인 항목이 있으면 False
+
+        다운로드가 실패하면 쓰던 멤버는 아카이브 목차에서 빠지고 예외가 그대로 전달됩니다. (재시도 가능)
+        """
+        with self.download_slot(), page_job.archive.open_member(archive_name, member_name) as dest:
+            if dest is None:
+                return False
+            hashing_dest = HashingWriter(dest)
+            self.request_download(photo_item['url'], hashing_dest)
+        self.metrics.inc("items_streamed")
+        self.record_stored_item(
+            page_job, photo_item, archive_name, member_name, hashing_dest.hexdigest(), hashing_dest.size, remote_hash
+        )
+        return True
+
+    def record_stored_item(self, page_job, photo_item, archive_name, member_name, sha256, size, remote_hash):
+        """ 아카이브에 추가한 항목을 색인에 stored 로 기록 """
+        chat_name, created_at = BackupIndex.catalog_fields(photo_item)
+        page_job.index.mark_stored(
+            photo_item.get('drawerId', photo_item.get('id')), archive_name, member_name,
+            size, sha256, page_job.timestamp, remote_hash=remote_hash, chat_name=chat_name, created_at=created_at
+        )
+        self.metrics.inc("items_downloaded")
+        self.log(f"downloaded: {member_name}")
+
+    def get_remote_hash(self, photo_item):
+        """ 목록 API 항목에 해시 값이 있으면 '키:값[:크기]' 형태의 비교용 문자열을 반환 """
+        for key in self.REMOTE_HASH_KEYS:
+            value = photo_item.get(key)
+            if value:
+                size = photo_item.get('size') or photo_item.get('fileSize')
+                return f"{key}:{value}:{size}" if size else f"{key}:{value}"
+        return None
+
+    def store_duplicate(self, page_job, photo_item, archive_name, member_name, original, sha256, remote_hash,
+                        transfer_skipped):
+        """ 이미 저장된 원본과 같은 항목을 바이트 대신 매니페스트 참조로 기록 """
+        original_id, original_archive, original_member, original_size, original_folder = original
+        drawer_id = photo_item.get('drawerId', photo_item.get('id'))
+        reference = {
+            "drawerId": str(drawer_id),
+            "sha256": sha256,
+            "archive": original_archive,
+            "target": original_member
+        }
+        if original_folder:
+            reference["folder"] = original_folder # 원본이 다른 유형 폴더에 있음
+        page_job.archive.add_reference(archive_name, member_name, reference)
+        chat_name, created_at = BackupIndex.catalog_fields(photo_item)
+        page_job.index.mark_stored(
+            drawer_id, archive_name, member_name, original_size,
+            sha256, page_job.timestamp, remote_hash=remote_hash, dedup_of=original_id, dedup_folder=original_folder,
+            chat_name=chat_name, created_at=created_at
+        )
+        page_job.dedup_stats.add(original_size, transfer_skipped)
+        self.metrics.inc("items_deduplicated")
+        self.log(f"duplicate: {member_name} -> {original_folder + '/' if original_folder else ''}{original_archive}/{original_member}")
+
+    @classmethod
+    def content_peers(cls, backup_path):
+        """ 중복 원본을 함께 찾을 다른 유형 폴더 {폴더 이름: 경로}. 사진/파일 백업 폴더끼리만 """
+        main_backup_path, folder_name = os.path.split(os.path.normpath(backup_path))
+        folder_names = [cls.API_CONFIG[backup_type]["folder_name"] for backup_type in cls.DEDUP_TYPES]
+        if folder_name not in folder_names:
+            return {}
+        return {name: os.path.join(main_backup_path, name) for name in folder_names if name != folder_name}
+
+    def storage_for(self, index):
+        """ 색인에 기록된 저장소 (원격 저장소로 백업한 폴더면 그 저장소, 아니면 로컬) """
+        settings = index.get_meta("storage")
+        if not settings:
+            return LocalStorage()
+        return S3Storage.from_settings(json.loads(settings))
+
+    def restore_items(self, backup_path, entries, dest_folder):
+        """ 카탈로그 조회 결과(BackupIndex.find_items)를 아카이브별로 묶어 필요한 아카이브만 열고 dest_folder에 풀어냄
+
+        중복 참조 항목은 원본 멤버의 내용을 자기 이름으로 풀어내며, 원본이 다른 유형 폴더에 있으면 그 폴더의 아카이브를 엽니다.
+        멤버 하나를 풀지 못하면(없음, CRC 불일치, 압축 해제 오류 등) 쓰던 파일을 지우고 다음 멤버로 넘어갑니다.
+        복원한 항목 수를 반환합니다.
+        """
+        os.makedirs(dest_folder, exist_ok=True)
+        main_backup_path = os.path.dirname(os.path.normpath(backup_path))
+        by_archive = {}
+        for entry in entries:
+            source_path = os.path.join(main_backup_path, entry["source_folder"]) if entry.get("source_folder") else backup_path
+            by_archive.setdefault((source_path, entry["archive"]), []).append(entry)
+
+        written_names = set(os.listdir(dest_folder))
+        restored = 0
+        for (source_path, archive), archive_entries in by_archive.items():
+            zip_path = self.storage.describe(source_path, archive)
+            archive_restored = 0
+            try:
+                with self.storage.open_reader(source_path, archive) as f, zipfile.ZipFile(f) as zf:
+                    for entry in archive_entries:
+                        if self.restore_member(zf, zip_path, entry, dest_folder, written_names):
+                            archive_restored += 1
+            except (OSError, zipfile.BadZipFile) as e:
+                self.log(f"복원 실패 ({zip_path}): {e}")
+            restored += archive_restored
+            self.log(f"{zip_path}에서 {len(archive_entries)}개 중 {archive_restored}개 복원")
+        return restored
+
+    def restore_member(self, zf, zip_path, entry, dest_folder, written_names):
+        """ 카탈로그 항목 하나를 dest_folder에 풀어냄. 실패하면 쓰던 파일을 지우고 False """
+        file_name = PageArchiveWriter.unique_name(written_names, os.path.basename(entry["member"]))
+        dest_path = os.path.join(dest_folder, file_name)
+        try:
+            with zf.open(entry["source_member"]) as source, open(dest_path, 'wb') as dest:
+                shutil.copyfileobj(source, dest, PageArchiveWriter.COPY_CHUNK_SIZE)
+            return True
+        except Exception as e:
+            # CRC 불일치는 끝까지 읽은 뒤에야 알 수 있으므로, 잘못된 내용이 남지 않게 파일을 지움
+            self.log(f"복원 실패 ({zip_path}/{entry['source_member']} -> {file_name}): {e}")
+            try:
+                os.remove(dest_path)
+            except FileNotFoundError:
+                pass
+            written_names.discard(file_name)
+            return False
+
+    # --- 무결성 검사 ---
+
+    def verify_backup(self, backup_type, main_backup_path, workers=None, full=False):
+        """ 백업 유형 하나의 아카이브와 목록 로그를 검사하고, 문제 항목은 색인에 failed 로 표시해 다음 백업 때 다시 받게 함
+
+        아카이브는 workers개 프로세스에 나눠 검사하며, full이 아니면 지난 검사 이후 바뀌지 않은 파일은 건너뜁니다.
+        발견한 문제 항목 수를 반환합니다.
+        """
+        config = self.API_CONFIG[backup_type]
+        backup_path = os.path.join(main_backup_path, config["folder_name"])
+        if not os.path.isdir(backup_path):
+            self.log(f"{config['folder_name']}: 백업 폴더가 없어 건너뜁니다.")
+            return 0
+        index = BackupIndex(backup_path, peers=self.content_peers(backup_path))
+        try:
+            storage = index.get_meta("storage")
+            if storage:
+                # 검사 결과로 항목을 다시 받게 표시하므로, 로컬에 없는 아카이브를 문제로 오인하지 않도록 건너뜀
+                self.log(f"{config['folder_name']}: 아카이브가 원격 저장소({json.loads(storage)['bucket']})에 있어 검사하지 않습니다.")
+                return 0
+            return self._verify_archives(index, backup_path, config, workers, full)
+        finally:
+            index.close()
+
+    def _verify_archives(self, index, backup_path, config, workers, full):
+        log_suffix = config["log_suffix"]
+        index.import_page_logs(log_suffix, True, self.build_item_filename, self.log)
+        index.fill_catalog(log_suffix, self.log)
+        verified = {} if full else index.verified_files()
+        problems = {} # drawer_id -> 사유
+        item_pages = {} # drawer_id -> 목록 로그의 page_timestamp
+        page_items = {} # page_timestamp -> {drawer_id: 목록 항목}
+
+        def file_state(name):
+            stat = os.stat(os.path.join(backup_path, name))
+            return stat.st_mtime_ns, stat.st_size
+
+        def load_page(page_timestamp):
+            if page_timestamp not in page_items:
+                try:
+                    with open(os.path.join(backup_path, f"{page_timestamp}{log_suffix}"), 'r', encoding='utf-8') as f:
+                        items = json.load(f).get('items') or []
+                    page_items[page_timestamp] = {str(item['drawerId']): item for item in items if 'drawerId' in item}
+                except (OSError, ValueError):
+                    page_items[page_timestamp] = {}
+            return page_items[page_timestamp]
+
+        def list_size(drawer_id, page_timestamp):
+            item = load_page(page_timestamp).get(drawer_id) or {}
+            try:
+                return int(item.get('size') or item.get('fileSize'))
+            except (TypeError, ValueError):
+                return None
+
+        # 1) 바뀐 목록 로그: 목록에는 있었지만 색인에 기록조차 없는 항목
+        for log_path in glob.glob(os.path.join(glob.escape(backup_path), f"*{log_suffix}")):
+            name = os.path.basename(log_path)
+            try:
+                page_timestamp = int(name[:-len(log_suffix)])
+                state = file_state(name)
+            except (ValueError, OSError):
+                continue
+            if verified.get(name) == state:
+                continue
+            items = load_page(page_timestamp)
+            statuses = index.item_statuses(items)
+            unknown_ids = [drawer_id for drawer_id in items if drawer_id not in statuses]
+            for drawer_id in unknown_ids:
+                problems[drawer_id] = f"{name}: 목록에는 있으나 백업 기록이 없음"
+                item_pages[drawer_id] = page_timestamp
+            if not unknown_ids:
+                index.mark_verified(name, *state)
+
+        # 2) 아카이브: 바뀌었거나 처음 보는 아카이브만 프로세스 풀에서 CRC/크기 검사
+        tasks = {}
+        cached_count = 0
+        for archive, entries in index.archive_members().items():
+            zip_path = os.path.join(backup_path, archive)
+            if os.path.exists(f"{zip_path}{ArchiveVolume.JOURNAL_SUFFIX}"):
+                self.log(f"기록 중(또는 중단된) 볼륨이라 건너뜁니다: {zip_path}")
+                continue
+            try:
+                state = file_state(archive)
+            except OSError:
+                for drawer_id, _, _, page_timestamp in entries:
+                    problems[drawer_id] = f"{archive}: 아카이브 파일이 없음"
+                    item_pages[drawer_id] = page_timestamp
+                continue
+            if verified.get(archive) == state:
+                cached_count += 1
+                continue
+            expected = []
+            for drawer_id, member, size, page_timestamp in entries:
+                item_pages[drawer_id] = page_timestamp
+                expected.append((drawer_id, member, (size, list_size(drawer_id, page_timestamp))))
+            tasks[archive] = (zip_path, state, expected)
+
+        self.log(
+            f"{config['folder_name']}: 아카이브 {len(tasks)}개를 검사합니다. "
+            f"(바뀌지 않아 건너뜀 {cached_count}개, 프로세스 {workers or os.cpu_count()}개)"
+        )
+        unknown_member_count = 0
+        if tasks:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(ArchiveVerifier.check_archive, zip_path, expected): archive
+                    for archive, (zip_path, _, expected) in tasks.items()
+                }
+                for done_count, future in enumerate(as_completed(futures), 1):
+                    if self.stop_requested.is_set():
+                        for pending in futures:
+                            pending.cancel()
+                        self.log("검사 중단됨. 지금까지 검사한 결과만 반영합니다.")
+                        break
+                    archive = futures[future]
+                    try:
+                        archive_problems, unknown_count = future.result()
+                    except Exception as e:
+                        self.log(f"검사 실패 ({archive}): {e}")
+                        continue
+                    unknown_member_count += unknown_count
+                    if archive_problems:
+                        index.forget_verified(archive)
+                        for drawer_id, reason in archive_problems:
+                            problems[drawer_id] = f"{archive}: {reason}"
+                    else:
+                        index.mark_verified(archive, *tasks[archive][1])
+                    if done_count % self.VERIFY_LOG_INTERVAL == 0:
+                        self.log(f"검사 진행: {done_count}/{len(tasks)}개 아카이브")
+
+        # 3) 기존 로그로 색인을 만들 때 zip에서 찾지 못한 항목, 문제 항목을 원본으로 참조하는 중복 항목
+        for drawer_id, page_timestamp in index.unarchived_items():
+            problems[drawer_id] = "아카이브에서 멤버를 찾지 못함"
+            item_pages[drawer_id] = page_timestamp
+        for drawer_id, page_timestamp in index.find_dependents(list(problems)):
+            problems.setdefault(drawer_id, "중복 참조의 원본에 문제가 있음")
+            item_pages.setdefault(drawer_id, page_timestamp)
+
+        # 4) 문제 항목은 목록 로그(없으면 색인에 남은 목록 데이터)로 다시 받기 예약
+        failed_items = []
+        for drawer_id, reason in sorted(problems.items()):
+            self.log(f"문제 발견 ({drawer_id}): {reason}")
+            item = load_page(item_pages.get(drawer_id)).get(drawer_id) or index.stored_item_json(drawer_id)
+            if item:
+                failed_items.append((item, reason))
+            else:
+                self.log(f"경고: {drawer_id} 항목의 목록 정보가 없어 자동으로 다시 받을 수 없습니다.")
+        index.mark_for_redownload(failed_items)
+        if problems:
+            self._mark_peer_dependents(index, config, list(problems))
+
+        self.log(
+            f"{config['folder_name']}: 검사 완료. 문제 항목 {len(problems)}개"
+            + (f", 다음 백업 실행 시 {len(failed_items)}개를 다시 받습니다." if failed_items else "")
+        )
+        if unknown_member_count:
+            self.log(f"참고: 완료로 기록되지 않은 멤버 {unknown_member_count}개 (다시 받기로 한 항목이나 중단된 페이지가 남긴 내용)")
+        return len(problems)
+
+    def _mark_peer_dependents(self, index, config, drawer_ids):
+        """ 다른 유형 폴더에서 drawer_ids를 원본으로 참조하는 중복 항목도 다음 백업 때 다시 받게 표시 """
+        log_suffix = config["log_suffix"]
+        for folder_name, peer_path in index.peers.items():
+            if not os.path.exists(os.path.join(peer_path, BackupIndex.FILE_NAME)):
+                continue
+            peer_index = BackupIndex(peer_path)
+            try:
+                page_items = {}
+                failed_items = []
+                for drawer_id, page_timestamp in peer_index.find_dependents(drawer_ids, folder=config["folder_name"]):
+                    if page_timestamp not in page_items:
+                        try:
+                            with open(os.path.join(peer_path, f"{page_timestamp}{log_suffix}"), 'r', encoding='utf-8') as f:
+                                items = json.load(f).get('items') or []
+                            page_items[page_timestamp] = {str(item['drawerId']): item for item in items if 'drawerId' in item}
+                        except (OSError, ValueError):
+                            page_items[page_timestamp] = {}
+                    item = page_items[page_timestamp].get(drawer_id) or peer_index.stored_item_json(drawer_id)
+                    if item:
+                        self.log(f"문제 발견 ({folder_name}/{drawer_id}): 중복 참조의 원본({config['folder_name']})에 문제가 있음")
+                        failed_items.append((item, f"{config['folder_name']}의 원본에 문제가 있음"))
+                    else:
+                        self.log(f"경고: {folder_name}/{drawer_id} 항목의 목록 정보가 없어 자동으로 다시 받을 수 없습니다.")
+                peer_index.mark_for_redownload(failed_items)
+            finally:
+                peer_index.close()
+
+    # --- 2. 링크 백업 로직 ---
+            
+    def run_link_backup(self, api_config, backup_path):
+        """ 링크(LINK) 백업을 처리하는 메인 루프. 페이지마다 새 링크만 CSV에 바로 덧붙임 """
+        base_url = api_config["base_url"]
+        log_suffix = api_config["log_suffix"]
+        
+        index = BackupIndex(backup_path, self.storage)
+        csv_writer = LinkCsvWriter(os.path.join(backup_path, self.LINK_CSV_NAME))
+        
+        # 링크는 이어받기 시 이미 기록한 링크를 색인의 링크 키로 걸러내므로
+        # 색인에서 시작점을 찾습니다.
+        try:
+            resume_id = self.get_last_downloaded_id(index, log_suffix, check_zip=False)
+            incremental = self.use_incremental_mode(resume_id)
+            self.import_legacy_link_csv(index, csv_writer.path)
+        except Exception:
+            index.close()
+            raise
+        
+        is_known = None
+        if incremental:
+            next_url, is_known = self.plan_incremental_listing(index, base_url)
+        elif resume_id:
+            next_url = f'{base_url}&offset={resume_id}'
+        else:
+            self.log("새로운 링크 백업을 시작합니다.")
+            next_url = base_url
+            
+        page_count = 1
+        added_count = 0
+        completed = True # 중단 없이 끝까지 진행했는지 여부
+        write_failed = False
+        prefetcher = ListPagePrefetcher(
+            self, base_url, next_url, backup_path, log_suffix, self.LIST_PREFETCH_DEPTH, is_known=is_known
+        )
+
+        unrecorded_pages = [] # CSV에 기록하지 못해 목록 로그를 지울 페이지
+        try:
+            while True:
+                if self.stop_requested.is_set():
+                    self.log("작업 중단됨.")
+                    completed = False
+                    break
+
+                page = prefetcher.next_page()
+                if page is None:
+                    break
+
+                self.log(f"--- 링크 페이지 {page_count} 수집 중 ---")
+                try:
+                    added_count += self.record_link_page(index, csv_writer, page, log_suffix, incremental=incremental)
+                except OSError:
+                    unrecorded_pages.append(page)
+                    raise
+                self.log(f"CSV에 추가된 총 링크: {added_count}개")
+                page_count += 1
+        except OSError as e:
+            completed = False
+            write_failed = True
+            self.log(f"오류: '{csv_writer.path}' 파일을 쓸 수 없습니다. 파일이 다른 프로그램에서 열려있는지 확인하세요. ({e})")
+        finally:
+            # 이미 로그로 저장된 페이지는 이어받기 시 건너뛰므로, 남은 페이지도 결과에 포함
+            remaining_pages = prefetcher.close()
+            if write_failed:
+                unrecorded_pages += remaining_pages
+                remaining_pages = []
+            for page_index, page in enumerate(remaining_pages):
+                try:
+                    added_count += self.record_link_page(index, csv_writer, page, log_suffix, incremental=incremental)
+                except OSError as e:
+                    completed = False
+                    self.log(f"오류: 링크 CSV 기록 실패: {e}")
+                    unrecorded_pages += remaining_pages[page_index:]
+                    break
+            for timestamp, _ in unrecorded_pages:
+                self.remove_page_log(backup_path, timestamp, log_suffix)
+            csv_writer.close()
+            if incremental and completed and not prefetcher.failed:
+                index.clear_meta(*self.INCREMENTAL_META_KEYS)
+            index.close()
+            if self.storage.remote and os.path.exists(csv_writer.path):
+                # CSV는 로컬 파일에 이어 쓰고, 실행이 끝날 때 통째로 올림
+                try:
+                    self.storage.publish_file(backup_path, self.LINK_CSV_NAME)
+                except Exception as e:
+                    completed = False
+                    self.log(f"오류: 링크 CSV를 저장소에 올리지 못했습니다: {e}")
+
+        if added_count:
+            self.log(f"성공: '{csv_writer.path}' 파일에 새 링크 {added_count}개를 추가했습니다.")
+        else:
+            self.log("새로 추가된 링크가 없습니다.")
+        return completed and not prefetcher.failed
+
+    def record_link_page(self, index, csv_writer, page, log_suffix, incremental=False):
+        """ 링크 페이지에서 아직 CSV에 없는 링크만 CSV에 덧붙이고 색인에 완료(이어받기 지점 포함)로 기록
+
+        CSV 반영(fsync) 후 색인을 기록하므로, 그 사이에 강제 종료되면 해당 페이지의 행이
+        다음 실행에서 한 번 더 기록될 수는 있어도 누락되지는 않습니다. 추가한 행 수를 반환합니다.
+        """
+        timestamp, file_list_json = page
+        items = file_list_json['items']
+        self.metrics.inc("links_recorded", len(items))
+
+        # 링크 id 키와 (이전 버전 CSV와 비교할) 행 해시 키를 함께 확인
+        rows = [self.build_link_row(link) for link in items]
+        keys = [self.build_link_key(link, row) for link, row in zip(items, rows)]
+        row_keys = [self.build_link_row_key(row) for row in rows]
+        seen = index.find_link_keys(set(keys) | set(row_keys))
+
+        new_rows = []
+        new_keys = []
+        for row, key, row_key in zip(rows, keys, row_keys):
+            if key in seen or row_key in seen:
+                continue
+            seen.add(key) # 같은 페이지 안의 중복도 제거
+            new_rows.append(row)
+            new_keys.append(key)
+
+        csv_writer.append_rows(new_rows)
+        try:
+            resume_id = None if incremental else items[-1]['drawerId']
+            index.record_done(
+                items, f"{timestamp}{log_suffix}", timestamp, resume_id=resume_id, link_keys=new_keys,
+                incremental_resume_id=items[-1]['drawerId'] if incremental else None
+            )
+        except Exception as e:
+            self.log(f"경고: 링크 색인 기록 실패: {e}")
+        else:
+            self.save_resume_marker(index, resume_id, timestamp)
+        if len(new_rows) < len(items):
+            self.log(f"이미 기록된 링크 {len(items) - len(new_rows)}개는 건너뜁니다.")
+        return len(new_rows)
+
+    def build_link_row(self, link):
+        """ 링크 하나의 CSV 행 [Date, Title, URL] """
+        date_str = self.format_timestamp_csv(link.get('createdAt'))
+        title_raw = link.get('title', '제목 없음')
+        title = " ".join(title_raw.split()) if title_raw else '제목 없음'
+        url_raw = link.get('url', '#')
+        url = " ".join(url_raw.split()) if url_raw else '#'
+        return [date_str, title, url]
+
+    def build_link_key(self, link, row):
+        """ 중복 확인 키: 고유 ID(16진수). ID가 없으면 행 해시 """
+        link_id = link.get('id')
+        return str(link_id) if link_id is not None else self.build_link_row_key(row)
+
+    def build_link_row_key(self, row):
+        """ CSV 행 내용의 해시 키 (링크 id가 없는 이전 버전 CSV 행과 비교용) """
+        return "row:" + hashlib.sha1("\x1f".join(row).encode('utf-8')).hexdigest()[:20]
+
+    def import_legacy_link_csv(self, index, csv_path):
+        """ 링크 키 기록 이전에 만든 CSV가 있으면 한 번만 행 해시를 색인에 등록 (이후 실행부터 병합) """
+        if index.get_meta("link_csv_imported"):
+            return
+        if os.path.exists(csv_path):
+            self.log(f"기존 링크 CSV를 색인에 등록합니다: {csv_path}")
+            batch = []
+            imported_count = 0
+            for row in LinkCsvWriter.iter_rows(csv_path):
+                batch.append(self.build_link_row_key(row))
+                if len(batch) >= 5000:
+                    index.add_link_keys(batch)
+                    imported_count += len(batch)
+                    batch = []
+            index.add_link_keys(batch)
+            imported_count += len(batch)
+            self.log(f"기존 링크 {imported_count}개를 등록했습니다. 새 링크는 이 파일 끝에 이어서 기록합니다.")
+        index.mark_link_csv_imported()
+
+
+class AccountBackupRunner:
+    """ 여러 계정(프로필)의 백업을 한 프로세스에서 동시에 실행
+
+    계정마다 별도의 엔진(쿠키, 연결 풀, 속도 제어기, 색인, 로그 파일)을 두어 서로 섞이지 않게 하고,
+    모든 엔진이 하나의 SharedTransferScheduler로 전체 동시 다운로드 수와 대역폭 한도를 나눠 씁니다.
+
+    프로필 파일(JSON) 예시 (상대 경로는 프로필 파일 위치 기준):
+        {"max_concurrency": 16, "max_bandwidth_mb": 40,
+         "accounts": [{"name": "shop-a", "cookie_path": "cookies/a", "backup_path": "/data/a", "types": ["MEDIA", "FILE"]}]}
+    """
+
+    SETTINGS_KEYS = ("max_concurrency", "max_bandwidth_mb", "accounts")
+    # 계정별로 지정할 수 있는 엔진 설정 (프로필 키 -> 엔진 인자)
+    ACCOUNT_OPTIONS = {
+        "workers": "worker_count",
+        "incremental": "incremental",
+        "compression": "compression",
+        "archive_layout": "archive_layout",
+        "volume_size": "volume_size", # GB
+        "two_phase": "two_phase",
+    }
+    STORAGE_KEYS = ("s3_bucket", "s3_prefix", "s3_endpoint", "s3_region") # s3_bucket이 있으면 S3Storage로 백업
+    ACCOUNT_KEYS = ("name", "cookie_path", "backup_path", "types") + tuple(ACCOUNT_OPTIONS) + STORAGE_KEYS
+
+    def __init__(self, profiles, max_concurrency=TalkCloudBackupEngine.MAX_WORKER_COUNT, max_bandwidth=None,
+                 log=None, api_base=None):
+        self._log = log or print
+        self.profiles = profiles
+        self.scheduler = SharedTransferScheduler(max_concurrency, max_bandwidth)
+        self.stop_requested = threading.Event()
+        self.engines = {}
+        for profile in profiles:
+            options = {
+                engine_key: profile[key] for key, engine_key in self.ACCOUNT_OPTIONS.items() if key in profile
+            }
+            if "volume_size" in options:
+                options["volume_size"] = int(options["volume_size"] * 1024 ** 3)
+            if profile.get("s3_bucket"):
+                options["storage"] = S3Storage(
+                    profile["s3_bucket"], profile.get("s3_prefix"), profile.get("s3_endpoint"), profile.get("s3_region")
+                )
+            self.engines[profile["name"]] = TalkCloudBackupEngine(
+                profile["cookie_path"], log=self._account_log(profile["name"]), api_base=api_base,
+                scheduler=self.scheduler, **options
+            )
+
+    def _account_log(self, name):
+        return lambda message: self._log(f"[{name}] {message}")
+
+    @classmethod
+    def load_profiles(cls, path):
+        """ 프로필 파일을 읽어 (계정 목록, 전역 설정)을 반환. 형식이 잘못되었으면 ValueError """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get("accounts"), list) or not data["accounts"]:
+            raise ValueError("프로필 파일에 'accounts' 목록이 없습니다.")
+        unknown = set(data) - set(cls.SETTINGS_KEYS)
+        if unknown:
+            raise ValueError(f"알 수 없는 설정: {', '.join(sorted(unknown))}")
+
+        base_folder = os.path.dirname(os.path.abspath(path))
+        profiles = []
+        names = set()
+        backup_paths = set()
+        for account in data["accounts"]:
+            if not isinstance(account, dict):
+                raise ValueError("계정 항목은 객체여야 합니다.")
+            unknown = set(account) - set(cls.ACCOUNT_KEYS)
+            if unknown:
+                raise ValueError(f"알 수 없는 계정 설정: {', '.join(sorted(unknown))}")
+            name = str(account.get("name") or "")
+            if not name or name in names:
+                raise ValueError(f"계정 이름이 없거나 중복되었습니다: '{name}'")
+            if not account.get("cookie_path") or not account.get("backup_path"):
+                raise ValueError(f"{name}: cookie_path와 backup_path가 필요합니다.")
+            profile = dict(account, name=name)
+            for key in ("cookie_path", "backup_path"):
+                profile[key] = os.path.normpath(os.path.join(base_folder, os.path.expanduser(account[key])))
+            # 같은 폴더(또는 같은 버킷/접두어)에 두 계정을 백업하면 색인과 아카이브가 섞이므로 허용하지 않음
+            if os.path.normcase(profile["backup_path"]) in backup_paths:
+                raise ValueError(f"{name}: 다른 계정과 backup_path가 같습니다.")
+            if account.get("s3_bucket"):
+                if account.get("archive_layout", "page") != "page":
+                    raise ValueError(f"{name}: S3 저장소에는 archive_layout page만 사용할 수 있습니다.")
+                remote_location = f"s3://{account['s3_bucket']}/{str(account.get('s3_prefix') or '').strip('/')}"
+                if remote_location in backup_paths:
+                    raise ValueError(f"{name}: 다른 계정과 s3_bucket/s3_prefix가 같습니다.")
+                backup_paths.add(remote_location)
+            types = [str(t).upper() for t in account.get("types", TalkCloudBackupEngine.BACKUP_TYPES)]
+            if not types or any(t not in TalkCloudBackupEngine.BACKUP_TYPES for t in types):
+                raise ValueError(f"{name}: types는 {', '.join(TalkCloudBackupEngine.BACKUP_TYPES)} 중에서 지정합니다.")
+            profile["types"] = list(dict.fromkeys(types))
+            names.add(name)
+            backup_paths.add(os.path.normcase(profile["backup_path"]))
+            profiles.append(profile)
+        settings = {key: data[key] for key in ("max_concurrency", "max_bandwidth_mb") if data.get(key) is not None}
+        return profiles, settings
+
+    def run(self):
+        """ 모든 계정을 각각의 스레드에서 동시에 백업하고 끝날 때까지 기다림. 계정 이름 -> 성공 여부 """
+        results = {}
+
+        def run(profile):
+            results[profile["name"]] = self.engines[profile["name"]].run_backups(profile["types"], profile["backup_path"])
+
+        bandwidth = self.scheduler.max_bytes_per_sec
+        self._log(
+            f"계정 {len(self.profiles)}개 백업 시작 (전체 동시 다운로드 최대 {self.scheduler.max_concurrency}개, "
+            f"대역폭 {f'{bandwidth / (1024 * 1024):g}MB/s' if bandwidth else '제한 없음'})"
+        )
+        threads = [
+            threading.Thread(target=run, args=(profile,), name=f"account-{profile['name']}", daemon=True)
+            for profile in self.profiles
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        failed = [profile["name"] for profile in self.profiles if not results.get(profile["name"])]
+        if failed:
+            self._log(f"실패한 계정: {', '.join(failed)}")
+        else:
+            self._log(f"계정 {len(self.profiles)}개 백업 완료")
+        return results
+
+    def request_stop(self):
+        """ 모든 계정의 백업에 중지를 요청 """
+        self.stop_requested.set()
+        for engine in self.engines.values():
+            engine.request_stop()
+
+    def close(self):
+        for engine in self.engines.values():
+            engine.close()
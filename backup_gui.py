@@ -0,0 +1,274 @@
+import os
+import threading
+import queue
+from collections import deque
+import tkinter as tk
+from tkinter import ttk, filedialog, scrolledtext
+
+from backup_engine import TalkCloudBackupEngine, CompressionPolicy, ArchiveLayout
+
+
+class TalkDriveUnifiedBackupApp:
+    """ 백업 엔진(TalkCloudBackupEngine)을 감싸는 Tk GUI """
+
+    LOG_MAX_LINES = 2000 # 로그 창에 남겨 둘 최근 줄 수 (전체 로그는 로그 파일에 기록)
+    LOG_DRAIN_INTERVAL_MS = 100 # 로그 큐를 로그 창으로 옮기는 주기
+    LOG_DRAIN_MAX_RECORDS = 20000 # 한 번에 큐에서 꺼낼 최대 기록 수 (GUI 응답성 유지)
+    PROGRESS_INTERVAL_MS = 500 # 진행률 표시 갱신 주기
+
+    def __init__(self, root):
+        self.root = root
+        self.root.title("카카오톡 톡클라우드 통합 백업")
+        self.root.geometry("700x670") # 진행률 표시줄과 아카이브 구성 줄만큼 높이 늘림
+
+        self.backup_folder = tk.StringVar()
+        self.cookie_folder = tk.StringVar()
+        self.worker_count = tk.IntVar(value=TalkCloudBackupEngine.DEFAULT_WORKER_COUNT)
+        self.incremental = tk.BooleanVar(value=False)
+        self.compression = tk.StringVar(value="auto")
+        self.archive_layout = tk.StringVar(value="page")
+        self.volume_size_gb = tk.DoubleVar(value=ArchiveLayout.DEFAULT_VOLUME_SIZE / (1024 ** 3))
+        self.two_phase = tk.BooleanVar(value=False)
+        self.progress_text = tk.StringVar(value="대기 중")
+
+        self.cookie_folder.set(os.path.abspath(os.getcwd()))
+
+        # 작업자 스레드는 큐에 넣기만 하고, 로그 창은 메인 스레드에서 모아서 갱신
+        self.log_queue = queue.SimpleQueue()
+        self.finished_queue = queue.SimpleQueue() # 끝난 백업 유형 (버튼 복구도 메인 스레드에서)
+
+        # 백업 로직은 엔진이 담당하고, GUI는 설정 값 전달과 로그 출력만 담당
+        self.engine = TalkCloudBackupEngine(self.cookie_folder.get(), log=self.log)
+        self.running_types = set() # 현재 실행 중인 백업 유형 (유형별로 버튼을 따로 잠금)
+
+        # --- GUI 위젯 생성 ---
+        main_frame = ttk.Frame(root, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # 1. 쿠키 폴더 설정
+        cookie_frame = ttk.LabelFrame(main_frame, text=" 1. 쿠키 파일 경로 (talkcloud.kakao.com_cookies.txt가 있는 폴더) ")
+        cookie_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        cookie_entry = ttk.Entry(cookie_frame, textvariable=self.cookie_folder, width=70)
+        cookie_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+
+        cookie_button = ttk.Button(cookie_frame, text="찾아보기", command=self.select_cookie_folder)
+        cookie_button.pack(side=tk.RIGHT, padx=5, pady=5)
+
+        # 2. 백업 저장 폴더 설정
+        backup_frame = ttk.LabelFrame(main_frame, text=" 2. 메인 백업 저장 경로 (하위 폴더가 자동 생성됩니다) ")
+        backup_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        backup_entry = ttk.Entry(backup_frame, textvariable=self.backup_folder, width=70)
+        backup_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+
+        backup_button = ttk.Button(backup_frame, text="찾아보기", command=self.select_backup_folder)
+        backup_button.pack(side=tk.RIGHT, padx=5, pady=5)
+
+        # 2-1. 동시 다운로드 수 설정 (이후 서버 응답에 따라 자동 조절)
+        option_frame = ttk.Frame(main_frame)
+        option_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+
+        ttk.Label(option_frame, text="동시 다운로드 수(시작값):").pack(side=tk.LEFT, padx=5)
+        worker_spinbox = ttk.Spinbox(option_frame, from_=1, to=32, textvariable=self.worker_count, width=5)
+        worker_spinbox.pack(side=tk.LEFT)
+
+        incremental_check = ttk.Checkbutton(option_frame, text="새 항목만 백업 (증분)", variable=self.incremental)
+        incremental_check.pack(side=tk.LEFT, padx=15)
+
+        # auto: 사진/동영상처럼 이미 압축된 파일은 그대로 저장하고 문서만 압축
+        ttk.Label(option_frame, text="압축 방식:").pack(side=tk.LEFT, padx=5)
+        compression_combo = ttk.Combobox(
+            option_frame, textvariable=self.compression, values=CompressionPolicy.MODES, state="readonly", width=8
+        )
+        compression_combo.pack(side=tk.LEFT)
+
+        # 2-2. 아카이브 구성 (page: 페이지마다 zip / size: 크기 기준 볼륨 / chat: 채팅방별 / month: 월별)
+        layout_frame = ttk.Frame(main_frame)
+        layout_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+
+        ttk.Label(layout_frame, text="아카이브 구성:").pack(side=tk.LEFT, padx=5)
+        layout_combo = ttk.Combobox(
+            layout_frame, textvariable=self.archive_layout, values=ArchiveLayout.MODES, state="readonly", width=8
+        )
+        layout_combo.pack(side=tk.LEFT)
+
+        ttk.Label(layout_frame, text="볼륨 최대 크기(GB):").pack(side=tk.LEFT, padx=(15, 5))
+        volume_spinbox = ttk.Spinbox(layout_frame, from_=0.5, to=64, increment=0.5, textvariable=self.volume_size_gb, width=5)
+        volume_spinbox.pack(side=tk.LEFT)
+
+        # 목록을 모두 받은 뒤 페이지마다 큰 파일부터 다운로드 (전체 크기/남은 시간이 정확하고, 시작 전에 디스크 공간 확인)
+        two_phase_check = ttk.Checkbutton(layout_frame, text="목록 먼저 받기 (2단계)", variable=self.two_phase)
+        two_phase_check.pack(side=tk.LEFT, padx=15)
+
+        # 3. 시작 버튼 프레임 (3개의 버튼을 가로로 나열)
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, padx=5, pady=(10, 0))
+        button_frame.columnconfigure((0, 1, 2), weight=1) # 3개 버튼이 공간을 나눠가짐
+
+        self.btn_photo = ttk.Button(button_frame, text="사진/동영상 백업 시작", command=lambda: self.start_backup_thread("MEDIA"))
+        self.btn_photo.grid(row=0, column=0, padx=2, sticky="ew")
+
+        self.btn_file = ttk.Button(button_frame, text="파일 백업 시작", command=lambda: self.start_backup_thread("FILE"))
+        self.btn_file.grid(row=0, column=1, padx=2, sticky="ew")
+
+        self.btn_link = ttk.Button(button_frame, text="링크 백업 시작", command=lambda: self.start_backup_thread("LINK"))
+        self.btn_link.grid(row=0, column=2, padx=2, sticky="ew")
+
+        self.type_buttons = {"MEDIA": self.btn_photo, "FILE": self.btn_file, "LINK": self.btn_link}
+
+        # 4. 중지 버튼
+        self.btn_stop = ttk.Button(main_frame, text="작업 중지", command=self.request_stop, state="disabled")
+        self.btn_stop.pack(fill=tk.X, padx=5, pady=5)
+
+        # 4-1. 진행률 (목록에서 찾은 항목 대비 처리한 항목, 속도, 남은 시간)
+        self.progress_bar = ttk.Progressbar(main_frame, mode="determinate", maximum=1)
+        self.progress_bar.pack(fill=tk.X, padx=5)
+        ttk.Label(main_frame, textvariable=self.progress_text).pack(fill=tk.X, padx=5)
+
+        # 5. 로그 출력 창
+        log_frame = ttk.LabelFrame(main_frame, text=" 진행 로그 ")
+        log_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, height=10)
+        self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.log_text.config(state='disabled')
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(self.LOG_DRAIN_INTERVAL_MS, self.drain_log_queue)
+        self.root.after(self.PROGRESS_INTERVAL_MS, self.update_progress)
+
+    # --- GUI 공통 헬퍼 ---
+
+    def log(self, message):
+        """ 로그 메시지를 큐에 넣습니다. 어느 스레드에서 호출해도 기다리지 않습니다. """
+        print(message) # 콘솔에도 출력
+        self.log_queue.put_nowait(str(message))
+
+    def drain_log_queue(self):
+        """ 메인 스레드에서 주기적으로 큐에 쌓인 로그를 로그 창으로 옮기고, 끝난 백업의 버튼을 복구 """
+        # 창에는 최근 LOG_MAX_LINES줄만 남으므로 그보다 오래된 기록은 창에 넣지 않음
+        lines = deque(maxlen=self.LOG_MAX_LINES)
+        try:
+            for _ in range(self.LOG_DRAIN_MAX_RECORDS):
+                lines.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            while True:
+                self.finish_backup(self.finished_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if lines:
+            try:
+                self.log_text.config(state='normal')
+                self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+                # 오래된 줄을 지워 최근 LOG_MAX_LINES줄만 유지 (끝의 빈 줄 제외)
+                line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+                if line_count > self.LOG_MAX_LINES:
+                    self.log_text.delete('1.0', f'{line_count - self.LOG_MAX_LINES + 1}.0')
+                self.log_text.see(tk.END)
+                self.log_text.config(state='disabled')
+            except tk.TclError as e:
+                print(f"로그 업데이트 실패: {e}")
+                return
+
+        self.root.after(self.LOG_DRAIN_INTERVAL_MS, self.drain_log_queue)
+
+    def update_progress(self):
+        """ 실행 중에는 주기적으로 진행률 표시를 갱신 """
+        if self.running_types:
+            self.show_progress()
+        self.root.after(self.PROGRESS_INTERVAL_MS, self.update_progress)
+
+    def show_progress(self):
+        """ 엔진 계측 값으로 진행률 표시줄과 남은 시간을 갱신 (메인 스레드) """
+        progress = self.engine.metrics.progress()
+        self.progress_bar.config(maximum=max(progress["items_discovered"], 1), value=progress["items_done"])
+        self.progress_text.set(self.engine.format_progress(progress))
+
+    def on_close(self):
+        """ 창을 닫을 때 진행 중인 작업에 중지를 요청하고 로그 파일을 정리 """
+        self.engine.request_stop()
+        self.engine.close()
+        self.root.destroy()
+
+    def select_cookie_folder(self):
+        folder = filedialog.askdirectory(initialdir=self.cookie_folder.get())
+        if folder:
+            self.cookie_folder.set(os.path.abspath(folder))
+            self.log(f"쿠키 폴더가 설정되었습니다: {folder}")
+
+    def select_backup_folder(self):
+        folder = filedialog.askdirectory()
+        if folder:
+            self.backup_folder.set(os.path.abspath(folder))
+            self.log(f"메인 백업 폴더가 설정되었습니다: {folder}")
+
+    def set_buttons_state(self):
+        """ 실행 중인 백업 유형의 버튼만 비활성화 (다른 유형은 동시에 시작 가능) """
+        for backup_type, button in self.type_buttons.items():
+            button.config(state="disabled" if backup_type in self.running_types else "normal")
+        self.btn_stop.config(state="normal" if self.running_types else "disabled")
+
+    def request_stop(self):
+        """ 중지 버튼 클릭 시 플래그 설정 """
+        self.log("...작업 중지를 요청했습니다. 현재 페이지 완료 후 중단됩니다...")
+        self.engine.request_stop()
+        self.btn_stop.config(state="disabled") # 중복 클릭 방지
+
+    def apply_settings(self):
+        """ 입력 창의 설정 값을 엔진에 전달. 실행 중인 백업이 있으면 진행 중인 설정을 유지 """
+        if self.running_types:
+            return
+        self.engine.cookie_folder = self.cookie_folder.get()
+        try:
+            self.engine.worker_count = self.worker_count.get()
+        except tk.TclError:
+            self.engine.worker_count = TalkCloudBackupEngine.DEFAULT_WORKER_COUNT
+        self.engine.incremental = bool(self.incremental.get())
+        self.engine.compression = self.compression.get()
+        self.engine.archive_layout = self.archive_layout.get()
+        self.engine.two_phase = bool(self.two_phase.get())
+        try:
+            self.engine.volume_size = int(self.volume_size_gb.get() * 1024 ** 3)
+        except tk.TclError:
+            self.engine.volume_size = ArchiveLayout.DEFAULT_VOLUME_SIZE
+
+    # --- 백업 실행 (스레드에서 실행됨) ---
+
+    def start_backup_thread(self, backup_type):
+        """ 백업 유형에 맞는 스레드를 시작하는 공통 함수 """
+
+        main_backup_path = self.backup_folder.get()
+        if not main_backup_path:
+            self.log("오류: 메인 백업 저장 경로를 지정해주세요.")
+            return
+        if backup_type in self.running_types:
+            return
+
+        self.apply_settings()
+        self.running_types.add(backup_type)
+        self.set_buttons_state() # 버튼 비활성화
+
+        # 스레드 래퍼(Wrapper)를 사용하여 실행 (종료 시 버튼 복구)
+        thread = threading.Thread(
+            target=self.run_backup_wrapper,
+            args=(backup_type, main_backup_path),
+            daemon=True
+        )
+        thread.start()
+
+    def run_backup_wrapper(self, backup_type, main_backup_path):
+        """ 백업 스레드를 감싸고, 종료 시 버튼을 복구하는 래퍼 """
+        try:
+            self.engine.run_backup(backup_type, main_backup_path)
+        finally:
+            # 위젯은 메인 스레드에서만 변경 (tkinter는 스레드 안전하지 않으므로 after()도 부르지 않고 큐로 전달)
+            self.finished_queue.put_nowait(backup_type)
+
+    def finish_backup(self, backup_type):
+        self.show_progress() # 마지막 상태 표시
+        self.running_types.discard(backup_type)
+        self.set_buttons_state() # 버튼 다시 활성화
@@ -0,0 +1,287 @@
+""" 벤치마크용 drawer-api 대체 서버
+
+mediaFile/list, link/list 페이징(fetchCount, offset=drawerId, items)을 그대로 흉내 내고,
+다운로드는 크기 분포, 응답 지연, 연결별 대역폭 제한, 429/5xx 오류 주입을 설정할 수 있습니다.
+다운로드는 Range 요청(206, Accept-Ranges, ETag)도 지원합니다. (--no-ranges로 끌 수 있음)
+
+단독 실행:  python bench/mock_drawer_api.py --port 8080 --items 2000
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+class MockDrawerData:
+    """ 유형별 목록 항목과 항목별 파일 내용을 시드로부터 결정적으로 생성 """
+
+    VERTICAL_TYPES = ("MEDIA", "FILE", "LINK")
+    CHAT_ROOMS = 8
+    CONTENT_BLOCK_SIZE = 64 * 1024 # 파일 내용은 이 크기의 블록을 반복해 만듦
+
+    def __init__(self, item_count, size_dist="lognormal", size_min=20 * 1024, size_max=20 * 1024 * 1024,
+                 size_mean=512 * 1024, seed=1):
+        self.item_count = item_count
+        self.seed = seed
+        rng = random.Random(seed)
+        self.items = {}
+        for type_index, vertical_type in enumerate(self.VERTICAL_TYPES):
+            base_id = (type_index + 1) * 10 ** 9
+            self.items[vertical_type] = [
+                self._build_item(vertical_type, base_id - i, i, self._pick_size(rng, size_dist, size_min, size_max, size_mean))
+                for i in range(item_count)
+            ]
+        self.by_id = {item["drawerId"]: item for items in self.items.values() for item in items}
+        self.positions = {item["drawerId"]: i for items in self.items.values() for i, item in enumerate(items)}
+        # 항목별 내용: 사진/동영상은 압축되지 않는 무작위 바이트, 문서는 압축이 잘 되는 텍스트
+        self._random_block = random.Random(seed).randbytes(self.CONTENT_BLOCK_SIZE)
+        self._text_block = (b"TalkCloud benchmark document line. " * (self.CONTENT_BLOCK_SIZE // 35 + 1))[:self.CONTENT_BLOCK_SIZE]
+
+    def _pick_size(self, rng, size_dist, size_min, size_max, size_mean):
+        if size_dist == "fixed":
+            return size_mean
+        if size_dist == "uniform":
+            return rng.randint(size_min, size_max)
+        # lognormal: 작은 파일이 대부분이고 가끔 큰 파일(동영상)이 섞인 실제 분포에 가까움
+        size = int(rng.lognormvariate(math.log(size_mean), 1.0))
+        return max(size_min, min(size_max, size))
+
+    def _build_item(self, vertical_type, drawer_id, position, size):
+        created_at = 1700000000000 - position * 60 * 1000
+        item = {
+            "drawerId": str(drawer_id),
+            "id": f"{drawer_id:x}",
+            "chatName": f"room{position % self.CHAT_ROOMS}",
+            "createdAt": created_at,
+        }
+        if vertical_type == "LINK":
+            item.update(url=f"https://example.com/article/{drawer_id}", title=f"benchmark link {position}")
+        else:
+            extension = "jpg" if vertical_type == "MEDIA" else "pdf"
+            item.update(name=f"bench_{position}.{extension}", size=size, verticalType=vertical_type)
+        return item
+
+    def page(self, vertical_type, offset, fetch_count):
+        """ offset(drawerId) 다음 항목부터 fetch_count개 (DESC) """
+        items = self.items.get(vertical_type, [])
+        start = self.positions.get(offset, len(items) - 1) + 1 if offset else 0
+        return items[start:start + fetch_count]
+
+    def iter_content(self, item, start=0, end=None):
+        """ 항목 내용의 start~end(포함) 바이트를 블록 단위로 생성 (메모리에 파일 전체를 만들지 않음)
+
+        내용은 drawerId 뒤에 블록을 반복한 것이므로, 위치만으로 어느 구간이든 같은 바이트를 만들 수 있습니다.
+        """
+        block = self._text_block if item.get("verticalType") == "FILE" else self._random_block
+        # 항목마다 내용이 달라야 중복 제거에 걸리지 않으므로 앞에 drawerId를 붙임
+        header = item["drawerId"].encode()
+        end = item["size"] - 1 if end is None else min(end, item["size"] - 1)
+        position = start
+        while position <= end:
+            if position < len(header):
+                chunk = header[position:]
+            else:
+                offset = (position - len(header)) % len(block)
+                chunk = block[offset:]
+            chunk = chunk[:end - position + 1]
+            position += len(chunk)
+            yield chunk
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """ 클라이언트가 응답 도중 연결을 끊는 경우(Range 확인 후 닫기, 중지 등)는 오류로 출력하지 않음 """
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockDrawerServer:
+    """ ThreadingHTTPServer 기반 대체 서버. 통계(요청 수, 주입한 오류 수)를 함께 집계 """
+
+    def __init__(self, data, host="127.0.0.1", port=0, latency_ms=0.0, bandwidth_kbps=0.0,
+                 error_rate_429=0.0, error_rate_5xx=0.0, retry_after=1, seed=1, ranges=True):
+        self.data = data
+        self.ranges = ranges
+        self.latency = latency_ms / 1000
+        self.bandwidth = bandwidth_kbps * 1024 # 연결(다운로드)별 초당 바이트, 0이면 제한 없음
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"list_requests": 0, "downloads": 0, "bytes_sent": 0, "injected_429": 0, "injected_5xx": 0}
+        self.httpd = QuietHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-drawer-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.stats[name] += value
+
+    def _inject_error(self):
+        """ 설정한 확률로 주입할 상태 코드를 반환 (없으면 None) """
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.error_rate_429:
+            self._count("injected_429")
+            return 429
+        if roll < self.error_rate_429 + self.error_rate_5xx:
+            self._count("injected_5xx")
+            return 503
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # keep-alive 재사용을 실제 서버처럼 허용
+
+            def log_message(self, *args):
+                pass
+
+            def send_empty(self, status):
+                self.send_response(status)
+                if status in (429, 503):
+                    self.send_header("Retry-After", str(server.retry_after))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                error_status = server._inject_error()
+                if error_status:
+                    self.send_empty(error_status)
+                elif parsed.path in ("/mediaFile/list", "/link/list"):
+                    self.send_list(parsed.path, query)
+                elif parsed.path.startswith("/dl/"):
+                    self.send_download(parsed.path.split("/")[2])
+                else:
+                    self.send_empty(404)
+
+            def send_list(self, path, query):
+                server._count("list_requests")
+                vertical_type = "LINK" if path == "/link/list" else query.get("verticalType", ["MEDIA"])[0]
+                fetch_count = int(query.get("fetchCount", ["100"])[0])
+                offset = query.get("offset", [None])[0]
+                host = self.headers.get("Host")
+                items = []
+                for item in server.data.page(vertical_type, offset, fetch_count):
+                    if vertical_type != "LINK":
+                        item = dict(item, url=f"http://{host}/dl/{item['drawerId']}/{item['name']}")
+                    items.append(item)
+                body = json.dumps({"items": items}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_download(self, drawer_id):
+                item = server.data.by_id.get(drawer_id)
+                if item is None or "size" not in item:
+                    self.send_empty(404)
+                    return
+                server._count("downloads")
+                size = item["size"]
+                start, end = 0, size - 1
+                byte_range = self.headers.get("Range", "")
+                if server.ranges and byte_range.startswith("bytes="):
+                    first, _, last = byte_range[len("bytes="):].partition("-")
+                    start = int(first)
+                    end = min(int(last), size - 1) if last else size - 1
+                    if start >= size or start > end:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(end - start + 1))
+                if server.ranges:
+                    self.send_header("Accept-Ranges", "bytes")
+                    self.send_header("ETag", f'"{item["drawerId"]}-{size}"')
+                self.end_headers()
+                started = time.monotonic()
+                sent = 0
+                for chunk in server.data.iter_content(item, start, end):
+                    self.wfile.write(chunk)
+                    sent += len(chunk)
+                    if server.bandwidth:
+                        # 보낸 양이 대역폭 한도를 앞서면 그만큼 쉼
+                        ahead = sent / server.bandwidth - (time.monotonic() - started)
+                        if ahead > 0:
+                            time.sleep(ahead)
+                server._count("bytes_sent", sent)
+
+        return Handler
+
+
+def add_server_arguments(parser):
+    """ 대체 서버 설정 인자 (run_benchmark.py와 공용) """
+    parser.add_argument("--items", type=int, default=1000, help="유형별 항목 수")
+    parser.add_argument("--size-dist", choices=("fixed", "uniform", "lognormal"), default="lognormal", help="파일 크기 분포")
+    parser.add_argument("--size-min", type=int, default=20 * 1024, help="최소 파일 크기(바이트)")
+    parser.add_argument("--size-max", type=int, default=20 * 1024 * 1024, help="최대 파일 크기(바이트)")
+    parser.add_argument("--size-mean", type=int, default=512 * 1024, help="fixed 크기 / lognormal 중앙값(바이트)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="요청마다 더할 응답 지연(ms)")
+    parser.add_argument("--bandwidth-kbps", type=float, default=0, help="다운로드 연결별 대역폭 한도(KB/s, 0이면 무제한)")
+    parser.add_argument("--error-rate-429", type=float, default=0, help="429로 응답할 확률 (0~1)")
+    parser.add_argument("--error-rate-5xx", type=float, default=0, help="503으로 응답할 확률 (0~1)")
+    parser.add_argument("--seed", type=int, default=1, help="항목/오류 생성 시드 (같은 시드면 같은 데이터)")
+    parser.add_argument("--no-ranges", dest="ranges", action="store_false", help="Range 요청을 지원하지 않는 서버처럼 동작")
+
+
+def build_server(args, host="127.0.0.1", port=0):
+    data = MockDrawerData(
+        args.items, size_dist=args.size_dist, size_min=args.size_min,
+        size_max=args.size_max, size_mean=args.size_mean, seed=args.seed
+    )
+    return MockDrawerServer(
+        data, host=host, port=port, latency_ms=args.latency_ms, bandwidth_kbps=args.bandwidth_kbps,
+        error_rate_429=args.error_rate_429, error_rate_5xx=args.error_rate_5xx, seed=args.seed, ranges=args.ranges
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 drawer-api 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    server = build_server(args, host=args.host, port=args.port)
+    print(f"대체 서버 실행 중: {server.base_url} (Ctrl+C로 종료)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
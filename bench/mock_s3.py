@@ -0,0 +1,206 @@
+""" 벤치마크/테스트용 S3 호환 저장소 대체 서버 (MinIO 대신 간단히 쓰는 용도)
+
+경로 방식 주소(/버킷/키)로 백업에 필요한 API만 흉내 냅니다:
+PutObject, GetObject(Range), HeadObject, DeleteObject, 멀티파트 업로드(시작/파트/완료/취소/목록).
+객체는 메모리에 보관하며 서명은 확인하지 않습니다. 버킷은 처음 쓸 때 자동으로 만들어집니다.
+
+단독 실행:  python bench/mock_s3.py --port 9000
+백업:      AWS_ACCESS_KEY_ID=bench AWS_SECRET_ACCESS_KEY=bench python main.py backup --storage s3 \\
+           --s3-bucket bench --s3-endpoint http://127.0.0.1:9000 ...
+"""
+import argparse
+import hashlib
+import threading
+import uuid
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+from xml.sax.saxutils import escape
+
+from mock_drawer_api import QuietHTTPServer
+
+
+class MockS3Server:
+    """ ThreadingHTTPServer 기반 S3 대체 서버. 통계(요청 수, 받은 바이트 수, 업로드 수)를 함께 집계 """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self._lock = threading.Lock()
+        self.objects = {} # (버킷, 키) -> 내용
+        self.uploads = {} # 업로드 ID -> (버킷, 키, {파트 번호: 내용})
+        self.stats = {"requests": 0, "bytes_received": 0, "parts": 0, "completed_uploads": 0, "aborted_uploads": 0}
+        self.httpd = QuietHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-s3", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.stats[name] += value
+
+    def stored_bytes(self, bucket=None):
+        with self._lock:
+            return sum(len(data) for (b, _), data in self.objects.items() if bucket in (None, b))
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            # --- 공통 ---
+
+            def parse(self):
+                server._count("requests")
+                parsed = urlparse(self.path)
+                bucket, _, key = parsed.path.lstrip("/").partition("/")
+                return unquote(bucket), unquote(key), parse_qs(parsed.query, keep_blank_values=True)
+
+            def read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                server._count("bytes_received", len(body))
+                return body
+
+            def send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body and self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def send_xml(self, root_name, fields):
+                inner = "".join(f"<{name}>{escape(str(value))}</{name}>" for name, value in fields)
+                self.send(200, f'<?xml version="1.0" encoding="UTF-8"?><{root_name}>{inner}</{root_name}>'.encode(),
+                          {"Content-Type": "application/xml"})
+
+            def send_error_xml(self, status, code):
+                body = f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code><Message>{code}</Message></Error>'
+                self.send(status, body.encode(), {"Content-Type": "application/xml"})
+
+            # --- 요청 ---
+
+            def do_PUT(self):
+                bucket, key, query = self.parse()
+                body = self.read_body()
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if "uploadId" in query:
+                    upload = server.uploads.get(query["uploadId"][0])
+                    if upload is None:
+                        self.send_error_xml(404, "NoSuchUpload")
+                        return
+                    with server._lock:
+                        upload[2][int(query["partNumber"][0])] = body
+                    server._count("parts")
+                else:
+                    with server._lock:
+                        server.objects[(bucket, key)] = body
+                self.send(200, headers={"ETag": etag})
+
+            def do_POST(self):
+                bucket, key, query = self.parse()
+                body = self.read_body()
+                if "uploads" in query:
+                    upload_id = uuid.uuid4().hex
+                    with server._lock:
+                        server.uploads[upload_id] = (bucket, key, {})
+                    self.send_xml("InitiateMultipartUploadResult", [("Bucket", bucket), ("Key", key), ("UploadId", upload_id)])
+                    return
+                upload_id = query.get("uploadId", [None])[0]
+                with server._lock:
+                    upload = server.uploads.pop(upload_id, None)
+                if upload is None:
+                    self.send_error_xml(404, "NoSuchUpload")
+                    return
+                root = ET.fromstring(body)
+                numbers = [int(element.text) for element in root.iter() if element.tag.endswith("PartNumber")]
+                try:
+                    data = b"".join(upload[2][number] for number in numbers)
+                except KeyError:
+                    self.send_error_xml(400, "InvalidPart")
+                    return
+                with server._lock:
+                    server.objects[(bucket, key)] = data
+                server._count("completed_uploads")
+                self.send_xml("CompleteMultipartUploadResult", [
+                    ("Bucket", bucket), ("Key", key), ("ETag", f'"{hashlib.md5(data).hexdigest()}-{len(numbers)}"')
+                ])
+
+            def do_DELETE(self):
+                bucket, key, query = self.parse()
+                with server._lock:
+                    if "uploadId" in query:
+                        if server.uploads.pop(query["uploadId"][0], None) is not None:
+                            server.stats["aborted_uploads"] += 1
+                    else:
+                        server.objects.pop((bucket, key), None)
+                self.send(204)
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                bucket, key, query = self.parse()
+                if not key and "uploads" in query:
+                    self.send_upload_list(bucket, query.get("prefix", [""])[0])
+                    return
+                with server._lock:
+                    data = server.objects.get((bucket, key))
+                if data is None:
+                    self.send_error_xml(404, "NoSuchKey")
+                    return
+                headers = {"ETag": f'"{hashlib.md5(data).hexdigest()}"', "Accept-Ranges": "bytes",
+                           "Content-Type": "application/octet-stream"}
+                byte_range = self.headers.get("Range", "")
+                if byte_range.startswith("bytes="):
+                    first, _, last = byte_range[len("bytes="):].partition("-")
+                    start = int(first)
+                    end = min(int(last), len(data) - 1) if last else len(data) - 1
+                    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+                    self.send(206, data[start:end + 1], headers)
+                else:
+                    self.send(200, data, headers)
+
+            def send_upload_list(self, bucket, prefix):
+                with server._lock:
+                    uploads = [(upload_id, key) for upload_id, (b, key, _) in server.uploads.items()
+                               if b == bucket and key.startswith(prefix)]
+                inner = "".join(
+                    f"<Upload><Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId></Upload>" for upload_id, key in uploads
+                )
+                body = (f'<?xml version="1.0" encoding="UTF-8"?><ListMultipartUploadsResult><Bucket>{escape(bucket)}</Bucket>'
+                        f'<IsTruncated>false</IsTruncated>{inner}</ListMultipartUploadsResult>')
+                self.send(200, body.encode(), {"Content-Type": "application/xml"})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크/테스트용 S3 호환 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+    server = MockS3Server(host=args.host, port=args.port)
+    print(f"S3 대체 서버 실행 중: {server.base_url} (Ctrl+C로 종료)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
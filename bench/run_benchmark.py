@@ -0,0 +1,224 @@
+""" 대체 서버를 상대로 백업을 처음부터 끝까지 실행하고 성능을 측정하는 벤치마크
+
+백업은 `main.py backup --api-base ...` 를 별도 프로세스로 실행하므로, 최대 메모리(RSS)는
+대체 서버를 제외한 백업 프로세스만의 값입니다. 결과는 --history 파일에 한 줄(JSON)씩 누적해
+변경 전후를 비교할 수 있습니다.
+
+예시:  python bench/run_benchmark.py --items 2000 --workers 8 --latency-ms 20 --history bench/results.jsonl
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from mock_drawer_api import add_server_arguments, build_server
+from mock_s3 import MockS3Server
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(REPO_ROOT, "main.py")
+COOKIE_FILE_NAME = "talkcloud.kakao.com_cookies.txt"
+METRICS_JSON_NAME = "backup_metrics.json"
+S3_BUCKET = "bench"
+
+
+def read_disk_writes(pid):
+    """ /proc/<pid>/io 로 본 프로세스가 저장 장치에 쓴 바이트 수 (기록 전에 지워져 취소된 바이트는 뺌). 리눅스가 아니면 None """
+    try:
+        with open(f"/proc/{pid}/io", "r", encoding="ascii") as f:
+            counters = {key: int(value) for key, _, value in (line.partition(":") for line in f)}
+        return counters["write_bytes"] - counters.get("cancelled_write_bytes", 0)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def run_child(command, env=None):
+    """ 백업 프로세스를 실행하고 (종료 코드, 최대 RSS 바이트, 디스크에 쓴 바이트, stderr)를 반환. 알 수 없는 값은 None
+
+    디스크에 쓴 바이트는 임시 파일을 포함해 백업 프로세스가 실제로 쓴 양입니다. 자식이 끝난 뒤
+    거두기 전(좀비 상태)에 /proc/<pid>/io 를 읽어야 마지막까지 쓴 양이 빠지지 않습니다.
+    """
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env)
+    # 기다리는 동안 stderr 파이프가 가득 차 자식이 멈추지 않도록 따로 읽음
+    stderr_chunks = []
+    reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    reader.start()
+    disk_writes = None
+    if hasattr(os, "waitid") and os.path.exists(f"/proc/{process.pid}/io"):
+        # 끝나기를 기다리되 거두지는 않음 (WNOWAIT)
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        disk_writes = read_disk_writes(process.pid)
+    peak_rss = None
+    if hasattr(os, "wait4"):
+        # wait4는 해당 자식 프로세스만의 자원 사용량을 돌려줌
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else status >> 8
+        # 리눅스는 KB, macOS는 바이트 단위
+        peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    else:
+        process.wait()
+    reader.join()
+    process.stderr.close()
+    return process.returncode, peak_rss, disk_writes, b"".join(stderr_chunks).decode("utf-8", "replace")
+
+
+def slowest_bucket(histograms, names):
+    """ 히스토그램들에서 값이 있는 가장 높은 구간의 이름 (예: "0.05"는 0.05초 이하, "+Inf"는 가장 큰 구간 초과). 기록이 없으면 None """
+    slowest = None
+    for name in names:
+        buckets = list((histograms.get(name) or {}).get("buckets", {}).items())
+        for position, (bound, count) in enumerate(buckets):
+            if count and (slowest is None or position > slowest[0]):
+                slowest = (position, bound)
+    return slowest[1] if slowest else None
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_once(args, work_dir):
+    """ 새 대체 서버와 빈 백업 폴더로 한 번 실행하고 측정값을 반환 """
+    cookie_dir = os.path.join(work_dir, "cookies")
+    backup_dir = os.path.join(work_dir, "backup")
+    os.makedirs(cookie_dir, exist_ok=True)
+    with open(os.path.join(cookie_dir, COOKIE_FILE_NAME), "w", encoding="utf-8") as f:
+        f.write(".kakao.com\tTRUE\t/\tTRUE\t0\t_kawlt\tbenchmark\n")
+
+    server = build_server(args).start()
+    command = [
+        sys.executable, MAIN_SCRIPT, "backup",
+        "--backup-path", backup_dir, "--cookie-path", cookie_dir,
+        "--types", *args.types, "--workers", str(args.workers), "--api-base", server.base_url,
+        "--compression", args.compression, "--archive-layout", args.archive_layout,
+    ]
+    if args.two_phase:
+        command.append("--two-phase")
+    s3_server = None
+    env = None
+    if args.storage == "s3":
+        # 서명은 확인하지 않지만 boto3가 자격 증명을 요구하므로 더미 값을 넘김
+        s3_server = MockS3Server().start()
+        command += ["--storage", "s3", "--s3-bucket", S3_BUCKET, "--s3-endpoint", s3_server.base_url]
+        env = dict(os.environ, AWS_ACCESS_KEY_ID="bench", AWS_SECRET_ACCESS_KEY="bench", AWS_DEFAULT_REGION="us-east-1")
+    try:
+        started = time.monotonic()
+        exit_code, peak_rss, disk_writes, stderr = run_child(command, env)
+        elapsed = time.monotonic() - started
+    finally:
+        server.stop()
+        if s3_server is not None:
+            s3_server.stop()
+
+    metrics = {}
+    try:
+        with open(os.path.join(backup_dir, METRICS_JSON_NAME), "r", encoding="utf-8") as f:
+            metrics = json.load(f)
+    except (OSError, ValueError):
+        pass
+    progress = metrics.get("progress", {})
+    counters = metrics.get("counters", {})
+    items_done = progress.get("items_done", 0)
+    bytes_downloaded = progress.get("bytes_downloaded", 0)
+    return {
+        "exit_code": exit_code,
+        "elapsed_seconds": round(elapsed, 3),
+        "items": items_done,
+        "items_per_sec": round(items_done / elapsed, 2) if elapsed else 0,
+        "bytes_downloaded": bytes_downloaded,
+        "mb_per_sec": round(bytes_downloaded / elapsed / (1024 * 1024), 2) if elapsed else 0,
+        "peak_rss_bytes": peak_rss,
+        "disk_write_bytes": disk_writes,
+        # 큰 파일을 아카이브에 바로 기록한 수와, 그동안 기다리지 않고 대기열에 넣은 수 / 작업자가 아카이브를 기다린 최대 시간 구간
+        "items_streamed": counters.get("items_streamed", 0),
+        "items_queued_behind_stream": counters.get("items_queued_behind_stream", 0),
+        "archive_wait_bucket": slowest_bucket(metrics.get("histograms", {}), ("archive_reserve", "archive_add")),
+        "remote_bytes": s3_server.stored_bytes(S3_BUCKET) if s3_server is not None else 0,
+        "server": dict(server.stats),
+        "s3_server": dict(s3_server.stats) if s3_server is not None else None,
+        "stderr": stderr.strip()[-2000:] if exit_code else "",
+    }
+
+
+def print_result(index, result):
+    peak_rss = result["peak_rss_bytes"]
+    peak_rss_text = f"{peak_rss / (1024 * 1024):.1f}MB" if peak_rss is not None else "N/A"
+    disk_writes = result["disk_write_bytes"]
+    disk_writes_text = f"{disk_writes / (1024 * 1024):.1f}MB" if disk_writes is not None else "N/A"
+    remote_text = f"원격 {result['remote_bytes'] / (1024 * 1024):.1f}MB, " if result["s3_server"] else ""
+    wait_bucket = result["archive_wait_bucket"]
+    wait_text = "N/A" if wait_bucket is None else (f"{wait_bucket}s 이하" if wait_bucket != "+Inf" else "120s 초과")
+    print(
+        f"[{index}] 종료 코드 {result['exit_code']}, {result['elapsed_seconds']:.2f}s, "
+        f"{result['items']}개 ({result['items_per_sec']:.1f}개/s), "
+        f"{result['bytes_downloaded'] / (1024 * 1024):.1f}MB ({result['mb_per_sec']:.2f}MB/s), "
+        f"최대 RSS {peak_rss_text}, 디스크 쓰기 {disk_writes_text}, {remote_text}"
+        f"주입 오류 429={result['server']['injected_429']} 5xx={result['server']['injected_5xx']}"
+    )
+    print(
+        f"    스트림 기록 {result['items_streamed']}개, 스트림 뒤 대기열 {result['items_queued_behind_stream']}개, "
+        f"아카이브 예약/추가 대기 최대 {wait_text}"
+    )
+    if result["stderr"]:
+        print(result["stderr"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="톡클라우드 백업 벤치마크 (로컬 대체 서버 사용)")
+    add_server_arguments(parser)
+    parser.add_argument("--types", nargs="+", type=str.upper, choices=("MEDIA", "FILE", "LINK"), default=["MEDIA", "FILE", "LINK"])
+    parser.add_argument("--workers", type=int, default=5, help="동시 다운로드 수 시작값")
+    parser.add_argument("--compression", default="auto", help="백업의 압축 방식 (main.py backup --compression)")
+    parser.add_argument("--archive-layout", default="page", help="백업의 아카이브 구성 (main.py backup --archive-layout)")
+    parser.add_argument("--two-phase", action="store_true", help="백업을 2단계 수집으로 실행 (main.py backup --two-phase)")
+    parser.add_argument(
+        "--storage", choices=("local", "s3"), default="local",
+        help="s3: 메모리 S3 대체 서버(bench/mock_s3.py)로 업로드 (main.py backup --storage s3)"
+    )
+    parser.add_argument("--runs", type=int, default=1, help="반복 횟수 (매번 빈 폴더에서 시작)")
+    parser.add_argument("--work-dir", help="백업 결과를 둘 폴더 (기본값: 임시 폴더, 실행 후 삭제)")
+    parser.add_argument("--history", help="결과를 한 줄(JSON)씩 덧붙일 파일 (회귀 추적용)")
+    parser.add_argument("--label", default="", help="기록에 함께 남길 설명")
+    args = parser.parse_args(argv)
+
+    results = []
+    for run_index in range(1, args.runs + 1):
+        if args.work_dir:
+            work_dir = os.path.join(os.path.abspath(args.work_dir), f"run{run_index}")
+            shutil.rmtree(work_dir, ignore_errors=True)
+            os.makedirs(work_dir)
+            result = run_once(args, work_dir)
+        else:
+            with tempfile.TemporaryDirectory(prefix="talkcloud-bench-") as work_dir:
+                result = run_once(args, work_dir)
+        print_result(run_index, result)
+        results.append(result)
+
+    if args.history:
+        parameters = {key: value for key, value in vars(args).items() if key not in ("history", "work_dir", "label")}
+        with open(args.history, "a", encoding="utf-8") as f:
+            for result in results:
+                record = {
+                    "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                    "revision": git_revision(),
+                    "label": args.label,
+                    "parameters": parameters,
+                }
+                record.update({key: value for key, value in result.items() if key != "stderr"})
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return 0 if all(result["exit_code"] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())